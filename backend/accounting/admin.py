@@ -6,7 +6,10 @@ accounting data through a web-based interface.
 """
 
 from django.contrib import admin
-from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
+from .models import (
+    Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry,
+    AccountDailyBalance
+)
 
 
 @admin.register(Company)
@@ -71,7 +74,7 @@ class GeneralLedgerAdmin(admin.ModelAdmin):
         'entry_no'
     )
     readonly_fields = ('entry_no', 'created_at', 'updated_at')
-    ordering = ('-date__date', '-entry_no')
+    ordering = ('-posting_date', '-entry_no')
     
     fieldsets = (
         ('Transaction Details', {
@@ -124,11 +127,35 @@ class JournalEntryAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         """Optimize queryset with select_related for better performance."""
-        return super().get_queryset(request).select_related(
+        return super().get_queryset(request).with_totals().select_related(
             'company', 'date'
         )
 
 
+@admin.register(AccountDailyBalance)
+class AccountDailyBalanceAdmin(admin.ModelAdmin):
+    """Read-only admin interface for the materialized daily balances."""
+    list_display = (
+        'date', 'company', 'account', 'debit_total', 'credit_total',
+        'entry_count', 'balance'
+    )
+    list_filter = ('company', 'account__class_name')
+    search_fields = ('account__account',)
+    ordering = ('company', 'account', '-date')
+    date_hierarchy = 'date'
+    
+    def has_add_permission(self, request):
+        """Rows are maintained from the general ledger, never edited by hand."""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def get_queryset(self, request):
+        """Optimize queryset with select_related for better performance."""
+        return super().get_queryset(request).select_related('company', 'account')
+
+
 # Customize admin site headers
 admin.site.site_header = "Numerizam Accounting Administration"
 admin.site.site_title = "Numerizam Admin"
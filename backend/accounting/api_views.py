@@ -14,30 +14,40 @@ Features:
 """
 
 from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Count, Avg, Max, Min, Q
-from django.db.models.functions import TruncMonth, TruncYear, TruncQuarter
-from django.http import HttpResponse
+from django.db.models import Sum, Count, Avg, Max, Min, Q, Prefetch
+from django.db.models.functions import TruncDay, TruncMonth, TruncYear, TruncQuarter
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from decimal import Decimal
-import csv
 import json
 from datetime import datetime, timedelta
 
 from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
 from .serializers import (
     CompanySerializer, ChartOfAccountsSerializer, TerritorySerializer,
-    CalendarSerializer, GeneralLedgerSerializer, JournalEntrySerializer
+    CalendarSerializer, GeneralLedgerSerializer, JournalEntrySerializer,
+    compile_ledger_row
 )
 from .filters import (
     CompanyFilter, ChartOfAccountsFilter, TerritoryFilter,
     CalendarFilter, GeneralLedgerFilter, JournalEntryFilter,
     FinancialAnalysisFilter
 )
+from .reports import (
+    account_usage, account_usage_by_account, monthly_activity_by_account,
+    trial_balance_rows, class_balance, account_activity_rows, ledger_account_rows
+)
+from .exports import stream_ledger_csv, stream_ledger_parquet, stream_ledger_arrow
+from .pagination import LedgerKeysetPagination
+from .pivot import pivot_ledger, pivot_payload
+from .result_cache import cached_ledger_result
+from .metrics import SerializerTimingMixin, registry as metrics_registry
 
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint for Company management with advanced filtering.
     
@@ -54,19 +64,55 @@ class CompanyViewSet(viewsets.ModelViewSet):
     ordering = ['company_name']
     
     @action(detail=True, methods=['get'])
+    @cached_ledger_result(company_kwarg='pk')
     def statistics(self, request, pk=None):
-        """Get comprehensive statistics for a company."""
+        """
+        Get comprehensive statistics for a company.
+        Runs one grouped query per section; totals are summed from the groups.
+        """
         company = self.get_object()
         
         # Get date range from query params
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
         
-        ledger_qs = company.ledger_entries.all()
+        ledger_qs = company.ledger_entries.order_by()
         if start_date:
-            ledger_qs = ledger_qs.filter(date__date__gte=start_date)
+            ledger_qs = ledger_qs.filter(posting_date__gte=start_date)
         if end_date:
-            ledger_qs = ledger_qs.filter(date__date__lte=end_date)
+            ledger_qs = ledger_qs.filter(posting_date__lte=end_date)
+        
+        accounts_by_class = list(
+            company.chart_of_accounts.values('class_name')
+            .annotate(count=Count('id'))
+            .order_by('class_name')
+        )
+        territories_by_country = list(
+            company.territories.values('country')
+            .annotate(count=Count('id'))
+            .order_by('country')
+        )
+        
+        # One row per (month, transaction type); the other breakdowns roll up from it
+        ledger_groups = list(
+            ledger_qs.annotate(month=TruncMonth('posting_date'))
+            .values('month', 'transaction_type')
+            .annotate(count=Count('entry_no'), total_amount=Sum('amount'))
+            .order_by('month', 'transaction_type')
+        )
+        by_type = {}
+        by_month = {}
+        for group in ledger_groups:
+            for key, rollup, field in ((group['transaction_type'], by_type, 'transaction_type'),
+                                       (group['month'], by_month, 'month')):
+                item = rollup.setdefault(key, {field: key, 'count': 0, 'total_amount': Decimal('0')})
+                item['count'] += group['count']
+                item['total_amount'] += group['total_amount'] or 0
+        
+        journals = company.journal_entries.with_totals().aggregate(
+            total_journals=Count('journal_id'),
+            balanced_entries=Count('journal_id', filter=Q(annotated_is_balanced=True))
+        )
         
         stats = {
             'company_info': {
@@ -75,51 +121,26 @@ class CompanyViewSet(viewsets.ModelViewSet):
                 'created_at': company.created_at,
             },
             'accounts': {
-                'total_accounts': company.chart_of_accounts.count(),
-                'by_class': list(
-                    company.chart_of_accounts.values('class_name')
-                    .annotate(count=Count('id'))
-                    .order_by('class_name')
-                ),
+                'total_accounts': sum(item['count'] for item in accounts_by_class),
+                'by_class': accounts_by_class,
             },
             'territories': {
-                'total_territories': company.territories.count(),
-                'by_country': list(
-                    company.territories.values('country')
-                    .annotate(count=Count('id'))
-                    .order_by('country')
-                ),
+                'total_territories': sum(item['count'] for item in territories_by_country),
+                'by_country': territories_by_country,
             },
             'transactions': {
-                'total_entries': ledger_qs.count(),
-                'total_amount': ledger_qs.aggregate(total=Sum('amount'))['total'] or 0,
-                'by_type': list(
-                    ledger_qs.values('transaction_type')
-                    .annotate(
-                        count=Count('entry_no'),
-                        total_amount=Sum('amount')
-                    )
-                ),
-                'by_month': list(
-                    ledger_qs.annotate(month=TruncMonth('date__date'))
-                    .values('month')
-                    .annotate(
-                        count=Count('entry_no'),
-                        total_amount=Sum('amount')
-                    )
-                    .order_by('month')
-                ),
+                'total_entries': sum(group['count'] for group in ledger_groups),
+                'total_amount': sum((group['total_amount'] or 0 for group in ledger_groups), Decimal('0')),
+                'by_type': sorted(by_type.values(), key=lambda item: item['transaction_type']),
+                'by_month': list(by_month.values()),
             },
-            'journal_entries': {
-                'total_journals': company.journal_entries.count(),
-                'balanced_entries': sum(1 for j in company.journal_entries.all() if j.is_balanced),
-            }
+            'journal_entries': journals,
         }
         
         return Response(stats)
 
 
-class ChartOfAccountsViewSet(viewsets.ModelViewSet):
+class ChartOfAccountsViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     """
     API endpoint for Chart of Accounts with hierarchical filtering.
     
@@ -164,55 +185,85 @@ class ChartOfAccountsViewSet(viewsets.ModelViewSet):
         
         return Response(hierarchy)
     
-    @action(detail=True, methods=['get'])
-    def usage_statistics(self, request, pk=None):
-        """Get usage statistics for a specific account."""
-        account = self.get_object()
-        
-        # Get date range from query params
+    # Accounts per usage_statistics_batch request
+    MAX_USAGE_BATCH = 500
+    
+    def _usage_ledger(self, request, **filters):
+        """Ledger entries in the requested date range."""
+        ledger_qs = GeneralLedger.objects.filter(**filters)
         start_date = request.query_params.get('start_date')
         end_date = request.query_params.get('end_date')
-        
-        ledger_qs = account.ledger_entries.all()
         if start_date:
-            ledger_qs = ledger_qs.filter(date__date__gte=start_date)
+            ledger_qs = ledger_qs.filter(posting_date__gte=start_date)
         if end_date:
-            ledger_qs = ledger_qs.filter(date__date__lte=end_date)
+            ledger_qs = ledger_qs.filter(posting_date__lte=end_date)
+        return ledger_qs
+    
+    @staticmethod
+    def _account_info(account):
+        return {
+            'account_key': account.account_key,
+            'account_name': account.account,
+            'class_name': account.class_name,
+            'sub_class': account.sub_class,
+        }
+    
+    @action(detail=True, methods=['get'])
+    def usage_statistics(self, request, pk=None):
+        """Get usage statistics for a specific account."""
+        account = self.get_object()
+        ledger_qs = self._usage_ledger(request, account=account)
         
         stats = {
-            'account_info': {
-                'account_key': account.account_key,
-                'account_name': account.account,
-                'class_name': account.class_name,
-                'sub_class': account.sub_class,
-            },
-            'usage': {
-                'total_transactions': ledger_qs.count(),
-                'total_debits': ledger_qs.filter(transaction_type='DEBIT').aggregate(
-                    total=Sum('amount'))['total'] or 0,
-                'total_credits': ledger_qs.filter(transaction_type='CREDIT').aggregate(
-                    total=Sum('amount'))['total'] or 0,
-                'average_amount': ledger_qs.aggregate(avg=Avg('amount'))['avg'] or 0,
-                'largest_transaction': ledger_qs.aggregate(max=Max('amount'))['max'] or 0,
-                'smallest_transaction': ledger_qs.aggregate(min=Min('amount'))['min'] or 0,
-            },
-            'monthly_activity': list(
-                ledger_qs.annotate(month=TruncMonth('date__date'))
-                .values('month')
-                .annotate(
-                    count=Count('entry_no'),
-                    total_amount=Sum('amount'),
-                    debits=Sum('amount', filter=Q(transaction_type='DEBIT')),
-                    credits=Sum('amount', filter=Q(transaction_type='CREDIT'))
-                )
-                .order_by('month')
-            )
+            'account_info': self._account_info(account),
+            'usage': account_usage(ledger_qs),
+            'monthly_activity': monthly_activity_by_account(ledger_qs).get(account.pk, []),
         }
         
         return Response(stats)
+    
+    @action(detail=False, methods=['get'])
+    def usage_statistics_batch(self, request):
+        """
+        Get usage statistics for many accounts in three queries.
+        Accounts are chosen by ?ids=1,2,3 and/or the list filters (e.g. ?company=1);
+        add ?monthly=true to include each account's monthly activity.
+        """
+        accounts = self.filter_queryset(self.get_queryset())
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                accounts = accounts.filter(pk__in=[int(value) for value in ids.split(',') if value.strip()])
+            except ValueError:
+                return Response({'error': 'ids must be a comma-separated list of account IDs'},
+                              status=status.HTTP_400_BAD_REQUEST)
+        
+        accounts = list(accounts[:self.MAX_USAGE_BATCH + 1])
+        if len(accounts) > self.MAX_USAGE_BATCH:
+            return Response({'error': f'At most {self.MAX_USAGE_BATCH} accounts per request; narrow the filters'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        
+        account_ids = [account.pk for account in accounts]
+        ledger_qs = self._usage_ledger(request, account__in=account_ids)
+        usage = account_usage_by_account(ledger_qs, account_ids)
+        include_monthly = request.query_params.get('monthly', '').lower() in ('1', 'true', 'yes')
+        monthly = monthly_activity_by_account(ledger_qs) if include_monthly and accounts else {}
+        
+        results = []
+        for account in accounts:
+            stats = {
+                'id': account.pk,
+                'account_info': self._account_info(account),
+                'usage': usage[account.pk],
+            }
+            if include_monthly:
+                stats['monthly_activity'] = monthly.get(account.pk, [])
+            results.append(stats)
+        
+        return Response({'count': len(results), 'results': results})
 
 
-class TerritoryViewSet(viewsets.ModelViewSet):
+class TerritoryViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     """API endpoint for Territory management."""
     queryset = Territory.objects.select_related('company').all()
     serializer_class = TerritorySerializer
@@ -222,7 +273,7 @@ class TerritoryViewSet(viewsets.ModelViewSet):
     ordering = ['company', 'country', 'region']
 
 
-class CalendarViewSet(viewsets.ModelViewSet):
+class CalendarViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     """API endpoint for Calendar with date range utilities."""
     queryset = Calendar.objects.select_related('company').all()
     serializer_class = CalendarSerializer
@@ -255,7 +306,7 @@ class CalendarViewSet(viewsets.ModelViewSet):
         return Response(date_info)
 
 
-class GeneralLedgerViewSet(viewsets.ModelViewSet):
+class GeneralLedgerViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     """
     Comprehensive API endpoint for General Ledger with advanced analytics.
     
@@ -268,8 +319,80 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
     serializer_class = GeneralLedgerSerializer
     filterset_class = GeneralLedgerFilter
     search_fields = ['details', 'reference_number', 'account__account']
-    ordering_fields = ['entry_no', 'date__date', 'amount', 'account__account_key']
-    ordering = ['-date__date', '-entry_no']
+    ordering_fields = ['entry_no', 'posting_date', 'date__date', 'amount', 'account__account_key']
+    ordering = ['-posting_date', '-entry_no']
+    
+    @property
+    def paginator(self):
+        """
+        Use keyset pagination for ?pagination=cursor or ?cursor= list requests.
+        
+        Deep pages then cost the same as the first one and no COUNT(*) is
+        run; page-number pagination stays the default.
+        """
+        request = getattr(self, 'request', None)
+        if (not hasattr(self, '_paginator') and self.action == 'list'
+                and request is not None and LedgerKeysetPagination.is_requested(request)):
+            self._paginator = LedgerKeysetPagination()
+        return super().paginator
+    
+    def list(self, request, *args, **kwargs):
+        """
+        List ledger entries.
+        
+        With ?fields=entry_no,amount,... (or ?lean=true for every field) rows
+        are read with values_list() and converted by a precompiled row
+        function instead of GeneralLedgerSerializer; the output matches the
+        serializer for the selected fields.
+        """
+        fields = request.query_params.get('fields')
+        if not fields and request.query_params.get('lean', '').lower() != 'true':
+            return super().list(request, *args, **kwargs)
+        
+        paths, row_to_dict = compile_ledger_row(
+            [name.strip() for name in fields.split(',') if name.strip()] if fields else None
+        )
+        # Trailing (posting_date, entry_no) let the keyset paginator build cursors
+        rows = self.filter_queryset(self.get_queryset()).values_list(*paths, 'posting_date', 'entry_no')
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([row_to_dict(row) for row in page])
+        return Response([row_to_dict(row) for row in rows])
+    
+    # Filter parameters that map directly onto AccountDailyBalance lookups
+    DAILY_BALANCE_FILTERS = {
+        'company': 'company_id',
+        'account': 'account__account_key',
+        'account_key': 'account__account_key',
+        'date_after': 'date__gte',
+        'date_before': 'date__lte',
+    }
+    
+    def _daily_balance_filters(self, request):
+        """
+        Translate the request's filters into AccountDailyBalance lookups.
+        
+        Returns None when the request uses any parameter the daily balance
+        table cannot answer (amount, territory, details, search, ...), in
+        which case callers fall back to aggregating the ledger itself.
+        """
+        params = set(request.query_params) - {'format'}
+        if not params <= set(self.DAILY_BALANCE_FILTERS):
+            return None
+        
+        filterset = self.filterset_class(
+            request.query_params, queryset=self.get_queryset(), request=request
+        )
+        if not filterset.is_valid():
+            return None
+        
+        lookups = {}
+        for name, lookup in self.DAILY_BALANCE_FILTERS.items():
+            value = filterset.form.cleaned_data.get(name)
+            if value is not None:
+                lookups[lookup] = value
+        return lookups
     
     @action(detail=False, methods=['get'])
     def summary(self, request):
@@ -310,7 +433,7 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         queryset = self.filter_queryset(self.get_queryset())
         
         monthly_data = list(
-            queryset.annotate(month=TruncMonth('date__date'))
+            queryset.annotate(month=TruncMonth('posting_date'))
             .values('month')
             .annotate(
                 total_entries=Count('entry_no'),
@@ -327,74 +450,105 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def account_balances(self, request):
-        """Calculate account balances based on filtered entries."""
+        """
+        Calculate account balances based on filtered entries.
+        
+        Totals are grouped in the database (or read from the daily balance
+        table when only company/account/date filters are used); balance is
+        debits - credits. Accounts are ordered by account_key.
+        """
+        daily_filters = self._daily_balance_filters(request)
+        if daily_filters is not None:
+            rows = account_activity_rows(**daily_filters)
+        else:
+            rows = ledger_account_rows(self.filter_queryset(self.get_queryset()))
+        
+        return Response([
+            {
+                'account_key': row['account_key'],
+                'account_name': row['account_name'],
+                'class_name': row['class_name'],
+                'debits': row['debits'],
+                'credits': row['credits'],
+                'balance': row['debits'] - row['credits'],
+                'entry_count': row['entry_count']
+            }
+            for row in rows
+        ])
+    
+    @action(detail=False, methods=['get'])
+    def export_csv(self, request):
+        """
+        Stream filtered ledger entries as CSV.
+        
+        Rows are read from the database in chunks and written to the client
+        as they are produced. Pass ?gzip=true to compress the stream on the fly.
+        """
         queryset = self.filter_queryset(self.get_queryset())
+        compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
         
-        balances = {}
-        for entry in queryset:
-            account_key = entry.account.account_key
-            account_name = entry.account.account
-            
-            if account_key not in balances:
-                balances[account_key] = {
-                    'account_key': account_key,
-                    'account_name': account_name,
-                    'class_name': entry.account.class_name,
-                    'debits': Decimal('0.00'),
-                    'credits': Decimal('0.00'),
-                    'balance': Decimal('0.00'),
-                    'entry_count': 0
-                }
-            
-            balances[account_key]['entry_count'] += 1
-            
-            if entry.transaction_type == 'DEBIT':
-                balances[account_key]['debits'] += entry.amount
-            else:
-                balances[account_key]['credits'] += entry.amount
-            
-            # Calculate balance (debits - credits for most account types)
-            balances[account_key]['balance'] = (
-                balances[account_key]['debits'] - balances[account_key]['credits']
+        if compress:
+            response = StreamingHttpResponse(
+                stream_ledger_csv(queryset, compress=True), content_type='application/gzip'
             )
+            response['Content-Disposition'] = 'attachment; filename="ledger_export.csv.gz"'
+        else:
+            response = StreamingHttpResponse(
+                stream_ledger_csv(queryset), content_type='text/csv'
+            )
+            response['Content-Disposition'] = 'attachment; filename="ledger_export.csv"'
         
-        return Response(list(balances.values()))
-    
+        return response
+
     @action(detail=False, methods=['get'])
-    def export_csv(self, request):
-        """Export filtered ledger entries to CSV."""
+    def export_parquet(self, request):
+        """
+        Stream filtered ledger entries as a Parquet file.
+        
+        Each chunk of rows read from the database is written as one row group;
+        amount is a decimal128(19, 4) column. Requires pyarrow.
+        """
         queryset = self.filter_queryset(self.get_queryset())
         
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="ledger_export.csv"'
+        try:
+            stream = stream_ledger_parquet(queryset)
+        except ImportError:
+            return Response(
+                {'error': 'Parquet export requires the pyarrow package'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
         
-        writer = csv.writer(response)
-        writer.writerow([
-            'Entry No', 'Company', 'Date', 'Account Key', 'Account Name',
-            'Territory', 'Details', 'Amount', 'Transaction Type',
-            'Reference Number', 'Created At'
-        ])
+        response = StreamingHttpResponse(stream, content_type='application/vnd.apache.parquet')
+        response['Content-Disposition'] = 'attachment; filename="ledger_export.parquet"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def export_arrow(self, request):
+        """
+        Stream filtered ledger entries in the Arrow IPC streaming format.
         
-        for entry in queryset:
-            writer.writerow([
-                entry.entry_no,
-                entry.company.company_name,
-                entry.date.date,
-                entry.account.account_key,
-                entry.account.account,
-                f"{entry.territory.country}, {entry.territory.region}" if entry.territory else '',
-                entry.details,
-                entry.amount,
-                entry.transaction_type,
-                entry.reference_number or '',
-                entry.created_at
-            ])
+        Each chunk of rows read from the database is written as one record
+        batch; amount is a decimal128(19, 4) column. Requires pyarrow.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
         
+        try:
+            stream = stream_ledger_arrow(queryset)
+        except ImportError:
+            return Response(
+                {'error': 'Arrow export requires the pyarrow package'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        
+        response = StreamingHttpResponse(stream, content_type='application/vnd.apache.arrow.stream')
+        response['Content-Disposition'] = 'attachment; filename="ledger_export.arrows"'
         return response
 
     # ============ AGGREGATION AND GROUPING CAPABILITIES ============
+    # Results are cached per filter set and ledger version (see result_cache)
     
     @action(detail=False, methods=['get'])
+    @cached_ledger_result
     def summary_by_territory(self, request):
         """
         Group by territory and calculate aggregations.
@@ -416,6 +570,7 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         return Response(list(summary_data))
     
     @action(detail=False, methods=['get'])
+    @cached_ledger_result
     def summary_by_account(self, request):
         """
         Group by account and calculate aggregations.
@@ -424,6 +579,24 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
                        SUM(CASE WHEN Type='CREDIT' THEN Amount ELSE 0 END) as Credits
                        FROM table GROUP BY Account
         """
+        daily_filters = self._daily_balance_filters(request)
+        if daily_filters is not None:
+            summary_data = []
+            for row in account_activity_rows(**daily_filters):
+                total_amount = row['debits'] + row['credits']
+                summary_data.append({
+                    'account__account_key': row['account_key'],
+                    'account__account': row['account_name'],
+                    'account__class_name': row['class_name'],
+                    'total_amount': total_amount,
+                    'count': row['entry_count'],
+                    'average_amount': (total_amount / row['entry_count']).quantize(Decimal('0.0001')),
+                    'debit_total': row['debits'],
+                    'credit_total': row['credits'],
+                    'net_balance': row['debits'] - row['credits']
+                })
+            return Response(summary_data)
+        
         queryset = self.filter_queryset(self.get_queryset())
         
         summary_data = queryset.values('account__account_key', 'account__account', 'account__class_name') \
@@ -445,6 +618,7 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         return Response(list(summary_data))
     
     @action(detail=False, methods=['get'])
+    @cached_ledger_result
     def summary_by_date(self, request):
         """
         Group by date (day, month, or year) and calculate aggregations.
@@ -455,7 +629,7 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         group_by = request.query_params.get('group_by', 'month')  # day, month, year
         
         if group_by == 'day':
-            summary_data = queryset.extra(select={'date_group': "DATE(date)"}) \
+            summary_data = queryset.annotate(date_group=TruncDay('posting_date')) \
                                   .values('date_group') \
                                   .annotate(
                                       total_amount=Sum('amount'),
@@ -464,7 +638,7 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
                                   ) \
                                   .order_by('date_group')
         elif group_by == 'year':
-            summary_data = queryset.annotate(year=TruncYear('date__date')) \
+            summary_data = queryset.annotate(year=TruncYear('posting_date')) \
                                   .values('year') \
                                   .annotate(
                                       total_amount=Sum('amount'),
@@ -473,7 +647,7 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
                                   ) \
                                   .order_by('year')
         else:  # month (default)
-            summary_data = queryset.annotate(month=TruncMonth('date__date')) \
+            summary_data = queryset.annotate(month=TruncMonth('posting_date')) \
                                   .values('month') \
                                   .annotate(
                                       total_amount=Sum('amount'),
@@ -506,6 +680,7 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         return Response(list(summary_data))
     
     @action(detail=False, methods=['get'])
+    @cached_ledger_result
     def summary_by_company(self, request):
         """
         Group by company and calculate aggregations.
@@ -535,76 +710,52 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         return Response(list(summary_data))
     
     @action(detail=False, methods=['get'])
+    @cached_ledger_result
+    def pivot(self, request):
+        """
+        Pivot the ledger by any two dimensions.
+        Query params: rows, columns (territory, account, class, company,
+        transaction_type, year, quarter, month) and value (sum, debit,
+        credit, net, count). Defaults to territory x account sums.
+        SQL Equivalent: SELECT Rows, Columns, SUM(Amount) FROM table GROUP BY Rows, Columns
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+
+        return Response(pivot_payload(
+            queryset,
+            rows=request.query_params.get('rows', 'territory'),
+            columns=request.query_params.get('columns', 'account'),
+            value=request.query_params.get('value', 'sum')
+        ))
+
+    @action(detail=False, methods=['get'])
+    @cached_ledger_result
     def pivot_territory_by_account(self, request):
         """
         Create a pivot table: Territories as rows, Accounts as columns, Amount as values.
         SQL Equivalent: PIVOT operation transforming rows to columns
         """
-        queryset = self.filter_queryset(self.get_queryset())
-        
-        try:
-            import pandas as pd
-            
-            # Convert queryset to DataFrame
-            data = list(queryset.values(
-                'territory__country', 'territory__region', 
-                'account__account', 'amount'
-            ))
-            
-            if not data:
-                return Response({'message': 'No data available for pivot table'})
-            
-            df = pd.DataFrame(data)
-            df['territory'] = df['territory__country'] + ' - ' + df['territory__region']
-            
-            # Create pivot table
-            pivot_table = df.pivot_table(
-                values='amount',
-                index='territory',
-                columns='account__account',
-                aggfunc='sum',
-                fill_value=0
-            )
-            
-            # Convert to dictionary format
-            result = {
-                'territories': list(pivot_table.index),
-                'accounts': list(pivot_table.columns),
-                'data': pivot_table.to_dict('index')
-            }
-            
-            return Response(result)
-            
-        except ImportError:
-            # Fallback without pandas
-            pivot_data = {}
-            
-            for entry in queryset:
-                territory_key = f"{entry.territory.country} - {entry.territory.region}" if entry.territory else "Unknown"
-                account_name = entry.account.account
-                
-                if territory_key not in pivot_data:
-                    pivot_data[territory_key] = {}
-                
-                if account_name not in pivot_data[territory_key]:
-                    pivot_data[territory_key][account_name] = 0
-                
-                pivot_data[territory_key][account_name] += float(entry.amount)
-            
-            # Get all unique accounts
-            all_accounts = set()
-            for territory_data in pivot_data.values():
-                all_accounts.update(territory_data.keys())
-            
-            result = {
-                'territories': list(pivot_data.keys()),
-                'accounts': list(all_accounts),
-                'data': pivot_data
-            }
-            
-            return Response(result)
-    
+        queryset = self.filter_queryset(self.get_queryset()).filter(territory__isnull=False)
+
+        row_keys, column_keys, matrix = pivot_ledger(queryset, rows='territory', columns='account')
+        if not row_keys:
+            return Response({'message': 'No data available for pivot table'})
+
+        accounts = sorted({account_name for _, account_name in column_keys})
+        data = {}
+        for (_, country, region), amounts in zip(row_keys, matrix.tolist()):
+            row = data.setdefault(f"{country} - {region}", dict.fromkeys(accounts, 0.0))
+            for (_, account_name), amount in zip(column_keys, amounts):
+                row[account_name] += amount
+
+        return Response({
+            'territories': sorted(data),
+            'accounts': accounts,
+            'data': data
+        })
+
     @action(detail=False, methods=['get'])
+    @cached_ledger_result
     def advanced_summary(self, request):
         """
         Advanced multi-dimensional summary with dynamic grouping.
@@ -634,11 +785,11 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
                 values_fields.append('transaction_type')
             elif field.strip() == 'date':
                 if date_group == 'year':
-                    queryset = queryset.annotate(date_group=TruncYear('date__date'))
+                    queryset = queryset.annotate(date_group=TruncYear('posting_date'))
                 elif date_group == 'day':
-                    queryset = queryset.extra(select={'date_group': "DATE(date)"})
+                    queryset = queryset.annotate(date_group=TruncDay('posting_date'))
                 else:  # month
-                    queryset = queryset.annotate(date_group=TruncMonth('date__date'))
+                    queryset = queryset.annotate(date_group=TruncMonth('posting_date'))
                 values_fields.append('date_group')
         
         # Build annotations based on metrics
@@ -673,11 +824,14 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         })
 
 
-class JournalEntryViewSet(viewsets.ModelViewSet):
+class JournalEntryViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     """API endpoint for Journal Entries with balance validation."""
-    queryset = JournalEntry.objects.select_related('company', 'date').prefetch_related(
-        'ledger_entries__account', 'ledger_entries__territory'
-    ).all()
+    queryset = JournalEntry.objects.with_totals().select_related('company', 'date').prefetch_related(
+        Prefetch(
+            'ledger_entries',
+            queryset=GeneralLedger.objects.select_related('company', 'date', 'territory', 'account')
+        )
+    )
     serializer_class = JournalEntrySerializer
     filterset_class = JournalEntryFilter
     search_fields = ['description', 'reference_number', 'created_by']
@@ -688,35 +842,33 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
     def balance_report(self, request):
         """Get balance report for journal entries."""
         queryset = self.filter_queryset(self.get_queryset())
-        
-        balanced_count = 0
-        unbalanced_entries = []
-        
-        for journal in queryset:
-            if journal.is_balanced:
-                balanced_count += 1
-            else:
-                unbalanced_entries.append({
-                    'journal_id': journal.journal_id,
-                    'description': journal.description,
-                    'date': journal.date.date,
-                    'total_debits': journal.total_debits,
-                    'total_credits': journal.total_credits,
-                    'difference': journal.get_balance_difference()
-                })
+        total_journals = queryset.count()
+        
+        unbalanced_entries = [
+            {
+                'journal_id': journal.journal_id,
+                'description': journal.description,
+                'date': journal.date.date,
+                'total_debits': journal.total_debits,
+                'total_credits': journal.total_credits,
+                'difference': journal.get_balance_difference()
+            }
+            for journal in queryset.prefetch_related(None).filter(annotated_is_balanced=False)
+        ]
+        balanced_count = total_journals - len(unbalanced_entries)
         
         report = {
-            'total_journals': queryset.count(),
+            'total_journals': total_journals,
             'balanced_journals': balanced_count,
             'unbalanced_journals': len(unbalanced_entries),
-            'balance_percentage': (balanced_count / queryset.count() * 100) if queryset.count() > 0 else 0,
+            'balance_percentage': (balanced_count / total_journals * 100) if total_journals > 0 else 0,
             'unbalanced_entries': unbalanced_entries
         }
         
         return Response(report)
 
 
-class FinancialAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
+class FinancialAnalysisViewSet(SerializerTimingMixin, viewsets.ReadOnlyModelViewSet):
     """
     Specialized viewset for financial analysis and reporting.
     
@@ -727,7 +879,7 @@ class FinancialAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
     - Financial ratios
     """
     queryset = GeneralLedger.objects.select_related(
-        'company', 'date', 'account'
+        'company', 'date', 'account', 'territory'
     ).all()
     serializer_class = GeneralLedgerSerializer
     filterset_class = FinancialAnalysisFilter
@@ -746,8 +898,8 @@ class FinancialAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
         
         queryset = self.get_queryset().filter(
             company_id=company_id,
-            date__date__gte=start_date,
-            date__date__lte=end_date
+            posting_date__gte=start_date,
+            posting_date__lte=end_date
         )
         
         # Revenue accounts (typically credits increase revenue)
@@ -809,15 +961,13 @@ class FinancialAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
                 'error': 'company and as_of_date parameters are required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        queryset = self.get_queryset().filter(
-            company_id=company_id,
-            date__date__lte=as_of_date
-        )
+        # Account totals up to the date in one grouped query
+        rows = trial_balance_rows(company_id, as_of_date)
         
         # Calculate balances by account class
-        assets = self._calculate_class_balance(queryset, 'Asset')
-        liabilities = self._calculate_class_balance(queryset, 'Liability')
-        equity = self._calculate_class_balance(queryset, 'Equity')
+        assets = class_balance(rows, 'Asset')
+        liabilities = class_balance(rows, 'Liability')
+        equity = class_balance(rows, 'Equity')
         
         balance_sheet = {
             'as_of_date': as_of_date,
@@ -837,39 +987,19 @@ class FinancialAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
         ) < 0.01
         
         return Response(balance_sheet)
+
+
+@api_view(['GET', 'DELETE'])
+def request_metrics(request):
+    """
+    Per-route query counts and latency percentiles of this process.
+    GET returns the summary, DELETE clears the recorded samples.
+    """
+    if request.method == 'DELETE':
+        metrics_registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
     
-    def _calculate_class_balance(self, queryset, class_name):
-        """Helper method to calculate balances for an account class."""
-        class_entries = queryset.filter(account__class_name__icontains=class_name)
-        
-        accounts = {}
-        for entry in class_entries:
-            account_key = entry.account.account_key
-            if account_key not in accounts:
-                accounts[account_key] = {
-                    'account_key': account_key,
-                    'account_name': entry.account.account,
-                    'debits': Decimal('0.00'),
-                    'credits': Decimal('0.00'),
-                    'balance': Decimal('0.00')
-                }
-            
-            if entry.transaction_type == 'DEBIT':
-                accounts[account_key]['debits'] += entry.amount
-            else:
-                accounts[account_key]['credits'] += entry.amount
-        
-        # Calculate balances (normal balance depends on account type)
-        for account in accounts.values():
-            if class_name.lower() in ['asset', 'expense']:
-                # Normal debit balance
-                account['balance'] = account['debits'] - account['credits']
-            else:
-                # Normal credit balance (liability, equity, revenue)
-                account['balance'] = account['credits'] - account['debits']
-        
-        return {
-            'class_name': class_name,
-            'accounts': list(accounts.values()),
-            'total': sum(account['balance'] for account in accounts.values())
-        }
\ No newline at end of file
+    return Response({
+        'sample_size': getattr(settings, 'METRICS_SAMPLE_SIZE', 1000),
+        'routes': metrics_registry.summary()
+    })
@@ -16,6 +16,5 @@ class AccountingConfig(AppConfig):
         Perform initialization tasks when the app is ready.
         This method is called when Django starts.
         """
-        # Import signal handlers if any
-        # import accounting.signals
-        pass
\ No newline at end of file
+        # Import signal handlers so AccountDailyBalance stays in sync
+        import accounting.signals  # noqa: F401
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Async function views for the LLM-backed endpoints.
+
+DRF 3.14 dispatches every view synchronously, so under ASGI each ai/* and
+query/* request held a worker thread for the seconds its model calls
+take. async_api_view() turns a coroutine function into a native async
+Django view while keeping DRF's request handling: the method check,
+authentication, permission and throttle checks and body parsing run
+first in a worker thread (they may touch the session table), the
+coroutine then runs on the event loop with the DRF Request, and the DRF
+Response it returns is rendered by Django as usual.
+
+Served by an ASGI server, one process keeps as many model calls in flight
+as there are open requests. Under WSGI the views still work: Django runs
+each one in its own event loop.
+
+Example:
+    @async_api_view(['POST'], permission_classes=[AllowAny])
+    async def translate(request):
+        result = await get_query_agent().aprocess_query(request.data['query'], 1)
+        return Response(result)
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.views import APIView
+
+
+def _initial(checks, request, args, kwargs):
+    """
+    Run DRF's request checks and parse the body.
+
+    Returns:
+        Tuple of (DRF Request, error Response or None)
+    """
+    checks.args, checks.kwargs = args, kwargs
+    drf_request = checks.initialize_request(request, *args, **kwargs)
+    checks.request = drf_request
+    checks.headers = checks.default_response_headers
+    try:
+        checks.initial(drf_request, *args, **kwargs)
+        if request.method.lower() not in checks.http_method_names:
+            raise MethodNotAllowed(request.method)
+        drf_request.data  # parse now, not on the event loop
+    except Exception as exc:
+        response = checks.handle_exception(exc)
+        return drf_request, checks.finalize_response(drf_request, response, *args, **kwargs)
+    return drf_request, None
+
+
+def async_api_view(http_method_names, permission_classes=None):
+    """
+    Decorator for an async view taking a DRF Request and returning a Response.
+
+    Args:
+        http_method_names: Allowed methods, e.g. ['POST'] (OPTIONS is answered
+            with DRF's metadata, as api_view() does)
+        permission_classes: Permission classes (default DEFAULT_PERMISSION_CLASSES)
+    """
+    attributes = {'http_method_names': [method.lower() for method in http_method_names] + ['options']}
+    if permission_classes is not None:
+        attributes['permission_classes'] = permission_classes
+
+    def decorator(view):
+        # APIView subclass doing the DRF checks of this view
+        checks_class = type(view.__name__, (APIView,), {**attributes, '__doc__': view.__doc__})
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            checks = checks_class()
+            drf_request, error = await sync_to_async(_initial)(checks, request, args, kwargs)
+            if error is not None:
+                return error
+            if request.method == 'OPTIONS':
+                response = await sync_to_async(checks.options)(drf_request, *args, **kwargs)
+            else:
+                response = await view(drf_request, *args, **kwargs)
+            return checks.finalize_response(drf_request, response, *args, **kwargs)
+
+        # DRF views are CSRF exempt; SessionAuthentication enforces CSRF itself.
+        # csrf_exempt() would wrap the coroutine function in a sync function.
+        wrapper.csrf_exempt = True
+        return wrapper
+
+    return decorator
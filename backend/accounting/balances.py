@@ -0,0 +1,206 @@
+"""
+Incremental maintenance of the AccountDailyBalance table.
+
+Every GeneralLedger insert, update or delete is translated into a delta on
+the (account, date) row for the entry's calendar date, and the running
+totals of that row and every later row of the account are shifted by the
+same delta. Rows whose entry_count drops to zero are removed so the table
+only holds dates with ledger activity.
+
+Paths that bypass model signals (bulk_create, raw SQL) must call
+refresh_daily_balances() or rebuild_daily_balances() themselves.
+
+Example:
+    apply_ledger_delta(company_id=1, account_id=7, day=date(2024, 1, 31),
+                       debit=Decimal('100.00'), credit=Decimal('0'), count=1)
+"""
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum, Count, Q, OuterRef, Subquery
+
+from .models import AccountDailyBalance, ChartOfAccounts, GeneralLedger
+
+
+ZERO = Decimal('0')
+
+
+def ledger_delta(transaction_type, amount, sign=1):
+    """Return the (debit, credit) delta contributed by a single ledger entry."""
+    amount = Decimal(amount) * sign
+    if transaction_type == 'DEBIT':
+        return amount, ZERO
+    return ZERO, amount
+
+
+def apply_ledger_delta(company_id, account_id, day, debit, credit, count):
+    """
+    Apply a debit/credit delta for one account and calendar date.
+
+    Args:
+        company_id: ID of the company owning the account
+        account_id: ID of the ChartOfAccounts row
+        day: Calendar date (datetime.date) of the ledger activity
+        debit: Change in the day's debit total
+        credit: Change in the day's credit total
+        count: Change in the day's entry count (negative for removals)
+    """
+    if not debit and not credit and not count:
+        return
+
+    with transaction.atomic():
+        day_rows = AccountDailyBalance.objects.filter(account_id=account_id, date=day)
+
+        if count > 0 and not day_rows.exists():
+            # Start the new day from the previous day's running totals
+            previous = AccountDailyBalance.objects.filter(
+                account_id=account_id,
+                date__lt=day
+            ).order_by('-date').values('running_debits', 'running_credits', 'balance').first()
+            previous = previous or {'running_debits': ZERO, 'running_credits': ZERO, 'balance': ZERO}
+            try:
+                with transaction.atomic():
+                    AccountDailyBalance.objects.create(
+                        company_id=company_id,
+                        account_id=account_id,
+                        date=day,
+                        **previous
+                    )
+            except IntegrityError:
+                pass  # a concurrent first posting created the row; update it below
+
+        day_rows.update(
+            debit_total=F('debit_total') + debit,
+            credit_total=F('credit_total') + credit,
+            entry_count=F('entry_count') + count
+        )
+        AccountDailyBalance.objects.filter(account_id=account_id, date__gte=day).update(
+            running_debits=F('running_debits') + debit,
+            running_credits=F('running_credits') + credit,
+            balance=F('balance') + (debit - credit)
+        )
+
+        if count < 0:
+            day_rows.filter(entry_count__lte=0).delete()
+
+
+def _materialize(ledger, existing, batch_size, opening=None):
+    """
+    Replace the existing daily rows with fresh totals grouped from ledger.
+
+    Args:
+        ledger: GeneralLedger queryset to aggregate
+        existing: AccountDailyBalance queryset covering the same accounts and dates
+        batch_size: Rows per bulk_create batch
+        opening: Optional {account_id: (running_debits, running_credits)} to
+            start each account's running totals from
+
+    Returns:
+        Number of daily balance rows created
+    """
+    opening = opening or {}
+    totals = ledger.order_by().values('company_id', 'account_id', day=F('posting_date')).annotate(
+        debit_total=Sum('amount', filter=Q(transaction_type='DEBIT')),
+        credit_total=Sum('amount', filter=Q(transaction_type='CREDIT')),
+        entry_count=Count('pk')
+    ).order_by('account_id', 'day')
+
+    created = 0
+    with transaction.atomic():
+        existing.delete()
+
+        batch = []
+        current_account = None
+        for item in totals.iterator():
+            if item['account_id'] != current_account:
+                current_account = item['account_id']
+                running_debits, running_credits = opening.get(current_account, (ZERO, ZERO))
+
+            debit_total = item['debit_total'] or ZERO
+            credit_total = item['credit_total'] or ZERO
+            running_debits += debit_total
+            running_credits += credit_total
+
+            batch.append(AccountDailyBalance(
+                company_id=item['company_id'],
+                account_id=item['account_id'],
+                date=item['day'],
+                debit_total=debit_total,
+                credit_total=credit_total,
+                entry_count=item['entry_count'],
+                running_debits=running_debits,
+                running_credits=running_credits,
+                balance=running_debits - running_credits
+            ))
+
+            if len(batch) >= batch_size:
+                AccountDailyBalance.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+
+        if batch:
+            AccountDailyBalance.objects.bulk_create(batch)
+            created += len(batch)
+
+    return created
+
+
+def rebuild_daily_balances(company_id=None, batch_size=5000):
+    """
+    Recompute AccountDailyBalance rows from the ledger in one grouped pass.
+
+    Args:
+        company_id: Rebuild a single company, or every company when None
+        batch_size: Rows per bulk_create batch
+
+    Returns:
+        Number of daily balance rows created
+    """
+    ledger = GeneralLedger.objects.all()
+    existing = AccountDailyBalance.objects.all()
+    if company_id is not None:
+        ledger = ledger.filter(company_id=company_id)
+        existing = existing.filter(company_id=company_id)
+
+    return _materialize(ledger, existing, batch_size)
+
+
+def refresh_daily_balances(account_ids, start_date, batch_size=5000):
+    """
+    Recompute the daily rows of some accounts from start_date onward.
+
+    Used after bulk inserts that bypass the ledger signals: rows before
+    start_date are kept and provide the opening running totals, so the
+    cost is proportional to the refreshed period, not the whole history.
+
+    Args:
+        account_ids: IDs of the ChartOfAccounts rows that received entries
+        start_date: Earliest calendar date that received entries
+
+    Returns:
+        Number of daily balance rows created
+    """
+    account_ids = list(account_ids)
+    if not account_ids:
+        return 0
+
+    with transaction.atomic():
+        previous = AccountDailyBalance.objects.filter(
+            account=OuterRef('pk'),
+            date__lt=start_date
+        ).order_by('-date')
+        opening = {
+            item['id']: (item['running_debits'], item['running_credits'])
+            for item in ChartOfAccounts.objects.filter(id__in=account_ids).annotate(
+                running_debits=Subquery(previous.values('running_debits')[:1]),
+                running_credits=Subquery(previous.values('running_credits')[:1])
+            ).filter(running_debits__isnull=False).values('id', 'running_debits', 'running_credits')
+        }
+
+        return _materialize(
+            GeneralLedger.objects.filter(account_id__in=account_ids, posting_date__gte=start_date),
+            AccountDailyBalance.objects.filter(account_id__in=account_ids, date__gte=start_date),
+            batch_size,
+            opening=opening
+        )
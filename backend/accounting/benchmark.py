@@ -0,0 +1,215 @@
+"""
+Benchmark harness for the accounting report and summary endpoints.
+
+run_benchmark() seeds deterministic synthetic companies (see synthetic.py),
+requests every endpoint in BENCH_ENDPOINTS through the Django test client
+and returns per-endpoint timings, query counts and response sizes.
+compare_results() checks a run against a saved baseline so regressions can
+be caught between branches.
+
+Result caching and throttling are disabled while the endpoints are timed,
+so every request computes its result.
+
+Example:
+    results = run_benchmark(companies=1, ledger_rows=1_000_000, repeat=5)
+"""
+
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from .metrics import RequestMetrics
+from .models import ChartOfAccounts
+from .synthetic import seed_synthetic_company
+
+
+# (name, URL name, detail object or None, query parameters)
+# Parameters are formatted with company, start_date, end_date and mid_date.
+BENCH_ENDPOINTS = [
+    ('company_statistics', 'company-statistics', 'company', {}),
+    ('account_hierarchy', 'chartofaccounts-hierarchy', None, {'company': '{company}'}),
+    ('account_usage_statistics', 'chartofaccounts-usage-statistics', 'account', {}),
+    ('calendar_date_ranges', 'calendar-date-ranges', None, {'company': '{company}'}),
+    ('ledger_list', 'generalledger-list', None, {'company': '{company}'}),
+    ('ledger_list_lean', 'generalledger-list', None, {'company': '{company}', 'lean': 'true'}),
+    ('ledger_list_cursor', 'generalledger-list', None, {'company': '{company}', 'pagination': 'cursor'}),
+    ('ledger_summary', 'generalledger-summary', None, {'company': '{company}'}),
+    ('ledger_monthly_analysis', 'generalledger-monthly-analysis', None, {'company': '{company}'}),
+    ('ledger_account_balances', 'generalledger-account-balances', None, {'company': '{company}'}),
+    ('summary_by_territory', 'generalledger-summary-by-territory', None, {'company': '{company}'}),
+    ('summary_by_account', 'generalledger-summary-by-account', None, {'company': '{company}'}),
+    ('summary_by_date', 'generalledger-summary-by-date', None, {'company': '{company}', 'group_by': 'month'}),
+    ('summary_by_transaction_type', 'generalledger-summary-by-transaction-type', None, {'company': '{company}'}),
+    ('summary_by_company', 'generalledger-summary-by-company', None, {}),
+    ('pivot_class_by_month', 'generalledger-pivot', None,
+     {'company': '{company}', 'rows': 'class', 'columns': 'month', 'value': 'net'}),
+    ('pivot_territory_by_account', 'generalledger-pivot-territory-by-account', None, {'company': '{company}'}),
+    ('advanced_summary', 'generalledger-advanced-summary', None,
+     {'company': '{company}', 'group_by': 'territory,account', 'metrics': 'sum,count,avg'}),
+    ('journal_balance_report', 'journalentry-balance-report', None, {'company': '{company}'}),
+    ('profit_loss', 'financial-analysis-profit-loss', None,
+     {'company': '{company}', 'start_date': '{start_date}', 'end_date': '{end_date}'}),
+    ('balance_sheet', 'financial-analysis-balance-sheet', None,
+     {'company': '{company}', 'as_of_date': '{mid_date}'}),
+    ('report_profit_loss', 'profit-loss-report', None,
+     {'company_id': '{company}', 'start_date': '{start_date}', 'end_date': '{end_date}'}),
+    ('report_balance_sheet', 'balance-sheet-report', None,
+     {'company_id': '{company}', 'as_of_date': '{mid_date}'}),
+    ('report_trial_balance', 'trial-balance-report', None,
+     {'company_id': '{company}', 'as_of_date': '{mid_date}'}),
+]
+
+BENCH_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _time_endpoint(client, path, params, repeat):
+    """Request path once to count queries, then repeat times for timing."""
+    metrics = RequestMetrics()
+    with connection.execute_wrapper(metrics):
+        response = client.get(path, params)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        timed = client.get(path, params)
+        if timed.streaming:
+            b''.join(timed.streaming_content)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        'status': response.status_code,
+        'queries': metrics.queries,
+        'db_ms': round(metrics.db_time * 1000, 3),
+        'bytes': len(body),
+        'min_ms': round(timings[0], 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        'max_ms': round(timings[-1], 3),
+    }
+
+
+def run_benchmark(companies=1, ledger_rows=100000, territories=5, days=365 * 3,
+                  start_date=date(2020, 1, 1), seed=42, repeat=5, endpoints=None,
+                  keep=False, progress=None):
+    """
+    Seed synthetic companies and time every benchmark endpoint.
+
+    Args:
+        companies: Number of synthetic companies to seed
+        ledger_rows: GeneralLedger rows per company
+        territories: Territories per company
+        days: Calendar days per company
+        start_date: First calendar date
+        seed: Base random seed; company i uses seed + i
+        repeat: Timed requests per endpoint after one untimed request
+        endpoints: Names of BENCH_ENDPOINTS to run (default all)
+        keep: Commit the seeded data instead of rolling it back
+        progress: Optional callable receiving a message per step
+
+    Returns:
+        Dictionary with the run metadata, dataset description and one
+        result per endpoint, ready for json.dump()
+    """
+    selected = [endpoint for endpoint in BENCH_ENDPOINTS if endpoints is None or endpoint[0] in endpoints]
+    report = progress or (lambda message: None)
+
+    results = []
+    with transaction.atomic():
+        started = time.perf_counter()
+        seeded = []
+        for index in range(companies):
+            seeded.append(seed_synthetic_company(
+                f'Bench Company {index + 1}', ledger_rows=ledger_rows, territories=territories,
+                start_date=start_date, days=days, seed=seed + index
+            ))
+            report(f'Seeded company {index + 1}/{companies}')
+        seed_seconds = time.perf_counter() - started
+
+        company = seeded[0]
+        context = {
+            'company': company.company_id,
+            'start_date': start_date.isoformat(),
+            'end_date': (start_date + timedelta(days=days - 1)).isoformat(),
+            'mid_date': (start_date + timedelta(days=days // 2)).isoformat(),
+        }
+        objects = {
+            'company': company.company_id,
+            'account': ChartOfAccounts.objects.filter(company=company).order_by('account_key')
+                                              .values_list('id', flat=True).first(),
+        }
+
+        client = Client()
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], **BENCH_SETTINGS):
+            for name, url_name, detail, params in selected:
+                path = reverse(url_name, kwargs={'pk': objects[detail]} if detail else None)
+                params = {key: value.format(**context) for key, value in params.items()}
+                result = _time_endpoint(client, path, params, repeat)
+                results.append({'name': name, 'path': path, 'params': params, **result})
+                report(f"{name}: {result['median_ms']:.1f} ms median, {result['queries']} queries")
+
+        if not keep:
+            transaction.set_rollback(True)
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'git_revision': _git_revision(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+        },
+        'dataset': {
+            'companies': companies,
+            'ledger_rows_per_company': ledger_rows - ledger_rows % 2,
+            'territories': territories,
+            'days': days,
+            'start_date': start_date.isoformat(),
+            'seed': seed,
+            'seed_seconds': round(seed_seconds, 3),
+        },
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare_results(baseline, current, threshold=1.2):
+    """
+    Compare median timings of a run with a baseline run.
+
+    Returns:
+        List of (name, baseline median, current median, ratio, regressed)
+        for endpoints present in both runs; regressed is True when the
+        current median exceeds the baseline by more than threshold.
+    """
+    baseline_medians = {result['name']: result['median_ms'] for result in baseline['results']}
+    comparison = []
+    for result in current['results']:
+        before = baseline_medians.get(result['name'])
+        if before is None:
+            continue
+        ratio = result['median_ms'] / before if before else float('inf')
+        comparison.append((result['name'], before, result['median_ms'], ratio, ratio > threshold))
+    return comparison
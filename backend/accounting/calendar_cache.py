@@ -0,0 +1,204 @@
+"""
+Per-process cache of the Calendar dimension.
+
+Write paths look up the Calendar row of (company, date) for every
+transaction. get_calendar() answers from a bounded LRU cache and only
+falls back to get_or_create on a miss, so hot ingestion paths stop
+querying the date dimension once a date has been seen.
+
+Rows are only cached once the transaction that read or created them
+commits, so a rolled-back insert never leaves a dangling id behind.
+Entries are evicted by the Calendar post_save/post_delete signal handlers
+in accounting.signals. Changes that bypass signals (queryset.update(),
+raw SQL) or happen in other processes are not seen; call
+clear_calendar_cache() after such maintenance.
+
+Example:
+    calendar_entry = get_calendar(company.company_id, date(2024, 1, 31))
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Calendar
+
+
+CALENDAR_FIELDS = ['id', 'company_id', 'date', 'year', 'quarter', 'month', 'day']
+
+_cache = OrderedDict()  # (company_id, date) -> tuple of CALENDAR_FIELDS values
+_keys_by_id = {}        # calendar id -> (company_id, date), for eviction
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def calendar_defaults(day):
+    """Return the Calendar field values derived from a date."""
+    return {
+        'year': day.year,
+        'quarter': f"Q{(day.month - 1) // 3 + 1}",
+        'month': day.strftime('%B'),
+        'day': day.strftime('%A')
+    }
+
+
+def _max_size():
+    return getattr(settings, 'CALENDAR_CACHE_SIZE', 10000)
+
+
+def _normalize_date(day):
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return date.fromisoformat(str(day))
+
+
+def _store(rows):
+    """Store rows of CALENDAR_FIELDS values, evicting the least recently used."""
+    with _lock:
+        for values in rows:
+            key = (values[1], values[2])
+            _cache[key] = values
+            _cache.move_to_end(key)
+            _keys_by_id[values[0]] = key
+        while len(_cache) > _max_size():
+            _, evicted = _cache.popitem(last=False)
+            _keys_by_id.pop(evicted[0], None)
+
+
+def _remember(rows):
+    """Cache rows once the current transaction commits (immediately in autocommit)."""
+    rows = list(rows)
+    if rows:
+        transaction.on_commit(lambda: _store(rows))
+
+
+def _instance(values):
+    return Calendar.from_db('default', CALENDAR_FIELDS, values)
+
+
+def get_calendar(company_id, day):
+    """
+    Return the Calendar row for a company and date, creating it if needed.
+
+    Args:
+        company_id: ID of the company
+        day: datetime.date, datetime or ISO date string
+
+    Returns:
+        Calendar instance
+    """
+    day = _normalize_date(day)
+    key = (company_id, day)
+
+    with _lock:
+        values = _cache.get(key)
+        if values is not None:
+            _cache.move_to_end(key)
+            _stats['hits'] += 1
+            return _instance(values)
+        _stats['misses'] += 1
+
+    calendar_entry, _ = Calendar.objects.get_or_create(
+        company_id=company_id,
+        date=day,
+        defaults=calendar_defaults(day)
+    )
+    _remember([tuple(getattr(calendar_entry, field) for field in CALENDAR_FIELDS)])
+    return calendar_entry
+
+
+def get_calendar_ids(company_id, days):
+    """
+    Map many dates to Calendar ids, bulk-creating missing rows.
+
+    Cached dates cost nothing; the rest are fetched with one IN query and
+    any still missing are inserted with one bulk_create.
+
+    Returns:
+        Tuple of ({date: calendar_id}, number of calendar rows created)
+    """
+    days = {_normalize_date(day) for day in days}
+    calendar_ids = {}
+
+    with _lock:
+        for day in days:
+            values = _cache.get((company_id, day))
+            if values is not None:
+                calendar_ids[day] = values[0]
+        _stats['hits'] += len(calendar_ids)
+        _stats['misses'] += len(days) - len(calendar_ids)
+
+    def load(missing_days):
+        rows = Calendar.objects.filter(
+            company_id=company_id, date__in=missing_days
+        ).values_list(*CALENDAR_FIELDS)
+        for values in rows:
+            calendar_ids[values[2]] = values[0]
+        _remember(rows)
+
+    missing = days - set(calendar_ids)
+    if missing:
+        load(missing)
+
+    missing = days - set(calendar_ids)
+    if missing:
+        Calendar.objects.bulk_create(
+            [Calendar(company_id=company_id, date=day, **calendar_defaults(day)) for day in sorted(missing)],
+            ignore_conflicts=True
+        )
+        load(missing)
+
+    return calendar_ids, len(missing)
+
+
+def generate_calendar(company_id, start_date, end_date, batch_size=5000):
+    """
+    Bulk-create the Calendar rows of every day in [start_date, end_date].
+
+    Existing dates are left untouched.
+
+    Returns:
+        Number of calendar rows created
+    """
+    existing = set(
+        Calendar.objects.filter(
+            company_id=company_id, date__range=[start_date, end_date]
+        ).values_list('date', flat=True)
+    )
+
+    rows = []
+    day = start_date
+    while day <= end_date:
+        if day not in existing:
+            rows.append(Calendar(company_id=company_id, date=day, **calendar_defaults(day)))
+        day += timedelta(days=1)
+
+    Calendar.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+    return len(rows)
+
+
+def evict_calendar(calendar_id):
+    """Drop a Calendar row from the cache after it changed or was deleted."""
+    with _lock:
+        key = _keys_by_id.pop(calendar_id, None)
+        if key is not None:
+            _cache.pop(key, None)
+
+
+def clear_calendar_cache():
+    """Empty the cache and reset its statistics."""
+    with _lock:
+        _cache.clear()
+        _keys_by_id.clear()
+        _stats['hits'] = _stats['misses'] = 0
+
+
+def calendar_cache_info():
+    """Return hit/miss counters and the current size of the cache."""
+    with _lock:
+        return {**_stats, 'size': len(_cache), 'max_size': _max_size()}
@@ -0,0 +1,246 @@
+"""
+Streaming exports of general ledger data.
+
+Ledger rows are read with values_list().iterator() so only one chunk of
+plain tuples is held in memory at a time, and the encoded output is
+yielded to a StreamingHttpResponse as it is produced.
+
+CSV is always available. Parquet and Arrow IPC exports need the optional
+pyarrow package and write one row group / record batch per chunk.
+
+Example:
+    response = StreamingHttpResponse(stream_ledger_csv(queryset), content_type='text/csv')
+"""
+
+import csv
+import io
+import zlib
+
+
+# Rows fetched from the database cursor per round trip
+EXPORT_CHUNK_SIZE = 2000
+
+# Flush the CSV buffer to the client once it grows past this many characters
+CSV_FLUSH_SIZE = 64 * 1024
+
+LEDGER_CSV_HEADER = [
+    'Entry No', 'Company', 'Date', 'Account Key', 'Account Name',
+    'Territory', 'Details', 'Amount', 'Transaction Type',
+    'Reference Number', 'Created At'
+]
+
+LEDGER_EXPORT_FIELDS = [
+    'entry_no', 'company__company_name', 'posting_date', 'account__account_key',
+    'account__account', 'territory__country', 'territory__region', 'details',
+    'amount', 'transaction_type', 'reference_number', 'created_at'
+]
+
+
+def ledger_csv_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield CSV rows for the ledger entries in queryset.
+
+    Rows match the columns of LEDGER_CSV_HEADER; territory is rendered as
+    "country, region" and missing values as empty strings.
+    """
+    entries = queryset.values_list(*LEDGER_EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for (entry_no, company_name, entry_date, account_key, account_name, country,
+         region, details, amount, transaction_type, reference_number, created_at) in entries:
+        yield [
+            entry_no,
+            company_name,
+            entry_date,
+            account_key,
+            account_name,
+            f"{country}, {region}" if country is not None else '',
+            details,
+            amount,
+            transaction_type,
+            reference_number or '',
+            created_at
+        ]
+
+
+def stream_ledger_csv(queryset, compress=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the CSV export of queryset as encoded byte chunks.
+
+    Args:
+        queryset: Filtered GeneralLedger queryset
+        compress: Gzip the stream on the fly when True
+        chunk_size: Rows fetched from the database per round trip
+
+    Yields:
+        UTF-8 encoded (optionally gzip-compressed) CSV chunks
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 -> gzip container
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow(LEDGER_CSV_HEADER)
+    for row in ledger_csv_rows(queryset, chunk_size=chunk_size):
+        writer.writerow(row)
+        if buffer.tell() >= CSV_FLUSH_SIZE:
+            chunk = drain()
+            if chunk:
+                yield chunk
+
+    chunk = drain()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+# Columnar export columns: (name, values_list path, arrow type name)
+LEDGER_COLUMNAR_FIELDS = [
+    ('entry_no', 'entry_no', 'int64'),
+    ('company', 'company__company_name', 'string'),
+    ('date', 'posting_date', 'date32'),
+    ('account_key', 'account__account_key', 'int32'),
+    ('account_name', 'account__account', 'string'),
+    ('territory_country', 'territory__country', 'string'),
+    ('territory_region', 'territory__region', 'string'),
+    ('details', 'details', 'string'),
+    ('amount', 'amount', 'amount'),
+    ('transaction_type', 'transaction_type', 'string'),
+    ('reference_number', 'reference_number', 'string'),
+    ('created_at', 'created_at', 'timestamp'),
+]
+
+
+def ledger_arrow_schema():
+    """
+    Build the Arrow schema of the columnar ledger exports.
+
+    amount keeps the GeneralLedger precision as decimal128(19, 4) so no
+    value is rounded through floating point.
+    """
+    import pyarrow as pa
+
+    types = {
+        'int64': pa.int64(),
+        'int32': pa.int32(),
+        'string': pa.string(),
+        'date32': pa.date32(),
+        'amount': pa.decimal128(19, 4),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([
+        pa.field(name, types[type_name])
+        for name, _, type_name in LEDGER_COLUMNAR_FIELDS
+    ])
+
+
+def _record_batch(rows, schema):
+    """Transpose a chunk of values_list rows into an Arrow RecordBatch."""
+    import pyarrow as pa
+
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)],
+        schema=schema
+    )
+
+
+def ledger_record_batches(queryset, schema, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one Arrow RecordBatch per chunk of ledger rows read from the cursor."""
+    paths = [path for _, path, _ in LEDGER_COLUMNAR_FIELDS]
+    entries = queryset.values_list(*paths).iterator(chunk_size=chunk_size)
+
+    rows = []
+    for row in entries:
+        rows.append(row)
+        if len(rows) >= chunk_size:
+            yield _record_batch(rows, schema)
+            rows = []
+
+    if rows:
+        yield _record_batch(rows, schema)
+
+
+class ChunkSink:
+    """
+    Minimal writable file object that hands written bytes back to a generator.
+
+    Arrow writers write into the sink and the export generator drains it
+    after every batch, so the response never buffers more than one batch.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _stream_columnar(queryset, open_writer, chunk_size):
+    """Write record batches through open_writer(sink, schema) and yield the output."""
+    import pyarrow as pa
+
+    schema = ledger_arrow_schema()
+    sink = ChunkSink()
+    writer = open_writer(pa.PythonFile(sink, mode='w'), schema)
+
+    for batch in ledger_record_batches(queryset, schema, chunk_size=chunk_size):
+        writer.write_batch(batch)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+    writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def stream_ledger_parquet(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the Parquet export of queryset, one row group per chunk of rows.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    import pyarrow.parquet as pq
+
+    return _stream_columnar(
+        queryset,
+        lambda sink, schema: pq.ParquetWriter(sink, schema, compression='snappy'),
+        chunk_size
+    )
+
+
+def stream_ledger_arrow(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the Arrow IPC stream export of queryset, one record batch per chunk.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    import pyarrow as pa
+
+    return _stream_columnar(queryset, pa.ipc.new_stream, chunk_size)
@@ -0,0 +1,268 @@
+"""
+Rule-based fast path for simple transaction queries.
+
+Most queries sent to NumerizamAgent follow a handful of rigid shapes:
+
+    Record a sale of $500 for cash on July 18, 2025
+    Pay $200 for office supplies with cash on July 19, 2025
+    Receive $1000 cash from customer on account on July 20, 2025
+    Purchase inventory worth $800 on credit on July 21, 2025
+    Invest $5,000 cash in the business today
+
+fast_parse_transaction() recognises these with regular expressions: it
+extracts the date, the amount and an optional reference number, then
+matches the remaining words against TRANSACTION_RULES to choose the
+debit and credit accounts (named as in ACCOUNT_MAPPINGS, which the LLM
+prompt uses too). Each match gets a confidence score; below
+FAST_PARSE_MIN_CONFIDENCE the query is left to the LLM, which is always
+the case for undated queries. Anything ambiguous (several amounts or
+dates, dates the patterns do not read such as "on Friday", other numbers
+or percentages, several matching rules, unknown accounts, questions,
+negations) is left to the LLM as well.
+
+Hit, fallback and no-match counters are kept per process and reported by
+fast_parse_info().
+
+Example:
+    fields = fast_parse_transaction("Record a sale of $500 for cash on July 18, 2025")
+    # {'date': '2025-07-18', 'debit_account': 'Cash', 'credit_account': 'Sales Revenue',
+    #  'amount': 500.0, 'details': 'Record a sale of $500 for cash on July 18, 2025',
+    #  'reference_number': None}
+"""
+
+import calendar
+import re
+import threading
+from datetime import date, timedelta
+
+from django.conf import settings
+
+
+# Phrase -> account name, shared with the LLM system prompt
+ACCOUNT_MAPPINGS = {
+    'cash': 'Cash',
+    'sales': 'Sales Revenue',
+    'revenue': 'Sales Revenue',
+    'accounts receivable': 'Accounts Receivable',
+    'inventory': 'Inventory',
+    'accounts payable': 'Accounts Payable',
+    'expenses': 'Operating Expenses',
+    'office supplies': 'Office Supplies Expense',
+    'capital': "Owner's Capital",
+    'investment': "Owner's Capital",
+}
+
+# Confidence lost when a detail has to be assumed; an undated query always
+# falls below the default FAST_PARSE_MIN_CONFIDENCE (0.8)
+MISSING_DATE_PENALTY = 0.25
+BARE_AMOUNT_PENALTY = 0.15
+ASSUMED_PAYMENT_PENALTY = 0.25
+
+_MONTHS = {name.lower(): number for number, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): number for number, name in enumerate(calendar.month_abbr) if name})
+_MONTH = '|'.join(sorted(_MONTHS, key=len, reverse=True))
+
+_DATE_PATTERNS = [
+    (re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b'), lambda m: (m[1], m[2], m[3])),
+    (re.compile(rf'\b({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b'),
+     lambda m: (m[3], _MONTHS[m[1]], m[2])),
+    (re.compile(rf'\b(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH})\.?,?\s+(\d{{4}})\b'),
+     lambda m: (m[3], _MONTHS[m[2]], m[1])),
+]
+_RELATIVE_DATES = {'today': 0, 'yesterday': -1}
+
+_REFERENCE = re.compile(
+    r'\b(?:ref(?:erence)?|invoice|inv)\.?\s*(?:no\.?|number|#)?\s*[:#]?\s*([a-z0-9][a-z0-9-]*\d[a-z0-9-]*)\b',
+    re.IGNORECASE
+)
+_DOLLAR_AMOUNT = re.compile(r'\$\s?(\d[\d,]*(?:\.\d{1,2})?)\b')
+_BARE_AMOUNT = re.compile(r'\b(\d[\d,]*(?:\.\d{1,2})?)\b(?:\s*(?:dollars|usd))?')
+
+_WEEKDAY = '|'.join(name.lower() for name in calendar.day_name)
+
+# Date words left over once a date was (not) recognised
+_DATE_HINT = re.compile(
+    rf'\b(?:{_MONTH}|{_WEEKDAY}|last|next|this|ago|tomorrow|weekend)\b'
+    r'|\b\d{1,2}(?:st|nd|rd|th)\b|\bthe \d{1,2}\b'
+    r'|\b(?:19|20)\d{2}\b|\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b'
+)
+
+# Numbers or percentages left over once the amount was taken (discounts,
+# quantities, tax rates) change what should be booked
+_LEFTOVER_NUMBER = re.compile(r'\d|%|\bpercent\b')
+
+# Queries that are not plain "record this transaction" statements
+_DECLINE = re.compile(
+    r"\?|\b(?:not|don't|do not|cancel|reverse|refund|return|returned|undo|delete|how|what|why|show|list)\b"
+)
+
+# Payment method words (debit side for sales, credit side for purchases)
+_ON_CREDIT = re.compile(r'\bon (?:credit|account)\b')
+_CASH = re.compile(r'\bcash\b')
+
+# (name, pattern over the query without date/amount/reference, debit, credit)
+# An account of None is resolved from the payment method; '*' from ACCOUNT_MAPPINGS.
+TRANSACTION_RULES = [
+    ('sale', re.compile(r'\b(?:sale|sales|sold|sell)\b'), None, 'Sales Revenue'),
+    ('customer_receipt', re.compile(r'\b(?:receive|received|collect|collected)\b.*\b(?:customer|receivable|on account)\b'),
+     'Cash', 'Accounts Receivable'),
+    ('owner_investment', re.compile(r'\b(?:invest|invested|investment|contribute|contributed)\b'),
+     'Cash', "Owner's Capital"),
+    ('inventory_purchase', re.compile(r'\b(?:purchase|purchased|buy|bought)\b.*\binventory\b'), 'Inventory', None),
+    ('supplies_purchase', re.compile(r'\b(?:purchase|purchased|buy|bought)\b.*\boffice supplies\b'),
+     'Office Supplies Expense', None),
+    ('supplier_payment', re.compile(r'\b(?:pay|paid)\b.*\b(?:accounts payable|supplier|vendor|creditor)\b'),
+     'Accounts Payable', 'Cash'),
+    ('expense_payment', re.compile(r'\b(?:pay|paid)\b(?!.*\b(?:accounts payable|supplier|vendor|creditor)\b).*\bfor\b'),
+     '*', 'Cash'),
+]
+
+_lock = threading.Lock()
+_stats = {'queries': 0, 'hits': 0, 'low_confidence': 0, 'no_match': 0}
+
+
+def _extract_date(text, today):
+    """Return (date or None, text without the date); raises ValueError if ambiguous."""
+    found = []
+    for pattern, parts in _DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            year, month, day = (int(part) for part in parts(match))
+            found.append((date(year, month, day), match.span()))
+    for word, offset in _RELATIVE_DATES.items():
+        for match in re.finditer(rf'\b{word}\b', text):
+            found.append((today + timedelta(days=offset), match.span()))
+    if not found:
+        return None, text
+    if len(found) > 1:
+        raise ValueError('several dates')
+    day, (start, end) = found[0]
+    return day, text[:start] + ' ' + text[end:]
+
+
+def _extract_amount(text):
+    """
+    Return (amount, explicit, text without the amount); explicit tells
+    whether the amount carried a $ sign. Raises ValueError if ambiguous.
+    """
+    for pattern, explicit in ((_DOLLAR_AMOUNT, True), (_BARE_AMOUNT, False)):
+        amounts = list(pattern.finditer(text))
+        if len(amounts) > 1:
+            raise ValueError('several amounts')
+        if amounts:
+            start, end = amounts[0].span()
+            return float(amounts[0][1].replace(',', '')), explicit, text[:start] + ' ' + text[end:]
+    raise ValueError('no amount')
+
+
+def _mapped_account(text):
+    """Account of the longest ACCOUNT_MAPPINGS phrase in text, other than cash."""
+    for phrase in sorted(ACCOUNT_MAPPINGS, key=len, reverse=True):
+        if phrase != 'cash' and re.search(rf'\b{re.escape(phrase)}\b', text):
+            return ACCOUNT_MAPPINGS[phrase]
+    return None
+
+
+def match_transaction(query, today=None):
+    """
+    Match a query against the transaction rules.
+
+    Returns:
+        Tuple of (TransactionData fields, confidence between 0 and 1), or
+        None if the query does not fit exactly one rule
+    """
+    today = today or date.today()
+    details = ' '.join(query.split())
+    text = details.lower()
+    if _DECLINE.search(text):
+        return None
+
+    reference = _REFERENCE.search(details)
+    try:
+        day, rest = _extract_date(_REFERENCE.sub(' ', text), today)
+        amount, explicit_amount, rest = _extract_amount(rest)
+    except ValueError:
+        return None
+    # Dates the patterns above did not understand and other numbers are left to the LLM
+    if amount <= 0 or _DATE_HINT.search(rest) or _LEFTOVER_NUMBER.search(rest):
+        return None
+
+    rules = [rule for rule in TRANSACTION_RULES if rule[1].search(rest)]
+    if len(rules) != 1:
+        return None
+    _, _, debit, credit = rules[0]
+
+    confidence = 1.0
+    if day is None:
+        day = today
+        confidence -= MISSING_DATE_PENALTY
+    if not explicit_amount:
+        confidence -= BARE_AMOUNT_PENALTY
+
+    # Sales are paid into cash or receivables, purchases out of cash or payables
+    if debit is None or credit is None:
+        on_credit, cash = bool(_ON_CREDIT.search(rest)), bool(_CASH.search(rest))
+        if on_credit and cash:
+            return None
+        if not (on_credit or cash):
+            confidence -= ASSUMED_PAYMENT_PENALTY
+        if debit is None:
+            debit = 'Accounts Receivable' if on_credit else 'Cash'
+        else:
+            credit = 'Accounts Payable' if on_credit else 'Cash'
+    if debit == '*':
+        debit = _mapped_account(rest)
+        if debit is None or debit == credit:
+            return None
+
+    return {
+        'date': day.isoformat(),
+        'debit_account': debit,
+        'credit_account': credit,
+        'amount': amount,
+        'details': details,
+        'reference_number': reference[1] if reference else None,
+    }, round(confidence, 4)
+
+
+def fast_parse_transaction(query, min_confidence=None, today=None):
+    """
+    Parse a simple transaction query without the LLM.
+
+    Args:
+        query: Natural language query
+        min_confidence: Lowest accepted confidence (default FAST_PARSE_MIN_CONFIDENCE)
+        today: Date used for "today", "yesterday" and undated queries
+
+    Returns:
+        Dictionary of TransactionData fields, or None when the LLM should
+        parse the query
+    """
+    if min_confidence is None:
+        min_confidence = getattr(settings, 'FAST_PARSE_MIN_CONFIDENCE', 0.8)
+    match = match_transaction(query, today)
+
+    with _lock:
+        _stats['queries'] += 1
+        if match is None:
+            _stats['no_match'] += 1
+            return None
+        if match[1] < min_confidence:
+            _stats['low_confidence'] += 1
+            return None
+        _stats['hits'] += 1
+    return match[0]
+
+
+def clear_fast_parse_stats():
+    """Reset the fast-path counters."""
+    with _lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def fast_parse_info():
+    """Return the fast-path counters and hit rate."""
+    with _lock:
+        info = dict(_stats)
+    info['hit_rate'] = round(info['hits'] / info['queries'], 4) if info['queries'] else None
+    return info
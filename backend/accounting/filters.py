@@ -11,6 +11,7 @@ Examples of supported queries:
 """
 
 import django_filters
+from decimal import Decimal
 from django.db import models
 from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
 
@@ -47,13 +48,11 @@ class ChartOfAccountsFilter(django_filters.FilterSet):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Dynamically populate choices from database
-        if self.queryset:
-            class_choices = self.queryset.values_list('class_name', 'class_name').distinct()
-            self.filters['class_name'].extra['choices'] = class_choices
-            
-            subclass_choices = self.queryset.values_list('sub_class', 'sub_class').distinct()
-            self.filters['sub_class'].extra['choices'] = subclass_choices
+        # Dynamically populate choices from database, only for the filters in use
+        if self.queryset is not None:
+            for name in ('class_name', 'sub_class'):
+                if name in self.data:
+                    self.filters[name].extra['choices'] = self.queryset.values_list(name, name).distinct()
     
     def filter_account_search(self, queryset, name, value):
         """Search across multiple account fields."""
@@ -138,9 +137,10 @@ class GeneralLedgerFilter(django_filters.FilterSet):
     """
     
     # Date filtering - enables filtering like: /api/general-ledger/?date_after=2025-01-01&date_before=2025-01-31
-    date = django_filters.DateFromToRangeFilter(field_name='date__date')
-    date_after = django_filters.DateFilter(field_name='date__date', lookup_expr='gte')
-    date_before = django_filters.DateFilter(field_name='date__date', lookup_expr='lte')
+    # Uses the denormalised posting_date, so range filters need no Calendar join
+    date = django_filters.DateFromToRangeFilter(field_name='posting_date')
+    date_after = django_filters.DateFilter(field_name='posting_date', lookup_expr='gte')
+    date_before = django_filters.DateFilter(field_name='posting_date', lookup_expr='lte')
     
     # Amount filtering - enables filtering like: /api/general-ledger/?amount__gt=100000
     amount = django_filters.NumberFilter(field_name='amount', lookup_expr='exact')
@@ -167,9 +167,9 @@ class GeneralLedgerFilter(django_filters.FilterSet):
     
     # Date component filters - Django ORM date lookups
     # Enables filtering like: /api/general-ledger/?date__year=2020&date__month=8
-    date__year = django_filters.NumberFilter(field_name='date__date__year')
-    date__month = django_filters.NumberFilter(field_name='date__date__month')
-    date__day = django_filters.NumberFilter(field_name='date__date__day')
+    date__year = django_filters.NumberFilter(field_name='posting_date__year')
+    date__month = django_filters.NumberFilter(field_name='posting_date__month')
+    date__day = django_filters.NumberFilter(field_name='posting_date__day')
     
     # Legacy date component filters (for backward compatibility)
     year = django_filters.NumberFilter(field_name='date__year')
@@ -244,28 +244,44 @@ class JournalEntryFilter(django_filters.FilterSet):
     large_entries = django_filters.BooleanFilter(method='filter_large_entries')
     entries_with_territory = django_filters.BooleanFilter(method='filter_entries_with_territory')
     
+    # Thresholds, e.g. /api/journal-entries/?large_entries=true&large_entries_threshold=10000
+    large_entries_threshold = django_filters.NumberFilter(method='filter_threshold_parameter')
+    unbalanced_tolerance = django_filters.NumberFilter(method='filter_threshold_parameter')
+    
     # Date created filters
     created_after = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
     created_before = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='lte')
     
+    DEFAULT_LARGE_ENTRIES_THRESHOLD = Decimal('50000')
+    
+    def filter_threshold_parameter(self, queryset, name, value):
+        """Threshold parameters only configure other filters."""
+        return queryset
+    
     def filter_unbalanced_entries(self, queryset, name, value):
-        """Filter for journal entries that are not balanced."""
+        """
+        Filter for journal entries that are not balanced, in a single query.
+        
+        With unbalanced_tolerance, differences up to the tolerance count as balanced.
+        """
         if value:
-            unbalanced_ids = []
-            for entry in queryset:
-                if not entry.is_balanced:
-                    unbalanced_ids.append(entry.journal_id)
-            return queryset.filter(journal_id__in=unbalanced_ids)
+            queryset = queryset.with_totals()
+            tolerance = self.form.cleaned_data.get('unbalanced_tolerance')
+            if tolerance is None:
+                return queryset.filter(annotated_is_balanced=False)
+            return queryset.filter(
+                models.Q(annotated_difference__gt=tolerance) |
+                models.Q(annotated_difference__lt=-tolerance)
+            )
         return queryset
     
     def filter_large_entries(self, queryset, name, value):
-        """Filter for journal entries with large total amounts."""
+        """Filter for journal entries whose total debits exceed large_entries_threshold."""
         if value:
-            large_entry_ids = []
-            for entry in queryset:
-                if entry.total_debits > 50000:  # Configurable threshold
-                    large_entry_ids.append(entry.journal_id)
-            return queryset.filter(journal_id__in=large_entry_ids)
+            threshold = self.form.cleaned_data.get('large_entries_threshold')
+            if threshold is None:
+                threshold = self.DEFAULT_LARGE_ENTRIES_THRESHOLD
+            return queryset.with_totals().filter(annotated_debits__gt=threshold)
         return queryset
     
     def filter_entries_with_territory(self, queryset, name, value):
@@ -299,8 +315,8 @@ class FinancialAnalysisFilter(django_filters.FilterSet):
     """
     
     # Date range for analysis
-    analysis_period_start = django_filters.DateFilter(field_name='date__date', lookup_expr='gte')
-    analysis_period_end = django_filters.DateFilter(field_name='date__date', lookup_expr='lte')
+    analysis_period_start = django_filters.DateFilter(field_name='posting_date', lookup_expr='gte')
+    analysis_period_end = django_filters.DateFilter(field_name='posting_date', lookup_expr='lte')
     
     # Account type analysis
     revenue_accounts = django_filters.BooleanFilter(method='filter_revenue_accounts')
@@ -0,0 +1,270 @@
+"""
+High-volume ledger ingestion for the Numerizam Accounting Application.
+
+ingest_journals() validates thousands of journals per call and writes them
+with a fixed number of queries: one IN query each for accounts, territories
+and uncached calendar dates, a bulk insert of missing calendar rows, and batched
+bulk_create of journals and ledger lines inside a single transaction.
+
+Example:
+    result = ingest_journals(company, [
+        {
+            'date': '2024-01-31',
+            'description': 'Office rent',
+            'entries': [
+                {'account_key': 5000, 'amount': '1200.00', 'type': 'DEBIT'},
+                {'account_key': 1000, 'amount': '1200.00', 'type': 'CREDIT'},
+            ]
+        }
+    ])
+"""
+
+import time
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+
+from .balances import refresh_daily_balances
+from .calendar_cache import get_calendar_ids
+from .models import ChartOfAccounts, Territory, GeneralLedger, JournalEntry
+from .result_cache import bump_ledger_version
+
+
+INGEST_BATCH_SIZE = 2000
+
+# Largest absolute amount that fits GeneralLedger.amount (max_digits=19, decimal_places=4)
+MAX_AMOUNT = Decimal('1e15')
+
+
+def _parse_entry(entry, position, label='Entry'):
+    """Validate one ledger line; return (cleaned_entry, errors)."""
+    errors = []
+    if not isinstance(entry, dict):
+        return None, [f"{label} {position}: expected an object"]
+
+    try:
+        account_key = int(entry.get('account_key'))
+    except (TypeError, ValueError):
+        account_key = None
+        errors.append(f"{label} {position}: 'account_key' must be an integer")
+
+    try:
+        amount = Decimal(str(entry.get('amount')))
+        if not amount.is_finite() or amount <= 0 or amount >= MAX_AMOUNT:
+            raise InvalidOperation
+        if amount.as_tuple().exponent < -4:
+            errors.append(f"{label} {position}: 'amount' has more than 4 decimal places")
+    except (InvalidOperation, ValueError):
+        amount = None
+        errors.append(f"{label} {position}: 'amount' must be a positive number")
+
+    transaction_type = str(entry.get('type', '')).upper()
+    if transaction_type not in ('DEBIT', 'CREDIT'):
+        errors.append(f"{label} {position}: 'type' must be 'DEBIT' or 'CREDIT'")
+
+    territory_key = entry.get('territory_key')
+    if territory_key is not None:
+        try:
+            territory_key = int(territory_key)
+        except (TypeError, ValueError):
+            errors.append(f"{label} {position}: 'territory_key' must be an integer")
+
+    details = entry.get('details')
+    if isinstance(details, (dict, list)):
+        errors.append(f"{label} {position}: 'details' must be a string")
+    elif details is not None:
+        details = str(details)
+        if len(details) > 255:
+            errors.append(f"{label} {position}: 'details' must be at most 255 characters")
+
+    return {
+        'account_key': account_key,
+        'amount': amount,
+        'type': transaction_type,
+        'territory_key': territory_key,
+        'details': details,
+    }, errors
+
+
+def validate_journal(journal):
+    """
+    Validate the shape of one journal payload.
+
+    Returns:
+        Tuple of (cleaned journal or None, list of error messages)
+    """
+    if not isinstance(journal, dict):
+        return None, ['Journal must be an object']
+
+    errors = []
+
+    try:
+        journal_date = journal.get('date')
+        if not isinstance(journal_date, date):
+            journal_date = date.fromisoformat(str(journal_date))
+    except ValueError:
+        journal_date = None
+        errors.append("'date' must be an ISO date (YYYY-MM-DD)")
+
+    description = journal.get('description')
+    if not description or len(str(description)) > 255:
+        errors.append("'description' is required and must be at most 255 characters")
+
+    reference_number = journal.get('reference_number')
+    if reference_number is not None and len(str(reference_number)) > 50:
+        errors.append("'reference_number' must be at most 50 characters")
+
+    raw_entries = journal.get('entries')
+    if not isinstance(raw_entries, list) or len(raw_entries) < 2:
+        return None, errors + ['At least two entries are required for a valid journal entry']
+
+    entries = []
+    for position, raw_entry in enumerate(raw_entries):
+        entry, entry_errors = _parse_entry(raw_entry, position)
+        errors.extend(entry_errors)
+        entries.append(entry)
+
+    if errors:
+        return None, errors
+
+    total_debits = sum(entry['amount'] for entry in entries if entry['type'] == 'DEBIT')
+    total_credits = sum(entry['amount'] for entry in entries if entry['type'] == 'CREDIT')
+    if total_debits != total_credits:
+        return None, [f"Debits ({total_debits}) must equal credits ({total_credits})"]
+
+    return {
+        'date': journal_date,
+        'description': str(description),
+        'reference_number': reference_number,
+        'entries': entries,
+    }, []
+
+
+def ingest_journals(company, journals, created_by='API Ingest', batch_size=INGEST_BATCH_SIZE):
+    """
+    Validate and insert many journals with their ledger lines.
+
+    Invalid journals are skipped and reported; valid journals are written
+    together in one transaction.
+
+    Args:
+        company: Company receiving the journals
+        journals: List of journal payloads (date, description,
+            reference_number, entries[account_key, amount, type, details,
+            territory_key])
+        created_by: Value for JournalEntry.created_by
+        batch_size: Rows per bulk_create batch
+
+    Returns:
+        Dictionary with created counts, per-journal errors, elapsed time and
+        throughput in ledger rows per second.
+    """
+    started = time.perf_counter()
+
+    errors = []
+    valid = []
+    for index, journal in enumerate(journals):
+        cleaned, journal_errors = validate_journal(journal)
+        if journal_errors:
+            errors.append({'index': index, 'errors': journal_errors})
+        else:
+            valid.append((index, cleaned))
+
+    # Resolve every dimension key with one IN query each
+    account_keys = {entry['account_key'] for _, journal in valid for entry in journal['entries']}
+    territory_keys = {
+        entry['territory_key'] for _, journal in valid for entry in journal['entries']
+        if entry['territory_key'] is not None
+    }
+    account_ids = dict(
+        ChartOfAccounts.objects.filter(company=company, account_key__in=account_keys)
+        .values_list('account_key', 'id')
+    )
+    territory_ids = dict(
+        Territory.objects.filter(company=company, territory_key__in=territory_keys)
+        .values_list('territory_key', 'id')
+    ) if territory_keys else {}
+
+    resolved = []
+    for index, journal in valid:
+        journal_errors = [
+            f"Entry {position}: unknown account_key {entry['account_key']}"
+            for position, entry in enumerate(journal['entries'])
+            if entry['account_key'] not in account_ids
+        ] + [
+            f"Entry {position}: unknown territory_key {entry['territory_key']}"
+            for position, entry in enumerate(journal['entries'])
+            if entry['territory_key'] is not None and entry['territory_key'] not in territory_ids
+        ]
+        if journal_errors:
+            errors.append({'index': index, 'errors': journal_errors})
+        else:
+            resolved.append(journal)
+
+    ledger_rows = 0
+    calendar_created = 0
+    if resolved:
+        with transaction.atomic():
+            calendar_ids, calendar_created = get_calendar_ids(
+                company.company_id, (journal['date'] for journal in resolved)
+            )
+
+            journal_entries = [
+                JournalEntry(
+                    company=company,
+                    date_id=calendar_ids[journal['date']],
+                    description=journal['description'],
+                    reference_number=journal['reference_number'],
+                    created_by=created_by
+                )
+                for journal in resolved
+            ]
+            if connection.features.can_return_rows_from_bulk_insert:
+                JournalEntry.objects.bulk_create(journal_entries, batch_size=batch_size)
+            else:
+                # Backends that cannot return primary keys from bulk inserts (MySQL)
+                for journal_entry in journal_entries:
+                    journal_entry.save()
+
+            batch = []
+            touched_accounts = set()
+            for journal_entry, journal in zip(journal_entries, resolved):
+                for entry in journal['entries']:
+                    account_id = account_ids[entry['account_key']]
+                    touched_accounts.add(account_id)
+                    batch.append(GeneralLedger(
+                        company=company,
+                        date_id=journal_entry.date_id,
+                        posting_date=journal['date'],
+                        territory_id=territory_ids.get(entry['territory_key']),
+                        account_id=account_id,
+                        journal_entry_id=journal_entry.journal_id,
+                        details=entry['details'] or journal['description'],
+                        amount=entry['amount'],
+                        transaction_type=entry['type'],
+                        reference_number=journal['reference_number']
+                    ))
+                    if len(batch) >= batch_size:
+                        GeneralLedger.objects.bulk_create(batch)
+                        ledger_rows += len(batch)
+                        batch = []
+
+            if batch:
+                GeneralLedger.objects.bulk_create(batch)
+                ledger_rows += len(batch)
+
+            # bulk_create skips the ledger signals
+            refresh_daily_balances(touched_accounts, min(journal['date'] for journal in resolved))
+            bump_ledger_version(company.company_id)
+
+    elapsed = time.perf_counter() - started
+    return {
+        'journals_received': len(journals),
+        'journals_created': len(resolved),
+        'ledger_entries_created': ledger_rows,
+        'calendar_entries_created': calendar_created,
+        'errors': sorted(errors, key=lambda error: error['index']),
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(ledger_rows / elapsed) if elapsed > 0 else ledger_rows,
+    }
@@ -8,6 +8,10 @@ The agent consists of three main nodes:
 1. Parser Node: Extracts structured information from natural language
 2. Validation Node: Validates accounts and data against the database
 3. Execution Node: Creates journal entries in the database
+
+process_query() runs the nodes synchronously; aprocess_query(), used by
+the async AI views, awaits the LLM call on the event loop and runs the
+validation and execution nodes (database work) in a worker thread.
 """
 
 import os
@@ -29,9 +33,19 @@ from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from langchain.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
+from asgiref.sync import sync_to_async
 
 # Django models
 from accounting.models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
+from accounting.calendar_cache import get_calendar
+from accounting.llm_batch import ainvoke_with_backoff, invoke_with_backoff
+from accounting.fast_parser import ACCOUNT_MAPPINGS, fast_parse_transaction
+
+
+# Account mappings listed in the parser prompts (the rule-based fast path uses the same table)
+ACCOUNT_MAPPING_PROMPT = '\n        '.join(
+    f'- "{phrase}" -> "{account}"' for phrase, account in ACCOUNT_MAPPINGS.items()
+)
 
 
 class TransactionData(BaseModel):
@@ -59,28 +73,41 @@ class AgentState(BaseModel):
     validated_data: Optional[Dict[str, Any]] = None
     multiple_validated_data: Optional[List[Dict[str, Any]]] = None
     result: Optional[Dict[str, Any]] = None
+    parsed_by: Optional[str] = None
     errors: List[str] = Field(default_factory=list)
 
 
 class NumerizamAgent:
-    """LangGraph agent for processing accounting transactions."""
+    """
+    LangGraph agent for processing accounting transactions.
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
+    Args:
+        llm: Chat model with an invoke(messages) method (and optionally
+            ainvoke(messages)); defaults to ChatOpenAI
+    """
+    
+    def __init__(self, llm=None):
+        self.llm = llm or ChatOpenAI(
             model="gpt-4.1-mini",
             temperature=0.1,
             api_key=settings.OPENAI_API_KEY
         )
         self.graph = self._build_graph()
+        self.async_graph = self._build_graph(asynchronous=True)
     
-    def _build_graph(self) -> Graph:
-        """Build the LangGraph workflow."""
+    def _build_graph(self, asynchronous: bool = False) -> Graph:
+        """Build the LangGraph workflow (with async nodes for ainvoke if asynchronous)."""
         graph = Graph()
         
         # Add nodes
-        graph.add_node("parser", self.parser_node)
-        graph.add_node("validator", self.validation_node)
-        graph.add_node("executor", self.execution_node)
+        if asynchronous:
+            graph.add_node("parser", self.aparser_node)
+            graph.add_node("validator", self.avalidation_node)
+            graph.add_node("executor", self.aexecution_node)
+        else:
+            graph.add_node("parser", self.parser_node)
+            graph.add_node("validator", self.validation_node)
+            graph.add_node("executor", self.execution_node)
         
         # Add edges
         graph.add_edge("parser", "validator")
@@ -98,26 +125,74 @@ class NumerizamAgent:
         Can handle both single and multiple transactions.
         """
         try:
-            # First, detect if this is a multiple transaction query
-            if self._is_multiple_transaction_query(state.query):
-                return self._parse_multiple_transactions(state)
-            else:
-                return self._parse_single_transaction(state)
+            request = self._parser_request(state)
+            if request is not None:
+                messages, read_response = request
+                try:
+                    response = invoke_with_backoff(self.llm, messages)
+                except Exception as e:
+                    state.errors.append(self._ai_service_error(e, "AI service error"))
+                    return state
+                return read_response(state, response)
                 
         except Exception as e:
-            error_message = str(e)
-            # Check for OpenAI quota errors and provide user-friendly message
-            if "429" in error_message and "quota" in error_message.lower():
-                state.errors.append("AI service quota exceeded. Please try again later or contact support.")
-            elif "insufficient_quota" in error_message:
-                state.errors.append("AI service quota exceeded. Please try again later or contact support.")
-            elif "openai" in error_message.lower() and "api" in error_message.lower():
-                state.errors.append("AI service temporarily unavailable. Please try again later.")
-            else:
-                state.errors.append(f"Parser node error: {error_message}")
+            state.errors.append(self._ai_service_error(e, "Parser node error"))
         
         return state
     
+    async def aparser_node(self, state: AgentState) -> AgentState:
+        """Parser node for the async graph: awaits the LLM instead of blocking."""
+        try:
+            request = self._parser_request(state)
+            if request is not None:
+                messages, read_response = request
+                try:
+                    response = await ainvoke_with_backoff(self.llm, messages)
+                except Exception as e:
+                    state.errors.append(self._ai_service_error(e, "AI service error"))
+                    return state
+                return read_response(state, response)
+                
+        except Exception as e:
+            state.errors.append(self._ai_service_error(e, "Parser node error"))
+        
+        return state
+    
+    def _parser_request(self, state: AgentState):
+        """
+        Choose how a query is parsed.
+        
+        Returns:
+            Tuple of (LLM messages, function reading the response into the
+            state), or None if the rules parsed the query without the LLM
+        """
+        # First, detect if this is a multiple transaction query
+        if self._is_multiple_transaction_query(state.query):
+            state.parsed_by = 'llm'
+            return self._multiple_transactions_messages(state), self._read_multiple_transactions
+        
+        # Simple single transactions are parsed by rules without the LLM
+        fields = fast_parse_transaction(state.query)
+        if fields is not None:
+            state.parsed_data = TransactionData(**fields)
+            state.parsed_by = 'rules'
+            return None
+        
+        state.parsed_by = 'llm'
+        return self._single_transaction_messages(state), self._read_single_transaction
+    
+    def _ai_service_error(self, error: Exception, prefix: str) -> str:
+        """User-facing message of a failed parse."""
+        error_message = str(error)
+        # Check for OpenAI quota errors and provide user-friendly message
+        if "429" in error_message and "quota" in error_message.lower():
+            return "AI service quota exceeded. Please try again later or contact support."
+        elif "insufficient_quota" in error_message:
+            return "AI service quota exceeded. Please try again later or contact support."
+        elif "openai" in error_message.lower() and "api" in error_message.lower():
+            return "AI service temporarily unavailable. Please try again later."
+        return f"{prefix}: {error_message}"
+    
     def _is_multiple_transaction_query(self, query: str) -> bool:
         """Detect if the query contains multiple transactions."""
         # Look for numbered lists or multiple transaction indicators
@@ -155,8 +230,8 @@ class NumerizamAgent:
         # Only consider it multiple transactions if there are clear multiple actions
         return action_count > 1
     
-    def _parse_single_transaction(self, state: AgentState) -> AgentState:
-        """Parse a single transaction query."""
+    def _single_transaction_messages(self, state: AgentState) -> List[Any]:
+        """Prompt messages for a single transaction query."""
         system_prompt = """
         You are an expert accounting assistant. Extract structured transaction information from natural language queries.
         
@@ -169,42 +244,20 @@ class NumerizamAgent:
         - reference_number: Any reference number mentioned (optional)
         
         Common account mappings:
-        - "cash" -> "Cash"
-        - "sales" -> "Sales Revenue"
-        - "revenue" -> "Sales Revenue"
-        - "accounts receivable" -> "Accounts Receivable"
-        - "inventory" -> "Inventory"
-        - "accounts payable" -> "Accounts Payable"
-        - "expenses" -> "Operating Expenses"
-        - "office supplies" -> "Office Supplies Expense"
-        - "capital" -> "Owner's Capital"
-        - "investment" -> "Owner's Capital"
+        """ + ACCOUNT_MAPPING_PROMPT + """
         
         Return the information as a JSON object with the exact field names specified.
         """
         
         user_prompt = f"Extract transaction information from: {state.query}"
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
-        
-        try:
-            response = self.llm.invoke(messages)
-        except Exception as e:
-            error_message = str(e)
-            # Check for OpenAI quota errors and provide user-friendly message
-            if "429" in error_message and "quota" in error_message.lower():
-                state.errors.append("AI service quota exceeded. Please try again later or contact support.")
-            elif "insufficient_quota" in error_message:
-                state.errors.append("AI service quota exceeded. Please try again later or contact support.")
-            elif "openai" in error_message.lower() and "api" in error_message.lower():
-                state.errors.append("AI service temporarily unavailable. Please try again later.")
-            else:
-                state.errors.append(f"AI service error: {error_message}")
-            return state
-        
+    
+    def _read_single_transaction(self, state: AgentState, response) -> AgentState:
+        """Store the transaction of an LLM response on the state."""
         # Debug logging
         print(f"DEBUG: LLM Response type: {type(response.content)}")
         print(f"DEBUG: LLM Response content: '{response.content}'")
@@ -225,8 +278,8 @@ class NumerizamAgent:
             
         return state
     
-    def _parse_multiple_transactions(self, state: AgentState) -> AgentState:
-        """Parse multiple transactions from a single query."""
+    def _multiple_transactions_messages(self, state: AgentState) -> List[Any]:
+        """Prompt messages for a query with several transactions."""
         system_prompt = """
         You are an expert accounting assistant. Extract multiple structured transaction information from natural language queries.
         
@@ -241,16 +294,7 @@ class NumerizamAgent:
         - reference_number: Any reference number mentioned (optional)
         
         Common account mappings:
-        - "cash" -> "Cash"
-        - "sales" -> "Sales Revenue"
-        - "revenue" -> "Sales Revenue"
-        - "accounts receivable" -> "Accounts Receivable"
-        - "inventory" -> "Inventory"
-        - "accounts payable" -> "Accounts Payable"
-        - "expenses" -> "Operating Expenses"
-        - "office supplies" -> "Office Supplies Expense"
-        - "capital" -> "Owner's Capital"
-        - "investment" -> "Owner's Capital"
+        """ + ACCOUNT_MAPPING_PROMPT + """
         
         Return the information as a JSON object with a "transactions" array containing each transaction object.
         Use the exact amounts and details from the query - do not use placeholder or example values.
@@ -258,26 +302,13 @@ class NumerizamAgent:
         
         user_prompt = f"Extract all transaction information from: {state.query}"
         
-        messages = [
+        return [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
-        
-        try:
-            response = self.llm.invoke(messages)
-        except Exception as e:
-            error_message = str(e)
-            # Check for OpenAI quota errors and provide user-friendly message
-            if "429" in error_message and "quota" in error_message.lower():
-                state.errors.append("AI service quota exceeded. Please try again later or contact support.")
-            elif "insufficient_quota" in error_message:
-                state.errors.append("AI service quota exceeded. Please try again later or contact support.")
-            elif "openai" in error_message.lower() and "api" in error_message.lower():
-                state.errors.append("AI service temporarily unavailable. Please try again later.")
-            else:
-                state.errors.append(f"AI service error: {error_message}")
-            return state
-        
+    
+    def _read_multiple_transactions(self, state: AgentState, response) -> AgentState:
+        """Store the transactions of an LLM response on the state."""
         # Debug logging
         print(f"DEBUG: Multiple transactions LLM Response type: {type(response.content)}")
         print(f"DEBUG: Multiple transactions LLM Response content: '{response.content}'")
@@ -317,6 +348,10 @@ class NumerizamAgent:
             state.errors.append("No parsed data found for validation")
             return state
     
+    async def avalidation_node(self, state: AgentState) -> AgentState:
+        """Validation node for the async graph; the ORM lookups run in a worker thread."""
+        return await sync_to_async(self.validation_node)(state)
+    
     def _validate_single_transaction(self, state: AgentState) -> AgentState:
         """Validate a single transaction."""
         try:
@@ -461,6 +496,10 @@ class NumerizamAgent:
             state.errors.append("No validated data found for execution")
             return state
     
+    async def aexecution_node(self, state: AgentState) -> AgentState:
+        """Execution node for the async graph; the database transaction runs in a worker thread."""
+        return await sync_to_async(self.execution_node)(state)
+    
     def _execute_single_transaction(self, state: AgentState) -> AgentState:
         """Execute a single transaction."""
         try:
@@ -625,18 +664,8 @@ class NumerizamAgent:
         return account
     
     def _get_or_create_calendar_entry(self, company: Company, transaction_date: date) -> Calendar:
-        """Get or create calendar entry for the given date."""
-        calendar_entry, created = Calendar.objects.get_or_create(
-            company=company,
-            date=transaction_date,
-            defaults={
-                'year': transaction_date.year,
-                'quarter': f"Q{(transaction_date.month - 1) // 3 + 1}",
-                'month': transaction_date.strftime("%B"),
-                'day': transaction_date.strftime("%A")
-            }
-        )
-        return calendar_entry
+        """Get or create calendar entry for the given date (cached per process)."""
+        return get_calendar(company.company_id, transaction_date)
     
     def _get_or_create_default_territory(self, company: Company) -> Territory:
         """Get or create default territory for the company."""
@@ -667,6 +696,42 @@ class NumerizamAgent:
         
         return content.strip()
     
+    def parse_query(self, query: str, company_id: int) -> AgentState:
+        """
+        Run only the parser node (the LLM call).
+        
+        Parsing does not touch the database, so batches parse many queries
+        concurrently and finish them one at a time with finish_query().
+        """
+        return self.parser_node(AgentState(query=query, company_id=company_id))
+    
+    def finish_query(self, state: AgentState) -> Dict[str, Any]:
+        """Validate and execute a parsed query, as process_query() does."""
+        return self._result(self.execution_node(self.validation_node(state)))
+    
+    async def aparse_query(self, query: str, company_id: int) -> AgentState:
+        """Async parse_query(): awaits the LLM call."""
+        return await self.aparser_node(AgentState(query=query, company_id=company_id))
+    
+    async def afinish_query(self, state: AgentState) -> Dict[str, Any]:
+        """Async finish_query(): validates and executes in a worker thread."""
+        return await sync_to_async(self.finish_query)(state)
+    
+    def _result(self, final_state: AgentState) -> Dict[str, Any]:
+        if final_state.errors:
+            return {
+                'success': False,
+                'errors': final_state.errors,
+                'parsed_data': final_state.parsed_data.dict() if final_state.parsed_data else None
+            }
+        
+        if final_state.result is None:
+            return {
+                'success': False,
+                'errors': ['Unknown error occurred']
+            }
+        return {**final_state.result, 'parsed_by': final_state.parsed_by}
+    
     def process_query(self, query: str, company_id: int) -> Dict[str, Any]:
         """
         Process a natural language query and return the result.
@@ -686,19 +751,15 @@ class NumerizamAgent:
         
         # Run the graph
         final_state = self.graph.invoke(initial_state)
-        
-        # Return result
-        if final_state.errors:
-            return {
-                'success': False,
-                'errors': final_state.errors,
-                'parsed_data': final_state.parsed_data.dict() if final_state.parsed_data else None
-            }
-        
-        return final_state.result or {
-            'success': False,
-            'errors': ['Unknown error occurred']
-        }
+        return self._result(final_state)
+    
+    async def aprocess_query(self, query: str, company_id: int) -> Dict[str, Any]:
+        """
+        Async process_query(): runs the graph with ainvoke, so the event loop
+        keeps serving other requests while the LLM answers.
+        """
+        final_state = await self.async_graph.ainvoke(AgentState(query=query, company_id=company_id))
+        return self._result(final_state)
 
 
 # Global agent instance
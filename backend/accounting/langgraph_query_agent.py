@@ -7,6 +7,10 @@ queries and converts them into structured API calls to the Django REST Framework
 The agent acts as a Natural Language to API translator, converting plain English
 questions into proper API endpoints with filters and parameters.
 
+The agent runs synchronously (process_query) or on the event loop
+(aprocess_query, used by the async query views): the LLM call is awaited
+and the database lookups run in a worker thread.
+
 Example Flow:
 1. User: "Show me all salary expenses from last year for the USA region, broken down by month"
 2. Agent: Translates to API call with proper parameters
@@ -32,9 +36,12 @@ from langgraph.graph import Graph, END
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
+from asgiref.sync import sync_to_async
 
 # Django models for validation
 from accounting.models import Company, ChartOfAccounts, Territory
+from accounting.translation_cache import get_translation_cache
+from accounting.llm_batch import ainvoke_with_backoff, invoke_with_backoff
 
 
 class QueryParameters(BaseModel):
@@ -58,15 +65,28 @@ class QueryAgentState(BaseModel):
 
 
 class NumerizamQueryAgent:
-    """LangGraph agent for translating natural language to API calls."""
+    """
+    LangGraph agent for translating natural language to API calls.
+    
+    Args:
+        llm: Chat model with an invoke(messages) method (and optionally
+            ainvoke(messages)) returning a message whose content is the JSON
+            translation; defaults to ChatOpenAI
+        cache: TranslationCache for successful translations; defaults to
+            the shared cache, pass False to disable caching
+    """
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
+    def __init__(self, llm=None, cache=None):
+        self.llm = llm or ChatOpenAI(
             model="gpt-4.1-mini",
             temperature=0,
             api_key=settings.OPENAI_API_KEY
         )
+        if cache is None:
+            cache = get_translation_cache()
+        self.cache = cache or None
         self.graph = self._build_graph()
+        self.async_graph = self._build_graph(asynchronous=True)
         
         # Available endpoints and their purposes
         self.endpoints = {
@@ -83,13 +103,13 @@ class NumerizamQueryAgent:
             'summary': 'General summary statistics'
         }
     
-    def _build_graph(self) -> Graph:
-        """Build the LangGraph workflow."""
+    def _build_graph(self, asynchronous: bool = False) -> Graph:
+        """Build the LangGraph workflow (with async nodes for ainvoke if asynchronous)."""
         graph = Graph()
         
         # Add nodes
-        graph.add_node("parser", self.parser_node)
-        graph.add_node("validator", self.validation_node)
+        graph.add_node("parser", self.aparser_node if asynchronous else self.parser_node)
+        graph.add_node("validator", self.avalidation_node if asynchronous else self.validation_node)
         graph.add_node("url_builder", self.url_builder_node)
         
         # Add edges
@@ -102,71 +122,85 @@ class NumerizamQueryAgent:
         
         return graph.compile()
     
-    def parser_node(self, state: QueryAgentState) -> QueryAgentState:
-        """
-        Parser Node: Extract structured API parameters from natural language query.
-        """
-        try:
-            system_prompt = f"""
-            You are an expert API translator for an accounting system. Convert natural language queries 
-            into structured API parameters for Django REST Framework endpoints.
+    def _parser_messages(self, state: QueryAgentState) -> List[Any]:
+        """Prompt messages asking the LLM to translate the query."""
+        system_prompt = f"""
+        You are an expert API translator for an accounting system. Convert natural language queries 
+        into structured API parameters for Django REST Framework endpoints.
 
-            Available endpoints and their purposes:
-            {json.dumps(self.endpoints, indent=2)}
+        Available endpoints and their purposes:
+        {json.dumps(self.endpoints, indent=2)}
 
-            Common filter patterns:
-            - Date filters: date__year=2024, date__month=7, date__gte=2024-01-01, date__lte=2024-12-31
-            - Territory filters: territory__country=USA, territory__region=California
-            - Account filters: account__account__icontains=salary, account__class_name=Revenue
-            - Amount filters: amount__gt=1000, amount__lt=5000
-            - Transaction type: transaction_type=DEBIT or transaction_type=CREDIT
-            - Text search: details__icontains=salary, reference_number__icontains=INV
+        Common filter patterns:
+        - Date filters: date__year=2024, date__month=7, date__gte=2024-01-01, date__lte=2024-12-31
+        - Territory filters: territory__country=USA, territory__region=California
+        - Account filters: account__account__icontains=salary, account__class_name=Revenue
+        - Amount filters: amount__gt=1000, amount__lt=5000
+        - Transaction type: transaction_type=DEBIT or transaction_type=CREDIT
+        - Text search: details__icontains=salary, reference_number__icontains=INV
 
-            Grouping options:
-            - group_by: territory, account, company, transaction_type, date
-            - date_group: day, month, year (for date grouping)
-            - metrics: sum, count, avg, max, min
+        Grouping options:
+        - group_by: territory, account, company, transaction_type, date
+        - date_group: day, month, year (for date grouping)
+        - metrics: sum, count, avg, max, min
 
-            Examples:
-            1. "Show salary expenses for USA last year by month" →
-               endpoint: "summary_by_date"
-               filters: {{"details__icontains": "salary", "territory__country": "USA", "date__year": 2024}}
-               group_by: "month"
+        Examples:
+        1. "Show salary expenses for USA last year by month" →
+           endpoint: "summary_by_date"
+           filters: {{"details__icontains": "salary", "territory__country": "USA", "date__year": 2024}}
+           group_by: "month"
 
-            2. "Total revenue by account for Q1 2024" →
-               endpoint: "summary_by_account"
-               filters: {{"account__class_name__icontains": "revenue", "date__gte": "2024-01-01", "date__lte": "2024-03-31"}}
+        2. "Total revenue by account for Q1 2024" →
+           endpoint: "summary_by_account"
+           filters: {{"account__class_name__icontains": "revenue", "date__gte": "2024-01-01", "date__lte": "2024-03-31"}}
 
-            3. "Pivot table of territories vs accounts" →
-               endpoint: "pivot_territory_by_account"
+        3. "Pivot table of territories vs accounts" →
+           endpoint: "pivot_territory_by_account"
 
-            Current year is {datetime.now().year}. Convert relative dates like "last year", "this month", etc.
+        Current year is {datetime.now().year}. Convert relative dates like "last year", "this month", etc.
 
-            Return a JSON object with:
-            - endpoint: The API endpoint to use
-            - filters: Dictionary of query parameters
-            - group_by: Grouping parameter (if applicable)
-            - metrics: Metrics to calculate (if applicable)
-            - date_group: Date grouping (if applicable)
-            - description: Human-readable description of the query
-            """
-            
-            user_prompt = f"Convert this query to API parameters: {state.query}"
-            
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=user_prompt)
-            ]
-            
-            response = self.llm.invoke(messages)
-            
-            # Parse the JSON response
-            try:
-                parsed_json = json.loads(response.content)
-                state.parsed_params = QueryParameters(**parsed_json)
-            except (json.JSONDecodeError, ValueError) as e:
-                state.errors.append(f"Failed to parse LLM response: {str(e)}")
-                
+        Return a JSON object with:
+        - endpoint: The API endpoint to use
+        - filters: Dictionary of query parameters
+        - group_by: Grouping parameter (if applicable)
+        - metrics: Metrics to calculate (if applicable)
+        - date_group: Date grouping (if applicable)
+        - description: Human-readable description of the query
+        """
+        
+        user_prompt = f"Convert this query to API parameters: {state.query}"
+        
+        return [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+    
+    def _read_translation(self, state: QueryAgentState, response) -> QueryAgentState:
+        """Store the parameters of an LLM response on the state."""
+        try:
+            parsed_json = json.loads(response.content)
+            state.parsed_params = QueryParameters(**parsed_json)
+        except (json.JSONDecodeError, ValueError) as e:
+            state.errors.append(f"Failed to parse LLM response: {str(e)}")
+        return state
+    
+    def parser_node(self, state: QueryAgentState) -> QueryAgentState:
+        """
+        Parser Node: Extract structured API parameters from natural language query.
+        """
+        try:
+            response = invoke_with_backoff(self.llm, self._parser_messages(state))
+            self._read_translation(state, response)
+        except Exception as e:
+            state.errors.append(f"Parser node error: {str(e)}")
+        
+        return state
+    
+    async def aparser_node(self, state: QueryAgentState) -> QueryAgentState:
+        """Parser node for the async graph: awaits the LLM instead of blocking."""
+        try:
+            response = await ainvoke_with_backoff(self.llm, self._parser_messages(state))
+            self._read_translation(state, response)
         except Exception as e:
             state.errors.append(f"Parser node error: {str(e)}")
         
@@ -220,6 +254,10 @@ class NumerizamQueryAgent:
         
         return state
     
+    async def avalidation_node(self, state: QueryAgentState) -> QueryAgentState:
+        """Validation node for the async graph; the ORM lookups run in a worker thread."""
+        return await sync_to_async(self.validation_node)(state)
+    
     def url_builder_node(self, state: QueryAgentState) -> QueryAgentState:
         """
         URL Builder Node: Construct the final API URL with parameters.
@@ -321,6 +359,67 @@ class NumerizamQueryAgent:
         
         return filters
     
+    def cached_result(self, query: str, company_id: int) -> Optional[Dict[str, Any]]:
+        """Return the cached translation of a query, or None."""
+        if self.cache is not None:
+            cached = self.cache.get(query, company_id)
+            if cached is not None:
+                return {**cached, 'cached': True}
+        return None
+    
+    def parse_query(self, query: str, company_id: int) -> QueryAgentState:
+        """
+        Run only the parser node (the LLM call).
+        
+        Parsing does not touch the database, so batches parse many queries
+        concurrently and finish them afterwards with finish_query().
+        """
+        return self.parser_node(QueryAgentState(query=query, company_id=company_id))
+    
+    def finish_query(self, state: QueryAgentState) -> Dict[str, Any]:
+        """Validate a parsed query and build its result, as process_query() does."""
+        return self._result(self.url_builder_node(self.validation_node(state)))
+    
+    async def _run_cache_io(self, function, *args):
+        # Calls that may read or write the SQLite cache file stay off the event loop
+        if self.cache is not None and self.cache.path:
+            return await sync_to_async(function, thread_sensitive=False)(*args)
+        return function(*args)
+    
+    async def acached_result(self, query: str, company_id: int) -> Optional[Dict[str, Any]]:
+        """Async cached_result()."""
+        return await self._run_cache_io(self.cached_result, query, company_id)
+    
+    async def aparse_query(self, query: str, company_id: int) -> QueryAgentState:
+        """Async parse_query(): awaits the LLM call."""
+        return await self.aparser_node(QueryAgentState(query=query, company_id=company_id))
+    
+    async def afinish_query(self, state: QueryAgentState) -> Dict[str, Any]:
+        """Async finish_query(): validates in a worker thread."""
+        return await sync_to_async(self.finish_query)(state)
+    
+    def _result(self, final_state: QueryAgentState) -> Dict[str, Any]:
+        if final_state.errors:
+            return {
+                'success': False,
+                'errors': final_state.errors,
+                'parsed_params': final_state.parsed_params.dict() if final_state.parsed_params else None
+            }
+        
+        result = {
+            'success': True,
+            'api_url': final_state.api_url,
+            'endpoint': final_state.validated_params['endpoint'],
+            'filters': final_state.validated_params['filters'],
+            'description': final_state.validated_params['description'],
+            'full_url': f"http://127.0.0.1:8000{final_state.api_url}",
+            'method': 'GET'
+        }
+        # Only validated translations are cached; failures are retried
+        if self.cache is not None:
+            self.cache.set(final_state.query, final_state.company_id, result)
+        return {**result, 'cached': False}
+    
     def process_query(self, query: str, company_id: int) -> Dict[str, Any]:
         """
         Process a natural language query and return the API URL and parameters.
@@ -330,8 +429,13 @@ class NumerizamQueryAgent:
             company_id: ID of the company
             
         Returns:
-            Dictionary containing the API URL and parameters or errors
+            Dictionary containing the API URL and parameters or errors;
+            'cached' tells whether the translation came from the cache
         """
+        cached = self.cached_result(query, company_id)
+        if cached is not None:
+            return cached
+        
         # Initialize state
         initial_state = QueryAgentState(
             query=query,
@@ -340,24 +444,19 @@ class NumerizamQueryAgent:
         
         # Run the graph
         final_state = self.graph.invoke(initial_state)
+        return self._result(final_state)
+    
+    async def aprocess_query(self, query: str, company_id: int) -> Dict[str, Any]:
+        """
+        Async process_query(): runs the graph with ainvoke, so the event loop
+        keeps serving other requests while the LLM answers.
+        """
+        cached = await self.acached_result(query, company_id)
+        if cached is not None:
+            return cached
         
-        # Return result
-        if final_state.errors:
-            return {
-                'success': False,
-                'errors': final_state.errors,
-                'parsed_params': final_state.parsed_params.dict() if final_state.parsed_params else None
-            }
-        
-        return {
-            'success': True,
-            'api_url': final_state.api_url,
-            'endpoint': final_state.validated_params['endpoint'],
-            'filters': final_state.validated_params['filters'],
-            'description': final_state.validated_params['description'],
-            'full_url': f"http://127.0.0.1:8000{final_state.api_url}",
-            'method': 'GET'
-        }
+        final_state = await self.async_graph.ainvoke(QueryAgentState(query=query, company_id=company_id))
+        return await self._run_cache_io(self._result, final_state)
 
 
 # Global query agent instance
@@ -6,14 +6,17 @@ to translate natural language queries into structured API calls.
 
 The views act as a bridge between user queries and the aggregation endpoints,
 providing a natural language interface to the accounting data.
+
+The views are async (see accounting.async_views): translations await the
+LLM on the event loop, and validation and the in-process execution of the
+translated ledger query run in a worker thread.
 """
 
 import json
-import requests
 from typing import Dict, Any
 
+from asgiref.sync import sync_to_async
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.http import JsonResponse
@@ -21,12 +24,14 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 
 from .models import Company
+from .async_views import async_api_view
 from .langgraph_query_agent import get_query_agent
+from .query_dispatch import dispatch_ledger_query
+from .llm_batch import amap_concurrently
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])  # Temporarily disabled for development
-def process_natural_language_query(request):
+@async_api_view(['POST'], permission_classes=[AllowAny])  # Temporarily disabled for development
+async def process_natural_language_query(request):
     """
     Process a natural language query and return the translated API call.
     
@@ -69,7 +74,7 @@ def process_natural_language_query(request):
         
         # Validate company exists and user has access
         try:
-            company = Company.objects.get(company_id=company_id)
+            company = await Company.objects.aget(company_id=company_id)
         except Company.DoesNotExist:
             return Response({
                 'success': False,
@@ -78,7 +83,7 @@ def process_natural_language_query(request):
         
         # Process query with LangGraph agent
         agent = get_query_agent()
-        result = agent.process_query(query, company_id)
+        result = await agent.aprocess_query(query, company_id)
         
         if result['success']:
             return Response(result, status=status.HTTP_200_OK)
@@ -92,9 +97,8 @@ def process_natural_language_query(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])  # Temporarily disabled for development
-def execute_natural_language_query(request):
+@async_api_view(['POST'], permission_classes=[AllowAny])  # Temporarily disabled for development
+async def execute_natural_language_query(request):
     """
     Process a natural language query and execute the resulting API call.
     
@@ -140,7 +144,7 @@ def execute_natural_language_query(request):
         
         # Validate company exists
         try:
-            company = Company.objects.get(company_id=company_id)
+            company = await Company.objects.aget(company_id=company_id)
         except Company.DoesNotExist:
             return Response({
                 'success': False,
@@ -149,55 +153,32 @@ def execute_natural_language_query(request):
         
         # Process query with LangGraph agent
         agent = get_query_agent()
-        translation_result = agent.process_query(query, company_id)
+        translation_result = await agent.aprocess_query(query, company_id)
         
         if not translation_result['success']:
             return Response(translation_result, status=status.HTTP_400_BAD_REQUEST)
         
-        # Execute the API call internally
-        api_url = translation_result['api_url']
+        # Run the translated ledger action in-process
+        api_status, api_data = await sync_to_async(dispatch_ledger_query)(request, translation_result['api_url'])
         
-        # Make internal API call
-        try:
-            # Build full URL for internal request
-            base_url = request.build_absolute_uri('/')[:-1]  # Remove trailing slash
-            full_api_url = f"{base_url}{api_url}"
-            
-            # Make the request with authentication headers
-            headers = {
-                'Authorization': request.META.get('HTTP_AUTHORIZATION', ''),
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.get(full_api_url, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                api_data = response.json()
-                
-                return Response({
-                    'success': True,
-                    'query_translation': {
-                        'api_url': translation_result['api_url'],
-                        'endpoint': translation_result['endpoint'],
-                        'description': translation_result['description'],
-                        'method': translation_result['method']
-                    },
-                    'data': api_data,
-                    'original_query': query
-                }, status=status.HTTP_200_OK)
-            else:
-                return Response({
-                    'success': False,
-                    'error': f'API call failed with status {response.status_code}',
-                    'query_translation': translation_result,
-                    'api_response': response.text[:500]  # First 500 chars of error
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-                
-        except requests.RequestException as e:
+        if api_status == 200:
+            return Response({
+                'success': True,
+                'query_translation': {
+                    'api_url': translation_result['api_url'],
+                    'endpoint': translation_result['endpoint'],
+                    'description': translation_result['description'],
+                    'method': translation_result['method']
+                },
+                'data': api_data,
+                'original_query': query
+            }, status=status.HTTP_200_OK)
+        else:
             return Response({
                 'success': False,
-                'error': f'Failed to execute API call: {str(e)}',
-                'query_translation': translation_result
+                'error': f'API call failed with status {api_status}',
+                'query_translation': translation_result,
+                'api_response': api_data
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
     except Exception as e:
@@ -207,9 +188,8 @@ def execute_natural_language_query(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])  # Temporarily disabled for development
-def batch_process_natural_language_queries(request):
+@async_api_view(['POST'], permission_classes=[AllowAny])  # Temporarily disabled for development
+async def batch_process_natural_language_queries(request):
     """
     Process multiple natural language queries in batch.
     
@@ -242,70 +222,73 @@ def batch_process_natural_language_queries(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         agent = get_query_agent()
-        results = []
+        results = [None] * len(queries)
+        pending = []  # (index, query id, query text, company id) of queries sent to the LLM
         
-        for query_item in queries:
-            query_id = query_item.get('id', f'query_{len(results)}')
+        for index, query_item in enumerate(queries):
+            query_id = query_item.get('id', f'query_{index}')
             query_text = query_item.get('query', '').strip()
             company_id = query_item.get('company_id')
             
             if not query_text or not company_id:
-                results.append({
+                results[index] = {
                     'id': query_id,
                     'success': False,
                     'error': 'Query text and company_id are required'
-                })
+                }
                 continue
             
             # Validate company
             try:
-                Company.objects.get(company_id=company_id)
+                await Company.objects.aget(company_id=company_id)
             except Company.DoesNotExist:
-                results.append({
+                results[index] = {
                     'id': query_id,
                     'success': False,
                     'error': f'Company with ID {company_id} not found'
-                })
+                }
                 continue
             
-            # Process query
+            cached = await agent.acached_result(query_text, company_id)
+            if cached is not None:
+                results[index] = {**cached, 'id': query_id, 'original_query': query_text}
+            else:
+                pending.append((index, query_id, query_text, company_id))
+        
+        # Parse the remaining queries with the LLM concurrently, then
+        # validate them in input order
+        parsed = await amap_concurrently(lambda item: agent.aparse_query(item[2], item[3]), pending)
+        for (index, query_id, query_text, company_id), (state, error) in zip(pending, parsed):
             try:
-                result = agent.process_query(query_text, company_id)
+                if error is not None:
+                    raise error
+                result = await agent.afinish_query(state)
                 result['id'] = query_id
                 result['original_query'] = query_text
-                
-                # Execute if requested
-                if execute and result['success']:
-                    try:
-                        # Make internal API call (simplified version)
-                        api_url = result['api_url']
-                        base_url = request.build_absolute_uri('/')[:-1]
-                        full_api_url = f"{base_url}{api_url}"
-                        
-                        headers = {
-                            'Authorization': request.META.get('HTTP_AUTHORIZATION', ''),
-                            'Content-Type': 'application/json'
-                        }
-                        
-                        response = requests.get(full_api_url, headers=headers, timeout=30)
-                        
-                        if response.status_code == 200:
-                            result['data'] = response.json()
-                        else:
-                            result['execution_error'] = f'API call failed with status {response.status_code}'
-                            
-                    except Exception as e:
-                        result['execution_error'] = f'Failed to execute: {str(e)}'
-                
-                results.append(result)
-                
+                results[index] = result
             except Exception as e:
-                results.append({
+                results[index] = {
                     'id': query_id,
                     'success': False,
                     'error': f'Processing error: {str(e)}',
                     'original_query': query_text
-                })
+                }
+        
+        # Execute if requested, one query at a time
+        if execute:
+            for result in results:
+                if not result['success']:
+                    continue
+                try:
+                    api_status, api_data = await sync_to_async(dispatch_ledger_query)(request, result['api_url'])
+                    
+                    if api_status == 200:
+                        result['data'] = api_data
+                    else:
+                        result['execution_error'] = f'API call failed with status {api_status}'
+                        
+                except Exception as e:
+                    result['execution_error'] = f'Failed to execute: {str(e)}'
         
         return Response({
             'success': True,
@@ -322,9 +305,8 @@ def batch_process_natural_language_queries(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
-@permission_classes([AllowAny])  # Temporarily disabled for development
-def query_agent_capabilities(request):
+@async_api_view(['GET'], permission_classes=[AllowAny])  # Temporarily disabled for development
+async def query_agent_capabilities(request):
     """
     Get information about the query agent's capabilities and available endpoints.
     
@@ -384,8 +366,8 @@ def query_agent_capabilities(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['GET'])
-def query_agent_status(request):
+@async_api_view(['GET'])
+async def query_agent_status(request):
     """
     Check the status of the query agent.
     
@@ -397,6 +379,7 @@ def query_agent_status(request):
             'status': 'active',
             'agent_type': 'NumerizamQueryAgent',
             'capabilities': len(agent.endpoints),
+            'translation_cache': agent.cache.stats() if agent.cache is not None else None,
             'version': '1.0.0'
         }, status=status.HTTP_200_OK)
         
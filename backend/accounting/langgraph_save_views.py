@@ -10,13 +10,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.db import transaction
+from django.db.models import Count
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from datetime import datetime, date
 from decimal import Decimal
 import json
 
-from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
+from .models import Company, ChartOfAccounts, Territory, GeneralLedger, JournalEntry
+from .calendar_cache import get_calendar
 
 
 @api_view(['POST'])
@@ -148,16 +150,7 @@ def _save_transaction_results(company, query_text, results, metadata):
                 )
             
             # Get or create calendar entry
-            calendar_entry, created = Calendar.objects.get_or_create(
-                company=company,
-                date=entry_date,
-                defaults={
-                    'year': entry_date.year,
-                    'quarter': f'Q{(entry_date.month - 1) // 3 + 1}',
-                    'month': entry_date.strftime('%B'),
-                    'day': entry_date.strftime('%A')
-                }
-            )
+            calendar_entry = get_calendar(company.company_id, entry_date)
             
             # Create journal entry
             journal_entry = JournalEntry.objects.create(
@@ -280,16 +273,7 @@ def _save_report_results(company, query_text, results, metadata):
         
         # Create a journal entry to log the report query
         today = date.today()
-        calendar_entry, created = Calendar.objects.get_or_create(
-            company=company,
-            date=today,
-            defaults={
-                'year': today.year,
-                'quarter': f'Q{(today.month - 1) // 3 + 1}',
-                'month': today.strftime('%B'),
-                'day': today.strftime('%A')
-            }
-        )
+        calendar_entry = get_calendar(company.company_id, today)
         
         # Create a log entry as a journal entry
         log_entry = JournalEntry.objects.create(
@@ -342,8 +326,10 @@ def get_saved_queries(request):
             )
         
         # Get recent journal entries (both transactions and logs)
-        recent_entries = JournalEntry.objects.filter(
+        recent_entries = JournalEntry.objects.with_totals().filter(
             company=company
+        ).select_related('date').annotate(
+            ledger_entry_count=Count('ledger_entries')
         ).order_by('-created_at')[:50]
         
         entries_data = []
@@ -358,7 +344,7 @@ def get_saved_queries(request):
                 'is_balanced': entry.is_balanced,
                 'total_debits': float(entry.total_debits),
                 'total_credits': float(entry.total_credits),
-                'entry_count': entry.ledger_entries.count()
+                'entry_count': entry.ledger_entry_count
             }
             entries_data.append(entry_data)
         
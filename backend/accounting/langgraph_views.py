@@ -3,10 +3,13 @@ Django REST API views for LangGraph integration.
 
 This module provides API endpoints for the LangGraph agent to process
 natural language queries and create accounting transactions.
+
+The views are async (see accounting.async_views): while the agent waits
+for the LLM the event loop serves other requests, and database work runs
+in a worker thread.
 """
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.http import JsonResponse
@@ -14,13 +17,15 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 import json
 
+from .async_views import async_api_view
 from .langgraph_agent import get_agent
+from .llm_batch import amap_concurrently
+from .fast_parser import fast_parse_info
 from .models import Company
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])  # Temporarily disabled for development
-def process_natural_language_query(request):
+@async_api_view(['POST'], permission_classes=[AllowAny])  # Temporarily disabled for development
+async def process_natural_language_query(request):
     """
     Process a natural language query using the LangGraph agent.
     
@@ -57,7 +62,7 @@ def process_natural_language_query(request):
         
         # Verify company exists
         try:
-            company = Company.objects.get(company_id=company_id)
+            company = await Company.objects.aget(company_id=company_id)
             print(f"DEBUG: Found company: {company.company_name}")
         except Company.DoesNotExist:
             print(f"DEBUG: Company with ID {company_id} not found")
@@ -70,7 +75,7 @@ def process_natural_language_query(request):
         print("DEBUG: Getting LangGraph transaction agent...")
         agent = get_agent()
         print("DEBUG: Processing query with agent...")
-        result = agent.process_query(query, company_id)
+        result = await agent.aprocess_query(query, company_id)
         print(f"DEBUG: Agent result: {result}")
         
         if result.get('success'):
@@ -98,9 +103,8 @@ def process_natural_language_query(request):
         )
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])  # Temporarily disabled for development
-def batch_process_queries(request):
+@async_api_view(['POST'], permission_classes=[AllowAny])  # Temporarily disabled for development
+async def batch_process_queries(request):
     """
     Process multiple natural language queries in batch.
     
@@ -129,41 +133,54 @@ def batch_process_queries(request):
             )
         
         agent = get_agent()
-        results = []
+        results = [None] * len(queries)
+        pending = []  # (index, query, company_id) of queries sent to the LLM
         
         for i, query_data in enumerate(queries):
             query = query_data.get('query')
             company_id = query_data.get('company_id')
             
             if not query or not company_id:
-                results.append({
+                results[i] = {
                     'index': i,
                     'success': False,
                     'error': 'Query and company_id are required'
-                })
+                }
                 continue
             
             try:
                 # Verify company exists
-                Company.objects.get(company_id=company_id)
-                
-                # Process query
-                result = agent.process_query(query, company_id)
-                result['index'] = i
-                results.append(result)
-                
+                await Company.objects.aget(company_id=company_id)
+                pending.append((i, query, company_id))
             except Company.DoesNotExist:
-                results.append({
+                results[i] = {
                     'index': i,
                     'success': False,
                     'error': f'Company with ID {company_id} not found'
-                })
+                }
+            except Exception as e:
+                results[i] = {
+                    'index': i,
+                    'success': False,
+                    'error': f'Error processing query: {str(e)}'
+                }
+        
+        # Parse with the LLM concurrently, then validate and create the
+        # transactions one at a time in input order
+        parsed = await amap_concurrently(lambda item: agent.aparse_query(item[1], item[2]), pending)
+        for (i, query, company_id), (state, error) in zip(pending, parsed):
+            try:
+                if error is not None:
+                    raise error
+                result = await agent.afinish_query(state)
+                result['index'] = i
+                results[i] = result
             except Exception as e:
-                results.append({
+                results[i] = {
                     'index': i,
                     'success': False,
                     'error': f'Error processing query: {str(e)}'
-                })
+                }
         
         return Response({
             'results': results,
@@ -178,9 +195,8 @@ def batch_process_queries(request):
         )
 
 
-@api_view(['GET'])
-@permission_classes([AllowAny])  # Temporarily disabled for development
-def agent_status(request):
+@async_api_view(['GET'], permission_classes=[AllowAny])  # Temporarily disabled for development
+async def agent_status(request):
     """
     Get the status of the LangGraph agent.
     """
@@ -190,6 +206,7 @@ def agent_status(request):
             'status': 'active',
             'model': 'gpt-4.1-mini',
             'nodes': ['parser', 'validator', 'executor'],
+            'fast_path': fast_parse_info(),
             'message': 'LangGraph transaction agent is ready to process queries'
         }, status=status.HTTP_200_OK)
         
@@ -200,9 +217,8 @@ def agent_status(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])  # Temporarily disabled for development
-def validate_query(request):
+@async_api_view(['POST'], permission_classes=[AllowAny])  # Temporarily disabled for development
+async def validate_query(request):
     """
     Validate a natural language query without executing it.
     
@@ -231,7 +247,7 @@ def validate_query(request):
         
         # Verify company exists
         try:
-            Company.objects.get(company_id=company_id)
+            await Company.objects.aget(company_id=company_id)
         except Company.DoesNotExist:
             return Response(
                 {'error': f'Company with ID {company_id} not found'},
@@ -245,8 +261,8 @@ def validate_query(request):
         
         # Run only parser and validator nodes
         state = AgentState(query=query, company_id=company_id)
-        state = agent.parser_node(state)
-        state = agent.validation_node(state)
+        state = await agent.aparser_node(state)
+        state = await agent.avalidation_node(state)
         
         if state.errors:
             return Response({
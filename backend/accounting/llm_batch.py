@@ -0,0 +1,190 @@
+"""
+Concurrency helpers for the LLM-backed agents.
+
+Batch endpoints used to parse one query after another, so a batch took
+as long as all of its model calls added up. The agents now split a query
+into the LLM parse step, which map_concurrently() fans out over a
+bounded thread pool, and the validation/execution step, which the views
+run afterwards in the request thread in input order, so database writes
+stay serialised.
+
+invoke_with_backoff() wraps every model call: rate-limit responses (HTTP
+429) are retried with jittered exponential backoff, honouring a
+Retry-After header, instead of failing the query. Exhausted quotas are
+not retried.
+
+The async views use the coroutine counterparts: ainvoke_with_backoff()
+awaits the model's ainvoke(), and amap_concurrently() runs the parse
+coroutines on the event loop behind a semaphore, so waiting on the model
+ties up neither a thread nor a worker.
+
+Settings:
+    LLM_BATCH_CONCURRENCY: Model calls in flight per batch request
+    LLM_RATE_LIMIT_RETRIES: Retries of a rate-limited model call
+    LLM_RATE_LIMIT_BACKOFF: First retry delay in seconds (doubles per retry)
+
+Example:
+    outcomes = map_concurrently(agent.parse_query, pending)
+    for state, error in outcomes:
+        ...
+"""
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+MAX_BACKOFF_SECONDS = 30
+
+
+def is_rate_limit_error(error):
+    """Return True if a model call failed because of a (temporary) rate limit."""
+    message = str(error).lower()
+    if 'insufficient_quota' in message:
+        return False  # an exhausted quota does not recover by waiting
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    return '429' in message or 'rate limit' in message or 'rate_limit' in message
+
+
+def _retry_after(error):
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_settings(retries, base_delay):
+    if retries is None:
+        retries = getattr(settings, 'LLM_RATE_LIMIT_RETRIES', 4)
+    if base_delay is None:
+        base_delay = getattr(settings, 'LLM_RATE_LIMIT_BACKOFF', 1.0)
+    return retries, base_delay
+
+
+def _backoff_delay(error, attempt, base_delay):
+    delay = _retry_after(error)
+    if delay is None:
+        delay = min(base_delay * 2 ** attempt, MAX_BACKOFF_SECONDS) * random.uniform(0.5, 1.0)
+    return delay
+
+
+def invoke_with_backoff(llm, messages, retries=None, base_delay=None, sleep=time.sleep):
+    """
+    Call llm.invoke(messages), retrying rate-limited calls.
+
+    Args:
+        llm: Chat model
+        messages: Messages passed to invoke()
+        retries: Retries after the first attempt (default LLM_RATE_LIMIT_RETRIES)
+        base_delay: First retry delay in seconds (default LLM_RATE_LIMIT_BACKOFF)
+        sleep: Function used to wait, replaceable in tests
+
+    Returns:
+        The model response
+
+    Raises:
+        The last error once retries are exhausted, or any error that is not
+        a rate limit
+    """
+    retries, base_delay = _backoff_settings(retries, base_delay)
+
+    for attempt in range(retries + 1):
+        try:
+            return llm.invoke(messages)
+        except Exception as e:
+            if attempt == retries or not is_rate_limit_error(e):
+                raise
+            sleep(_backoff_delay(e, attempt, base_delay))
+
+
+async def ainvoke_with_backoff(llm, messages, retries=None, base_delay=None, sleep=asyncio.sleep):
+    """
+    Await llm.ainvoke(messages), retrying rate-limited calls.
+
+    Models without ainvoke() are called with invoke() in a worker thread.
+    Arguments, return value and errors are those of invoke_with_backoff();
+    sleep is a coroutine function.
+    """
+    retries, base_delay = _backoff_settings(retries, base_delay)
+    ainvoke = getattr(llm, 'ainvoke', None) or sync_to_async(llm.invoke, thread_sensitive=False)
+
+    for attempt in range(retries + 1):
+        try:
+            return await ainvoke(messages)
+        except Exception as e:
+            if attempt == retries or not is_rate_limit_error(e):
+                raise
+            await sleep(_backoff_delay(e, attempt, base_delay))
+
+
+def map_concurrently(function, items, max_workers=None):
+    """
+    Call function(item) for every item on a bounded thread pool.
+
+    Args:
+        function: Callable taking one item
+        items: Iterable of items
+        max_workers: Calls in flight at once (default LLM_BATCH_CONCURRENCY)
+
+    Returns:
+        List of (result, error) tuples in input order; error is None on
+        success and the raised exception otherwise
+    """
+    items = list(items)
+    if not items:
+        return []
+    if max_workers is None:
+        max_workers = getattr(settings, 'LLM_BATCH_CONCURRENCY', 8)
+
+    def call(item):
+        try:
+            return function(item)
+        finally:
+            # Worker threads get their own database connections; never leave them open
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))),
+                            thread_name_prefix='llm-batch') as executor:
+        futures = [executor.submit(call, item) for item in items]
+
+    outcomes = []
+    for future in futures:
+        try:
+            outcomes.append((future.result(), None))
+        except Exception as e:
+            outcomes.append((None, e))
+    return outcomes
+
+
+async def amap_concurrently(function, items, limit=None):
+    """
+    Await function(item) for every item with a bounded number in flight.
+
+    Args:
+        function: Coroutine function taking one item
+        items: Iterable of items
+        limit: Calls in flight at once (default LLM_BATCH_CONCURRENCY)
+
+    Returns:
+        List of (result, error) tuples in input order, as map_concurrently()
+    """
+    items = list(items)
+    if limit is None:
+        limit = getattr(settings, 'LLM_BATCH_CONCURRENCY', 8)
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def call(item):
+        async with semaphore:
+            try:
+                return await function(item), None
+            except Exception as e:
+                return None, e
+
+    return list(await asyncio.gather(*(call(item) for item in items)))
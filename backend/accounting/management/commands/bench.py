@@ -0,0 +1,87 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from accounting.benchmark import BENCH_ENDPOINTS, compare_results, run_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Time the report and summary endpoints against a seeded synthetic ledger and write JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=1, help='Synthetic companies to seed')
+        parser.add_argument('--rows', type=int, default=100000, help='GeneralLedger rows per company')
+        parser.add_argument('--territories', type=int, default=5, help='Territories per company')
+        parser.add_argument('--days', type=int, default=365 * 3, help='Calendar days per company')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic data')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per endpoint')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Only time this endpoint (repeatable); see --list')
+        parser.add_argument('--list', action='store_true', help='List the benchmark endpoints and exit')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument('--compare', help='Baseline JSON results to compare median timings against')
+        parser.add_argument('--threshold', type=float, default=1.2,
+                            help='Median slowdown ratio counted as a regression with --compare')
+        parser.add_argument('--keep', action='store_true', help='Keep the seeded data instead of rolling it back')
+
+    def handle(self, *args, **options):
+        names = [endpoint[0] for endpoint in BENCH_ENDPOINTS]
+        if options['list']:
+            self.stdout.write('\n'.join(names))
+            return
+
+        unknown = set(options['endpoints'] or []) - set(names)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        for option in ('companies', 'rows', 'days', 'repeat'):
+            if options[option] < 1:
+                raise CommandError(f'--{option} must be positive')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"{options['compare']}: {e}")
+
+        results = run_benchmark(
+            companies=options['companies'],
+            ledger_rows=options['rows'],
+            territories=options['territories'],
+            days=options['days'],
+            seed=options['seed'],
+            repeat=options['repeat'],
+            endpoints=options['endpoints'],
+            keep=options['keep'],
+            progress=lambda message: self.stderr.write(message) if options['verbosity'] > 1 else None
+        )
+
+        failed = [result['name'] for result in results['results'] if result['status'] != 200]
+        for result in results['results']:
+            self.stderr.write(
+                f"{result['name']:<30} {result['median_ms']:>10.1f} ms  "
+                f"{result['queries']:>4} queries  {result['bytes']:>10} bytes  HTTP {result['status']}"
+            )
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Wrote {len(results['results'])} results to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        regressions = []
+        if baseline is not None:
+            for name, before, after, ratio, regressed in compare_results(baseline, results, options['threshold']):
+                if regressed:
+                    regressions.append(name)
+                style = self.style.ERROR if regressed else self.style.SUCCESS
+                self.stderr.write(style(f'{name:<30} {before:>10.1f} -> {after:>10.1f} ms  x{ratio:.2f}'))
+
+        if failed:
+            raise CommandError(f"Endpoints did not return HTTP 200: {', '.join(failed)}")
+        if regressions:
+            raise CommandError(
+                f"Median slower than x{options['threshold']} of the baseline: {', '.join(regressions)}"
+            )
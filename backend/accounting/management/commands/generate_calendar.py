@@ -0,0 +1,38 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from accounting.calendar_cache import generate_calendar
+from accounting.models import Company
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate Calendar rows for a company across a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company-id', type=int, help='Company to generate dates for (default: all companies)')
+        parser.add_argument('--start', required=True, help='First date (YYYY-MM-DD)')
+        parser.add_argument('--end', required=True, help='Last date (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start'])
+            end_date = date.fromisoformat(options['end'])
+        except ValueError:
+            raise CommandError('--start and --end must be dates in YYYY-MM-DD format')
+        if start_date > end_date:
+            raise CommandError('--start must not be after --end')
+
+        companies = Company.objects.all()
+        if options['company_id'] is not None:
+            companies = companies.filter(company_id=options['company_id'])
+            if not companies.exists():
+                raise CommandError(f"Company with ID {options['company_id']} not found")
+
+        for company in companies:
+            created = generate_calendar(company.company_id, start_date, end_date)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{company.company_name}: created {created} calendar rows '
+                    f'from {start_date} to {end_date}'
+                )
+            )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from accounting.ledger_import import IMPORT_CHUNK_SIZE, LedgerImportError, import_ledger
+from accounting.models import Company
+
+
+class Command(BaseCommand):
+    help = 'Import historical ledger rows from CSV or Parquet files (COPY on PostgreSQL, bulk_create elsewhere)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV (.csv, .csv.gz) or Parquet (.parquet) files')
+        parser.add_argument('--company-id', type=int, help='Company for rows without a company_id column')
+        parser.add_argument('--created-by', default='Ledger Import', help='Value for JournalEntry.created_by')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Rows per COPY or bulk_create batch')
+
+    def handle(self, *args, **options):
+        company_id = options['company_id']
+        if company_id is not None and not Company.objects.filter(company_id=company_id).exists():
+            raise CommandError(f"Company with ID {company_id} not found")
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        for path in options['paths']:
+            try:
+                result = import_ledger(
+                    path,
+                    company_id=company_id,
+                    created_by=options['created_by'],
+                    chunk_size=options['chunk_size']
+                )
+            except OSError as e:
+                raise CommandError(f"{path}: {e}")
+            except LedgerImportError as e:
+                raise CommandError(
+                    f"{path}: {e}; nothing was imported\n" + '\n'.join(e.errors)
+                )
+            except IntegrityError as e:
+                raise CommandError(f"{path}: {e}; nothing was imported")
+
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{path}: imported {result['ledger_entries_created']} ledger rows and "
+                    f"{result['journals_created']} journals via {result['method']} "
+                    f"({result['calendar_entries_created']} calendar rows created, "
+                    f"{result['daily_balance_rows']} daily balance rows refreshed) "
+                    f"in {result['elapsed_seconds']}s, {result['rows_per_second']} rows/s"
+                )
+            )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from accounting.balances import rebuild_daily_balances
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized AccountDailyBalance table from the general ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company-id',
+            type=int,
+            help='Only rebuild balances for this company'
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_daily_balances(company_id=options['company_id'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {created} daily balance rows')
+        )
@@ -0,0 +1,271 @@
+"""
+Per-request query and latency metrics for the accounting API.
+
+QueryMetricsMiddleware wraps every database connection with
+connection.execute_wrapper() while a request is handled and records:
+
+- queries: number of SQL statements executed
+- db: total time spent in the database
+- serialize: time spent producing serializer.data in the viewsets using
+  SerializerTimingMixin, excluding the queries it issues (counted in db)
+- render: time spent rendering the response (DRF serializes lazily
+  evaluated data and encodes JSON here)
+- app: remaining time spent in Python (view code)
+- size: response body size in bytes
+
+Each response carries the durations as a Server-Timing header, which
+browser developer tools display per request:
+
+    Server-Timing: db;dur=4.1;desc="12 queries", serialize;dur=1.5, render;dur=0.8, app;dur=0.8, total;dur=7.2
+
+Views without the mixin report their serializer time in app.
+
+Samples are aggregated per route (HTTP method and URL name) in process
+memory and served with p50/p95/p99 by /api/metrics/. Each process keeps
+the last METRICS_SAMPLE_SIZE samples of every route.
+
+Streaming responses (ledger exports) are recorded when the view returns,
+so queries issued while the body streams are not counted.
+
+The middleware is async-capable, so the async AI views are not pushed
+back onto a thread. On the async path the connection wrappers are
+installed in the request's thread-sensitive worker thread, where
+sync_to_async() runs the request's ORM calls; queries run in other
+threads (thread_sensitive=False) are not counted.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+
+import numpy as np
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+METRIC_FIELDS = ('total_ms', 'db_ms', 'queries', 'serialize_ms', 'render_ms', 'app_ms', 'size')
+PERCENTILES = (50, 95, 99)
+
+
+class RequestMetrics:
+    """Counters of a single request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self._render_started = None
+        self._serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    @contextmanager
+    def serializing(self):
+        # Times the outermost serializer only; its queries stay in db_time
+        if self._serializing:
+            yield
+            return
+        self._serializing = True
+        started, db_time = time.perf_counter(), self.db_time
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.serialize_time += max(elapsed - (self.db_time - db_time), 0.0)
+            self._serializing = False
+
+    def start_render(self):
+        self._render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        if self._render_started is not None:
+            self.render_time += time.perf_counter() - self._render_started
+            self._render_started = None
+        return response
+
+    def sample(self, response):
+        total = time.perf_counter() - self.started
+        size = None if response.streaming else len(response.content)
+        return {
+            'total_ms': total * 1000,
+            'db_ms': self.db_time * 1000,
+            'queries': self.queries,
+            'serialize_ms': self.serialize_time * 1000,
+            'render_ms': self.render_time * 1000,
+            'app_ms': max(total - self.db_time - self.serialize_time - self.render_time, 0.0) * 1000,
+            'size': size,
+        }
+
+
+def server_timing(sample):
+    """Format a metrics sample as a Server-Timing header value."""
+    return ', '.join([
+        f'db;dur={sample["db_ms"]:.1f};desc="{sample["queries"]} queries"',
+        f'serialize;dur={sample["serialize_ms"]:.1f}',
+        f'render;dur={sample["render_ms"]:.1f}',
+        f'app;dur={sample["app_ms"]:.1f}',
+        f'total;dur={sample["total_ms"]:.1f}',
+    ])
+
+
+class MetricsRegistry:
+    """Thread-safe per-route store of recent request samples."""
+
+    def __init__(self, sample_size=None):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = defaultdict(int)
+
+    def record(self, route, sample):
+        with self._lock:
+            samples = self._samples.get(route)
+            if samples is None:
+                size = self.sample_size or getattr(settings, 'METRICS_SAMPLE_SIZE', 1000)
+                samples = self._samples[route] = deque(maxlen=size)
+            samples.append(sample)
+            self._counts[route] += 1
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def summary(self):
+        """
+        Summarise the recorded samples.
+
+        Returns:
+            Dictionary of route -> {'count', 'samples', and for each metric
+            a {'p50', 'p95', 'p99', 'max'} dictionary}
+        """
+        with self._lock:
+            snapshot = {route: list(samples) for route, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        summary = {}
+        for route, samples in sorted(snapshot.items()):
+            stats = {'count': counts[route], 'samples': len(samples)}
+            for field in METRIC_FIELDS:
+                values = np.array([sample[field] for sample in samples if sample[field] is not None], dtype=float)
+                if not len(values):
+                    stats[field] = None
+                    continue
+                stats[field] = {
+                    f'p{percentile}': round(float(value), 3)
+                    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+                }
+                stats[field]['max'] = round(float(values.max()), 3)
+            summary[route] = stats
+        return summary
+
+
+registry = MetricsRegistry()
+
+
+class _TimedSerializer:
+    """Serializer proxy whose .data is timed as the request's serialize span."""
+
+    def __init__(self, serializer, metrics):
+        self._serializer = serializer
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        return getattr(self._serializer, name)
+
+    @property
+    def data(self):
+        with self._metrics.serializing():
+            return self._serializer.data
+
+
+class SerializerTimingMixin:
+    """
+    Viewset mixin recording the time spent in serializer.data of the
+    serializers returned by get_serializer() as the serialize span.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = getattr(self.request, '_query_metrics', None)
+        if metrics is None:
+            return serializer
+        return _TimedSerializer(serializer, metrics)
+
+
+def route_name(request):
+    """Metrics route of a resolved request, e.g. 'GET generalledger-list'."""
+    match = request.resolver_match
+    return f'{request.method} {match.view_name or match._func_path}'
+
+
+class QueryMetricsMiddleware:
+    """
+    Record query counts and timings of every resolved request.
+
+    Place it first in MIDDLEWARE so the timings cover the whole stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        request._query_metrics = metrics
+
+        with ExitStack() as stack:
+            self._wrap_connections(stack, metrics)
+            response = self.get_response(request)
+
+        return self._record(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        request._query_metrics = metrics
+
+        stack = ExitStack()
+        await sync_to_async(self._wrap_connections)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+        return self._record(request, response, metrics)
+
+    def _wrap_connections(self, stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+
+    def _record(self, request, response, metrics):
+        sample = metrics.sample(response)
+        response['Server-Timing'] = server_timing(sample)
+        if getattr(request, 'resolver_match', None) is not None:
+            registry.record(route_name(request), sample)
+        return response
+
+    def process_template_response(self, request, response):
+        # Runs just before the response is rendered (DRF Response)
+        metrics = getattr(request, '_query_metrics', None)
+        if metrics is not None:
+            metrics.start_render()
+            response.add_post_render_callback(metrics.finish_render)
+        return response
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:35
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+
+
+def backfill_daily_balances(apps, schema_editor):
+    """Populate AccountDailyBalance from the existing ledger history."""
+    GeneralLedger = apps.get_model('accounting', 'GeneralLedger')
+    AccountDailyBalance = apps.get_model('accounting', 'AccountDailyBalance')
+
+    totals = GeneralLedger.objects.order_by().values(
+        'company_id', 'account_id', 'date__date'
+    ).annotate(
+        debit_total=Sum('amount', filter=Q(transaction_type='DEBIT')),
+        credit_total=Sum('amount', filter=Q(transaction_type='CREDIT')),
+        entry_count=Count('pk')
+    ).order_by('account_id', 'date__date')
+
+    batch = []
+    current_account = None
+    for item in totals.iterator():
+        if item['account_id'] != current_account:
+            current_account = item['account_id']
+            running_debits = running_credits = Decimal('0')
+
+        debit_total = item['debit_total'] or Decimal('0')
+        credit_total = item['credit_total'] or Decimal('0')
+        running_debits += debit_total
+        running_credits += credit_total
+        batch.append(AccountDailyBalance(
+            company_id=item['company_id'],
+            account_id=item['account_id'],
+            date=item['date__date'],
+            debit_total=debit_total,
+            credit_total=credit_total,
+            entry_count=item['entry_count'],
+            running_debits=running_debits,
+            running_credits=running_credits,
+            balance=running_debits - running_credits
+        ))
+
+    AccountDailyBalance.objects.bulk_create(batch, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_generalledger_journal_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDailyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Calendar date of the ledger activity')),
+                ('debit_total', models.DecimalField(decimal_places=4, default=Decimal('0'), help_text='Sum of debit amounts posted on this date', max_digits=21)),
+                ('credit_total', models.DecimalField(decimal_places=4, default=Decimal('0'), help_text='Sum of credit amounts posted on this date', max_digits=21)),
+                ('entry_count', models.PositiveIntegerField(default=0, help_text='Number of ledger entries posted on this date')),
+                ('running_debits', models.DecimalField(decimal_places=4, default=Decimal('0'), help_text='Cumulative debits up to and including this date', max_digits=21)),
+                ('running_credits', models.DecimalField(decimal_places=4, default=Decimal('0'), help_text='Cumulative credits up to and including this date', max_digits=21)),
+                ('balance', models.DecimalField(decimal_places=4, default=Decimal('0'), help_text='Running balance (cumulative debits - credits) as of this date', max_digits=21)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balances', to='accounting.chartofaccounts')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balances', to='accounting.company')),
+            ],
+            options={
+                'ordering': ['company', 'account', 'date'],
+                'indexes': [models.Index(fields=['company', 'date'], name='accounting__company_7c97d2_idx')],
+                'unique_together': {('account', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_balances, migrations.RunPython.noop),
+    ]
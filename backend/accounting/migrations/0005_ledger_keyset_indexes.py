@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_accountdailybalance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='calendar',
+            index=models.Index(fields=['date'], name='calendar_date_idx'),
+        ),
+    ]
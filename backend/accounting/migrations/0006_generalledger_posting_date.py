@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0005_ledger_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generalledger',
+            name='posting_date',
+            field=models.DateField(editable=False, help_text='Copy of date.date kept in sync on write, so date filters and ordering skip the Calendar join', null=True),
+        ),
+    ]
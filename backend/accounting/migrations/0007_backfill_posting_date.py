@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:41
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_posting_dates(apps, schema_editor):
+    """Copy each ledger entry's Calendar date into posting_date in one UPDATE."""
+    GeneralLedger = apps.get_model('accounting', 'GeneralLedger')
+    Calendar = apps.get_model('accounting', 'Calendar')
+
+    GeneralLedger.objects.filter(posting_date__isnull=True).update(
+        posting_date=Subquery(Calendar.objects.filter(pk=OuterRef('date_id')).values('date')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0006_generalledger_posting_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_posting_dates, migrations.RunPython.noop),
+    ]
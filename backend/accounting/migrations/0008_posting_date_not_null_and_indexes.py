@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0007_backfill_posting_date'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='generalledger',
+            options={'ordering': ['-posting_date', '-entry_no']},
+        ),
+        migrations.AlterField(
+            model_name='generalledger',
+            name='posting_date',
+            field=models.DateField(editable=False, help_text='Copy of date.date kept in sync on write, so date filters and ordering skip the Calendar join'),
+        ),
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['company', 'posting_date', 'entry_no'], name='ledger_company_posting_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='generalledger',
+            index=models.Index(fields=['posting_date', 'entry_no'], name='ledger_posting_entry_idx'),
+        ),
+    ]
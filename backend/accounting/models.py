@@ -11,6 +11,7 @@ a Pythonic interface for database operations.
 
 from django.db import models
 from django.core.validators import MinValueValidator
+from django.db.models.functions import Coalesce
 from decimal import Decimal
 
 
@@ -140,11 +141,49 @@ class Calendar(models.Model):
     class Meta:
         unique_together = ('company', 'date')
         ordering = ['company', 'date']
+        indexes = [
+            models.Index(fields=['date'], name='calendar_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.company.company_name} - {self.date}"
 
 
+class GeneralLedgerQuerySet(models.QuerySet):
+    """QuerySet for GeneralLedger that keeps posting_date in step with date."""
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Fill posting_date from each entry's Calendar row before inserting.
+        
+        Entries without posting_date read it from a cached Calendar instance
+        or, for plain date_id values, from one lookup query per call.
+        """
+        objs = list(objs)
+        missing = {
+            obj.date_id for obj in objs
+            if obj.posting_date is None and obj.date_id is not None
+            and not GeneralLedger.date.is_cached(obj)
+        }
+        dates = dict(Calendar.objects.filter(pk__in=missing).values_list('pk', 'date')) if missing else {}
+        for obj in objs:
+            if obj.posting_date is None and obj.date_id is not None:
+                obj.posting_date = obj.date.date if GeneralLedger.date.is_cached(obj) else dates.get(obj.date_id)
+        return super().bulk_create(objs, *args, **kwargs)
+    
+    def update(self, **kwargs):
+        """Re-derive posting_date when an update moves entries to another Calendar row."""
+        date = kwargs.get('date', kwargs.get('date_id'))
+        if 'posting_date' not in kwargs:
+            if isinstance(date, Calendar):
+                kwargs['posting_date'] = date.date
+            elif isinstance(date, (int, str)):
+                kwargs['posting_date'] = models.Subquery(
+                    Calendar.objects.filter(pk=date).values('date')[:1]
+                )
+        return super().update(**kwargs)
+
+
 class GeneralLedger(models.Model):
     """
     Represents individual entries in the general ledger.
@@ -168,6 +207,10 @@ class GeneralLedger(models.Model):
         db_column='Date',
         related_name='ledger_entries'
     )
+    posting_date = models.DateField(
+        editable=False,
+        help_text="Copy of date.date kept in sync on write, so date filters and ordering skip the Calendar join"
+    )
     territory = models.ForeignKey(
         Territory, 
         on_delete=models.SET_NULL, 
@@ -218,17 +261,48 @@ class GeneralLedger(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = GeneralLedgerQuerySet.as_manager()
+    
     class Meta:
-        ordering = ['-date__date', '-entry_no']
+        ordering = ['-posting_date', '-entry_no']
         indexes = [
             models.Index(fields=['company', 'date']),
             models.Index(fields=['account', 'date']),
             models.Index(fields=['territory', 'date']),
+            # Date range scans and keyset pagination walk (posting_date, entry_no) in order
+            models.Index(fields=['company', 'posting_date', 'entry_no'], name='ledger_company_posting_idx'),
+            models.Index(fields=['posting_date', 'entry_no'], name='ledger_posting_entry_idx'),
         ]
     
     def __str__(self):
         return f"Entry {self.entry_no}: {self.account.account} - {self.amount}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The Calendar row the loaded posting_date was copied from
+        instance._posting_date_source = instance.__dict__.get('date_id')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        """
+        Copy the Calendar date into posting_date before writing.
+        
+        The date comes from the cached Calendar instance when there is one.
+        Calendar is only queried when date_id is set without it and differs
+        from the row the stored posting_date was copied from.
+        """
+        if self.date_id is not None:
+            if GeneralLedger.date.is_cached(self):
+                self.posting_date = self.date.date
+            elif self.posting_date is None or self.date_id != getattr(self, '_posting_date_source', None):
+                self.posting_date = Calendar.objects.values_list('date', flat=True).get(pk=self.date_id)
+            self._posting_date_source = self.date_id
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'posting_date' not in update_fields:
+                kwargs['update_fields'] = [*update_fields, 'posting_date']
+        super().save(*args, **kwargs)
+    
     @property
     def is_debit(self):
         """Returns True if this is a debit entry."""
@@ -240,6 +314,59 @@ class GeneralLedger(models.Model):
         return self.transaction_type == 'CREDIT'
 
 
+class JournalEntryQuerySet(models.QuerySet):
+    """QuerySet for JournalEntry with SQL-side balance totals."""
+    
+    # Amounts carry 4 decimal places; anything closer than half a unit is balanced
+    BALANCE_TOLERANCE = Decimal('0.00005')
+    
+    def with_totals(self):
+        """
+        Annotate debit/credit totals and a balance flag computed in SQL.
+        
+        Adds annotated_debits, annotated_credits, annotated_difference and
+        annotated_is_balanced using correlated subqueries, so listing journals
+        no longer runs three aggregate queries per row. The total_debits,
+        total_credits and is_balanced properties read these annotations when
+        present. Calling it on an already annotated queryset is a no-op.
+        """
+        if 'annotated_debits' in self.query.annotations:
+            return self
+        
+        amount_field = models.DecimalField(max_digits=19, decimal_places=4)
+        
+        def side_total(transaction_type):
+            total = GeneralLedger.objects.filter(
+                journal_entry=models.OuterRef('pk'),
+                transaction_type=transaction_type
+            ).order_by().values('journal_entry').annotate(
+                total=models.Sum('amount')
+            ).values('total')
+            return Coalesce(
+                models.Subquery(total, output_field=amount_field),
+                models.Value(Decimal('0.00')),
+                output_field=amount_field
+            )
+        
+        return self.annotate(
+            annotated_debits=side_total('DEBIT'),
+            annotated_credits=side_total('CREDIT'),
+        ).annotate(
+            annotated_difference=models.ExpressionWrapper(
+                models.F('annotated_debits') - models.F('annotated_credits'),
+                output_field=amount_field
+            )
+        ).annotate(
+            annotated_is_balanced=models.ExpressionWrapper(
+                models.Q(
+                    annotated_difference__gt=-self.BALANCE_TOLERANCE,
+                    annotated_difference__lt=self.BALANCE_TOLERANCE
+                ),
+                output_field=models.BooleanField()
+            )
+        )
+
+
 class JournalEntry(models.Model):
     """
     Represents a complete journal entry containing multiple ledger entries.
@@ -273,6 +400,8 @@ class JournalEntry(models.Model):
         help_text="User or system that created this entry"
     )
     
+    objects = JournalEntryQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "Journal Entries"
         ordering = ['-date__date', '-journal_id']
@@ -283,6 +412,8 @@ class JournalEntry(models.Model):
     @property
     def total_debits(self):
         """Calculate total debit amount for this journal entry."""
+        if hasattr(self, 'annotated_debits'):
+            return self.annotated_debits
         return self.ledger_entries.filter(
             transaction_type='DEBIT'
         ).aggregate(
@@ -292,6 +423,8 @@ class JournalEntry(models.Model):
     @property
     def total_credits(self):
         """Calculate total credit amount for this journal entry."""
+        if hasattr(self, 'annotated_credits'):
+            return self.annotated_credits
         return self.ledger_entries.filter(
             transaction_type='CREDIT'
         ).aggregate(
@@ -301,8 +434,78 @@ class JournalEntry(models.Model):
     @property
     def is_balanced(self):
         """Check if the journal entry is balanced (debits = credits)."""
+        if hasattr(self, 'annotated_is_balanced'):
+            return self.annotated_is_balanced
         return self.total_debits == self.total_credits
     
     def get_balance_difference(self):
         """Get the difference between debits and credits."""
-        return self.total_debits - self.total_credits
\ No newline at end of file
+        return self.total_debits - self.total_credits
+
+
+class AccountDailyBalance(models.Model):
+    """
+    Materialized per-account, per-day ledger totals with running balances.
+    
+    One row exists for every account and calendar date that has ledger
+    activity. Rows are maintained incrementally by the GeneralLedger signal
+    handlers in accounting.signals, so an as-of balance is the latest row on
+    or before the requested date instead of a scan of the ledger history.
+    """
+    company = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='daily_balances'
+    )
+    account = models.ForeignKey(
+        ChartOfAccounts,
+        on_delete=models.CASCADE,
+        related_name='daily_balances'
+    )
+    date = models.DateField(
+        help_text="Calendar date of the ledger activity"
+    )
+    debit_total = models.DecimalField(
+        max_digits=21,
+        decimal_places=4,
+        default=Decimal('0'),
+        help_text="Sum of debit amounts posted on this date"
+    )
+    credit_total = models.DecimalField(
+        max_digits=21,
+        decimal_places=4,
+        default=Decimal('0'),
+        help_text="Sum of credit amounts posted on this date"
+    )
+    entry_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of ledger entries posted on this date"
+    )
+    running_debits = models.DecimalField(
+        max_digits=21,
+        decimal_places=4,
+        default=Decimal('0'),
+        help_text="Cumulative debits up to and including this date"
+    )
+    running_credits = models.DecimalField(
+        max_digits=21,
+        decimal_places=4,
+        default=Decimal('0'),
+        help_text="Cumulative credits up to and including this date"
+    )
+    balance = models.DecimalField(
+        max_digits=21,
+        decimal_places=4,
+        default=Decimal('0'),
+        help_text="Running balance (cumulative debits - credits) as of this date"
+    )
+    
+    class Meta:
+        unique_together = ('account', 'date')
+        ordering = ['company', 'account', 'date']
+        indexes = [
+            models.Index(fields=['company', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.account_id} @ {self.date}: {self.balance}"
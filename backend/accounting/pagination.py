@@ -0,0 +1,157 @@
+"""
+Keyset pagination for the general ledger listing.
+
+PageNumberPagination answers page N with OFFSET (N - 1) * page_size and a
+COUNT(*) of the whole filtered ledger, so deep pages get slower the further
+users page. LedgerKeysetPagination instead remembers the
+(posting_date, entry_no) of the last row served and asks for the rows
+strictly after it:
+
+    WHERE posting_date < :date OR (posting_date = :date AND entry_no < :entry_no)
+    ORDER BY posting_date DESC, entry_no DESC
+    LIMIT page_size + 1
+
+which walks the GeneralLedger (company, posting_date, entry_no) or
+(posting_date, entry_no) index from the cursor position without joining
+Calendar, so every page costs the same. No count query is issued; responses only carry next/previous links.
+
+Example:
+    GET /api/general-ledger/?pagination=cursor
+    GET /api/general-ledger/?cursor=<opaque value from "next">
+"""
+
+import base64
+import json
+from collections import OrderedDict
+from datetime import date
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class LedgerKeysetPagination(BasePagination):
+    """Cursor pagination over GeneralLedger keyed on (posting_date, entry_no), newest first."""
+
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        """Return True when the request opts into keyset pagination."""
+        params = request.query_params
+        return cls.cursor_query_param in params or params.get(cls.mode_query_param) == 'cursor'
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK.get('PAGE_SIZE') or 100
+
+    def decode_cursor(self, request):
+        """Return ((date, entry_no) or None, reverse) from the cursor parameter."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = (date.fromisoformat(payload['d']), int(payload['n']))
+            return position, bool(payload.get('r'))
+        except (KeyError, TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def position(entry):
+        """
+        Return the (date, entry_no) of a page row.
+
+        Rows are GeneralLedger instances, or values_list() tuples ending with
+        posting_date and entry_no on the lean read path.
+        """
+        if isinstance(entry, tuple):
+            return entry[-2], entry[-1]
+        return entry.posting_date, entry.entry_no
+
+    def encode_cursor(self, entry, reverse):
+        entry_date, entry_no = self.position(entry)
+        payload = {'d': entry_date.isoformat(), 'n': entry_no}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('ascii'))
+        url = remove_query_param(self.base_url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        # Any ?ordering= is replaced: the cursor is only valid for this order
+        if reverse:
+            queryset = queryset.order_by('posting_date', 'entry_no')
+        else:
+            queryset = queryset.order_by('-posting_date', '-entry_no')
+
+        if position is not None:
+            cursor_date, entry_no = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(posting_date__gt=cursor_date) | Q(posting_date=cursor_date, entry_no__gt=entry_no)
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(posting_date__lt=cursor_date) | Q(posting_date=cursor_date, entry_no__lt=entry_no)
+                )
+
+        # One extra row tells whether another page follows, without a COUNT
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
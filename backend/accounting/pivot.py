@@ -0,0 +1,159 @@
+"""
+Pivot engine for general ledger data.
+
+pivot_ledger() groups the ledger in SQL by a row dimension and a column
+dimension, so the database returns one row per non-empty cell, and fills a
+dense NumPy matrix from those grouped rows in one vectorised assignment.
+No raw ledger rows or DataFrames are materialised in Python.
+
+pivot_payload() renders the result as a compact JSON payload: the row and
+column keys once each, and the matrix as a list of lists with totals.
+
+Example:
+    payload = pivot_payload(GeneralLedger.objects.filter(company_id=1),
+                            rows='class', columns='month', value='net')
+"""
+
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from rest_framework.exceptions import ValidationError
+
+
+# Dimension -> {output field: ledger expression}
+PIVOT_DIMENSIONS = {
+    'territory': {
+        'territory_key': F('territory__territory_key'),
+        'country': F('territory__country'),
+        'region': F('territory__region'),
+    },
+    'account': {
+        'account_key': F('account__account_key'),
+        'account_name': F('account__account'),
+    },
+    'class': {
+        'class_name': F('account__class_name'),
+    },
+    'company': {
+        'company_id': F('company_id'),
+        'company_name': F('company__company_name'),
+    },
+    'transaction_type': {
+        'transaction_type': F('transaction_type'),
+    },
+    'year': {
+        'year': F('date__year'),
+    },
+    'quarter': {
+        'year': F('date__year'),
+        'quarter': F('date__quarter'),
+    },
+    'month': {
+        'month': TruncMonth('posting_date'),
+    },
+}
+
+ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=19, decimal_places=4))
+
+# Cell value -> (aggregate, matrix dtype)
+PIVOT_VALUES = {
+    'sum': (Sum('amount'), np.float64),
+    'debit': (Sum('amount', filter=Q(transaction_type='DEBIT')), np.float64),
+    'credit': (Sum('amount', filter=Q(transaction_type='CREDIT')), np.float64),
+    'net': (
+        Coalesce(Sum('amount', filter=Q(transaction_type='DEBIT')), ZERO)
+        - Coalesce(Sum('amount', filter=Q(transaction_type='CREDIT')), ZERO),
+        np.float64
+    ),
+    'count': (Count('pk'), np.int64),
+}
+
+
+def _sort_key(key):
+    # Missing members (e.g. entries without territory) sort last
+    return tuple((value is None, value if value is not None else 0) for value in key)
+
+
+def pivot_ledger(queryset, rows='territory', columns='account', value='sum'):
+    """
+    Pivot a GeneralLedger queryset into a dense matrix.
+
+    Args:
+        queryset: Filtered GeneralLedger queryset
+        rows: Row dimension, a key of PIVOT_DIMENSIONS
+        columns: Column dimension, a key of PIVOT_DIMENSIONS
+        value: Cell value, a key of PIVOT_VALUES
+
+    Returns:
+        Tuple of (row keys, column keys, matrix); keys are tuples of the
+        dimension's fields in PIVOT_DIMENSIONS order, sorted ascending.
+
+    Raises:
+        ValidationError: If a dimension or value name is unknown
+    """
+    errors = {}
+    for param, name, choices in (('rows', rows, PIVOT_DIMENSIONS), ('columns', columns, PIVOT_DIMENSIONS),
+                                 ('value', value, PIVOT_VALUES)):
+        if name not in choices:
+            errors[param] = f"Unknown {param} '{name}'. Choose from: {', '.join(choices)}"
+    if not errors and rows == columns:
+        errors['columns'] = 'Row and column dimensions must differ'
+    if errors:
+        raise ValidationError(errors)
+
+    row_fields = {f'row_{name}': expression for name, expression in PIVOT_DIMENSIONS[rows].items()}
+    column_fields = {f'column_{name}': expression for name, expression in PIVOT_DIMENSIONS[columns].items()}
+    aggregate, dtype = PIVOT_VALUES[value]
+
+    cells = list(
+        queryset.order_by()
+        .annotate(**row_fields, **column_fields)
+        .values(*row_fields, *column_fields)
+        .annotate(pivot_value=aggregate)
+        .values_list(*row_fields, *column_fields, 'pivot_value')
+    )
+
+    split = len(row_fields)
+    row_keys = sorted({cell[:split] for cell in cells}, key=_sort_key)
+    column_keys = sorted({cell[split:-1] for cell in cells}, key=_sort_key)
+    row_index = {key: position for position, key in enumerate(row_keys)}
+    column_index = {key: position for position, key in enumerate(column_keys)}
+
+    matrix = np.zeros((len(row_keys), len(column_keys)), dtype=dtype)
+    if cells:
+        matrix[
+            np.fromiter((row_index[cell[:split]] for cell in cells), dtype=np.intp, count=len(cells)),
+            np.fromiter((column_index[cell[split:-1]] for cell in cells), dtype=np.intp, count=len(cells))
+        ] = np.fromiter((cell[-1] or 0 for cell in cells), dtype=dtype, count=len(cells))
+
+    return row_keys, column_keys, matrix
+
+
+def pivot_payload(queryset, rows='territory', columns='account', value='sum'):
+    """
+    Pivot a GeneralLedger queryset into a compact JSON-ready payload.
+
+    Returns:
+        Dictionary with the row and column dimensions (field names and keys),
+        the values matrix as nested lists, and row, column and grand totals.
+    """
+    row_keys, column_keys, matrix = pivot_ledger(queryset, rows, columns, value)
+    return {
+        'rows': {
+            'dimension': rows,
+            'fields': list(PIVOT_DIMENSIONS[rows]),
+            'keys': [list(key) for key in row_keys],
+        },
+        'columns': {
+            'dimension': columns,
+            'fields': list(PIVOT_DIMENSIONS[columns]),
+            'keys': [list(key) for key in column_keys],
+        },
+        'value': value,
+        'values': matrix.tolist(),
+        'row_totals': matrix.sum(axis=1).tolist(),
+        'column_totals': matrix.sum(axis=0).tolist(),
+        'grand_total': matrix.sum().item(),
+    }
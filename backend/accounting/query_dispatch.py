@@ -0,0 +1,84 @@
+"""
+In-process execution of translated natural-language queries.
+
+The query agent translates a question into a general ledger URL such as
+/api/general-ledger/summary_by_account/?company=1&date__year=2024.
+dispatch_ledger_query() resolves that URL to its GeneralLedgerViewSet
+action and calls the view directly with a GET request derived from the
+caller's request (same user, headers and host). The action's Python data
+is returned as is: no loopback HTTP request, no second worker slot and no
+JSON round trip.
+
+Only GeneralLedgerViewSet routes are dispatched; any other path is
+answered with 404, as the URL comes from model output. File exports
+(export_csv, export_parquet, export_arrow) stream bytes rather than data
+and are answered with 400 without running the export.
+
+Example:
+    status_code, data = dispatch_ledger_query(request, result['api_url'])
+"""
+
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+from .api_views import GeneralLedgerViewSet
+
+
+# Request headers describing the caller's body, which the internal GET has none of
+BODY_META_KEYS = ('CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_CONTENT_LENGTH', 'HTTP_CONTENT_TYPE')
+
+# Actions streaming a file instead of returning data
+EXPORT_ACTIONS = {'export_csv', 'export_parquet', 'export_arrow'}
+
+
+def internal_get_request(request, path, query_string):
+    """Build a GET HttpRequest for path that carries the caller's identity and host."""
+    source = getattr(request, '_request', request)  # unwrap a DRF Request
+
+    internal = HttpRequest()
+    internal.method = 'GET'
+    internal.path = internal.path_info = path
+    internal.META = {
+        key: value for key, value in source.META.items() if key not in BODY_META_KEYS
+    }
+    internal.META.update({'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query_string})
+    internal.GET = QueryDict(query_string)
+    internal.COOKIES = source.COOKIES
+    for attribute in ('user', 'session'):
+        if hasattr(source, attribute):
+            setattr(internal, attribute, getattr(source, attribute))
+    return internal
+
+
+def dispatch_ledger_query(request, api_url):
+    """
+    Run the GeneralLedgerViewSet action behind a translated API URL.
+
+    Args:
+        request: The incoming request (Django or DRF) the query was asked in
+        api_url: Path and query string produced by the query agent
+
+    Returns:
+        Tuple of (HTTP status code, response data)
+    """
+    url = urlsplit(api_url)
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        match = None
+    if match is None or getattr(match.func, 'cls', None) is not GeneralLedgerViewSet:
+        return 404, {'detail': f'No general ledger endpoint at {url.path}'}
+
+    export_error = (400, {'detail': f'{url.path} exports a file; query a summary or list endpoint instead'})
+    if match.func.actions.get('get') in EXPORT_ACTIONS:
+        return export_error
+
+    internal = internal_get_request(request, url.path, url.query)
+    internal.resolver_match = match
+    response = match.func(internal, *match.args, **match.kwargs)
+    if response.streaming:
+        response.close()
+        return export_error
+    return response.status_code, getattr(response, 'data', None)
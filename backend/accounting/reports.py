@@ -0,0 +1,300 @@
+"""
+Report engines for the Numerizam Accounting Application.
+
+This module computes account-level debit/credit totals from the materialized
+AccountDailyBalance table, so the trial balance and balance sheet reports
+read one running-total row per account instead of scanning ledger history.
+
+Example:
+    rows = trial_balance_rows(company_id=1, as_of_date='2024-12-31')
+    assets = class_balance(rows, 'Asset')
+"""
+
+from decimal import Decimal
+
+from django.db.models import Sum, Count, Avg, Max, Min, OuterRef, Subquery, Q
+from django.db.models.functions import TruncMonth
+
+from .models import AccountDailyBalance, ChartOfAccounts
+
+
+ZERO = Decimal('0.00')
+
+# Account classes whose normal balance is a debit (debits - credits).
+# Every other class (liability, equity, revenue) carries a credit balance.
+DEBIT_NORMAL_CLASSES = ['asset', 'expense']
+
+
+def trial_balance_rows(company_id, as_of_date, start_date=None):
+    """
+    Compute debit and credit totals for every account with ledger activity.
+
+    Without start_date each account's totals are the running totals of its
+    latest AccountDailyBalance row on or before as_of_date, fetched with one
+    indexed lookup per account inside a single query. With start_date the
+    daily totals inside the period are summed in one grouped query.
+
+    Args:
+        company_id: ID of the company
+        as_of_date: Last transaction date to include (inclusive)
+        start_date: Optional first transaction date to include (inclusive)
+
+    Returns:
+        List of dictionaries ordered by account_key, each containing
+        account_key, account_name, class_name, debits, credits and balance
+        (debits - credits).
+    """
+    if start_date:
+        totals = ChartOfAccounts.objects.filter(
+            company_id=company_id,
+            daily_balances__date__range=[start_date, as_of_date]
+        ).annotate(
+            debits=Sum('daily_balances__debit_total'),
+            credits=Sum('daily_balances__credit_total')
+        )
+    else:
+        latest = AccountDailyBalance.objects.filter(
+            account=OuterRef('pk'),
+            date__lte=as_of_date
+        ).order_by('-date')
+
+        totals = ChartOfAccounts.objects.filter(
+            company_id=company_id
+        ).annotate(
+            debits=Subquery(latest.values('running_debits')[:1]),
+            credits=Subquery(latest.values('running_credits')[:1])
+        ).filter(
+            debits__isnull=False
+        )
+
+    totals = totals.values(
+        'account_key', 'account', 'class_name', 'debits', 'credits'
+    ).order_by('account_key')
+
+    rows = []
+    for item in totals:
+        debits = item['debits'] or ZERO
+        credits = item['credits'] or ZERO
+        rows.append({
+            'account_key': item['account_key'],
+            'account_name': item['account'],
+            'class_name': item['class_name'],
+            'debits': debits,
+            'credits': credits,
+            'balance': debits - credits,
+        })
+
+    return rows
+
+
+def period_class_total(company_id, class_name, start_date, end_date, side):
+    """
+    Sum one side of the daily totals for an account class over a period.
+
+    Args:
+        company_id: ID of the company
+        class_name: Substring of the account class (e.g. 'Revenue')
+        start_date: First date of the period (inclusive)
+        end_date: Last date of the period (inclusive)
+        side: 'DEBIT' or 'CREDIT'
+
+    Returns:
+        Decimal total, Decimal('0.00') when there is no activity.
+    """
+    field = 'debit_total' if side == 'DEBIT' else 'credit_total'
+    return AccountDailyBalance.objects.filter(
+        company_id=company_id,
+        date__range=[start_date, end_date],
+        account__class_name__icontains=class_name
+    ).aggregate(total=Sum(field))['total'] or ZERO
+
+
+def account_activity_rows(**filters):
+    """
+    Total the daily balance rows matching filters, grouped by account.
+
+    Args:
+        **filters: AccountDailyBalance lookups (e.g. company_id=1, date__gte=...)
+
+    Returns:
+        List of dictionaries ordered by account_key, each containing
+        account_key, account_name, class_name, debits, credits and entry_count.
+    """
+    totals = AccountDailyBalance.objects.filter(**filters).values(
+        'account__account_key',
+        'account__account',
+        'account__class_name'
+    ).annotate(
+        debits=Sum('debit_total'),
+        credits=Sum('credit_total'),
+        entry_count=Sum('entry_count')
+    ).order_by('account__account_key')
+
+    return [
+        {
+            'account_key': item['account__account_key'],
+            'account_name': item['account__account'],
+            'class_name': item['account__class_name'],
+            'debits': item['debits'] or ZERO,
+            'credits': item['credits'] or ZERO,
+            'entry_count': item['entry_count'] or 0,
+        }
+        for item in totals
+    ]
+
+
+def ledger_account_rows(queryset):
+    """
+    Total an arbitrary filtered GeneralLedger queryset, grouped by account.
+
+    Entries that are not debits count as credits, matching how the ledger
+    has always been summed in Python.
+
+    Returns:
+        The same row shape as account_activity_rows().
+    """
+    totals = queryset.values(
+        'account__account_key',
+        'account__account',
+        'account__class_name'
+    ).annotate(
+        debits=Sum('amount', filter=Q(transaction_type='DEBIT')),
+        credits=Sum('amount', filter=~Q(transaction_type='DEBIT')),
+        entry_count=Count('entry_no')
+    ).order_by('account__account_key')
+
+    return [
+        {
+            'account_key': item['account__account_key'],
+            'account_name': item['account__account'],
+            'class_name': item['account__class_name'],
+            'debits': item['debits'] or ZERO,
+            'credits': item['credits'] or ZERO,
+            'entry_count': item['entry_count'],
+        }
+        for item in totals
+    ]
+
+
+# Account usage statistics, computed in a single aggregate or grouped query
+USAGE_AGGREGATES = {
+    'total_transactions': Count('entry_no'),
+    'total_debits': Sum('amount', filter=Q(transaction_type='DEBIT')),
+    'total_credits': Sum('amount', filter=Q(transaction_type='CREDIT')),
+    'average_amount': Avg('amount'),
+    'largest_transaction': Max('amount'),
+    'smallest_transaction': Min('amount'),
+}
+
+MONTHLY_ACTIVITY_AGGREGATES = {
+    'count': Count('entry_no'),
+    'total_amount': Sum('amount'),
+    'debits': Sum('amount', filter=Q(transaction_type='DEBIT')),
+    'credits': Sum('amount', filter=Q(transaction_type='CREDIT')),
+}
+
+
+def _usage(values):
+    return {name: values.get(name) or 0 for name in USAGE_AGGREGATES}
+
+
+def account_usage(queryset):
+    """
+    Compute usage statistics of a filtered GeneralLedger queryset in one query.
+
+    Returns:
+        Dictionary with total_transactions, total_debits, total_credits,
+        average_amount, largest_transaction and smallest_transaction;
+        missing values are 0.
+    """
+    return _usage(queryset.order_by().aggregate(**USAGE_AGGREGATES))
+
+
+def account_usage_by_account(queryset, account_ids=()):
+    """
+    Compute usage statistics of a filtered GeneralLedger queryset per account.
+
+    Args:
+        queryset: Filtered GeneralLedger queryset
+        account_ids: Accounts to report even without entries (all zeros)
+
+    Returns:
+        Dictionary of account id -> account_usage() dictionary.
+    """
+    usage = {account_id: _usage({}) for account_id in account_ids}
+    totals = queryset.order_by().values('account_id').annotate(**USAGE_AGGREGATES)
+    usage.update((item['account_id'], _usage(item)) for item in totals)
+    return usage
+
+
+def monthly_activity_by_account(queryset):
+    """
+    Group a filtered GeneralLedger queryset by account and month in one query.
+
+    Returns:
+        Dictionary of account id -> list of month, count, total_amount,
+        debits and credits dictionaries ordered by month.
+    """
+    totals = queryset.order_by().annotate(
+        month=TruncMonth('posting_date')
+    ).values('account_id', 'month').annotate(
+        **MONTHLY_ACTIVITY_AGGREGATES
+    ).order_by('account_id', 'month')
+
+    activity = {}
+    for item in totals:
+        account_id = item.pop('account_id')
+        activity.setdefault(account_id, []).append(item)
+    return activity
+
+
+def is_class(row, class_name):
+    """Return True if the row's account class contains class_name (case-insensitive)."""
+    return class_name.lower() in (row['class_name'] or '').lower()
+
+
+def normal_balance(class_name, debits, credits):
+    """Return the balance of an account according to its normal side."""
+    if class_name.lower() in DEBIT_NORMAL_CLASSES:
+        return debits - credits
+    return credits - debits
+
+
+def class_total(rows, class_name):
+    """
+    Total the normal balance of every row whose class contains class_name.
+
+    Starts from Decimal('0.00') so an empty class renders as 0.00.
+    """
+    total = ZERO
+    for row in rows:
+        if is_class(row, class_name):
+            total += normal_balance(class_name, row['debits'], row['credits'])
+    return total
+
+
+def class_balance(rows, class_name):
+    """
+    Build the per-account breakdown for an account class.
+
+    Returns:
+        Dictionary with class_name, accounts (account_key, account_name,
+        debits, credits, balance) and total.
+    """
+    accounts = []
+    for row in rows:
+        if not is_class(row, class_name):
+            continue
+        accounts.append({
+            'account_key': row['account_key'],
+            'account_name': row['account_name'],
+            'debits': row['debits'],
+            'credits': row['credits'],
+            'balance': normal_balance(class_name, row['debits'], row['credits'])
+        })
+
+    return {
+        'class_name': class_name,
+        'accounts': accounts,
+        'total': sum(account['balance'] for account in accounts)
+    }
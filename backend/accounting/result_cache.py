@@ -0,0 +1,158 @@
+"""
+Versioned result cache for ledger aggregation endpoints.
+
+Cached results are keyed on the endpoint, the normalised query parameters
+and a ledger version counter kept in Django's cache. Requests filtered by
+?company= use that company's counter; any other request uses the global
+counter. Every ledger write bumps both the company's and the global counter,
+so the next request computes a fresh result under a new key and stale
+entries are not served by that cache. With a shared backend the timeout
+only bounds how long unreachable entries occupy the cache.
+
+Counters are bumped immediately and again when the transaction commits,
+so a reader that runs before the commit cannot cache pre-commit data under
+the final version.
+
+The cache backend must be shared by every process serving the API (file,
+Redis or Memcached) when more than one worker is running. The default
+local-memory backend is per process: a write bumps the counters of the
+worker that handled it only, and every other worker keeps serving its
+cached results until RESULT_CACHE_TIMEOUT expires. That timeout therefore
+defaults to 60 seconds unless CACHE_BACKEND is configured.
+
+Example:
+    class GeneralLedgerViewSet(viewsets.ModelViewSet):
+        @action(detail=False, methods=['get'])
+        @cached_ledger_result
+        def summary_by_territory(self, request):
+            ...
+"""
+
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+
+VERSION_KEY = 'accounting:ledger-version:{}'
+# Bump the format number when an endpoint returns different data for the same
+# ledger, so results cached by earlier code are not served
+RESULT_FORMAT = 2
+RESULT_KEY = 'accounting:ledger-result:%d:{}:{}' % RESULT_FORMAT
+
+# Parameters that change the rendering but not the data
+IGNORED_PARAMS = {'format'}
+
+
+def _version_key(company_id):
+    return VERSION_KEY.format('all' if company_id is None else company_id)
+
+
+def ledger_version(company_id=None):
+    """
+    Return the current ledger version of a company, of all companies (None)
+    or the 'epoch' bumped when every company is invalidated at once.
+
+    Missing counters start from the current time in nanoseconds, so a counter
+    evicted from the cache never restarts at a value already used in keys.
+    """
+    key = _version_key(company_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(company_id):
+    # company_id None bumps the epoch that is part of every key
+    keys = {_version_key(None), _version_key(company_id if company_id is not None else 'epoch')}
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_ledger_version(company_id=None):
+    """
+    Invalidate cached results after ledger data of a company changed.
+
+    Call this from write paths that bypass model signals (bulk_create,
+    raw SQL). company_id None invalidates the results of every company.
+    """
+    _bump(company_id)
+    transaction.on_commit(lambda: _bump(company_id))
+
+
+def _parse_company_id(value):
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def result_cache_key(name, request, url_kwargs=None, company_id=None):
+    """
+    Build the cache key of an endpoint result for a request.
+
+    Args:
+        name: Endpoint name
+        request: DRF request; its query parameters are part of the key
+        url_kwargs: URL keyword arguments of the route (e.g. pk)
+        company_id: Company whose ledger version applies; defaults to the
+            ?company= parameter, or all companies when it is absent
+    """
+    params = sorted(
+        (key, request.query_params.getlist(key))
+        for key in request.query_params if key not in IGNORED_PARAMS
+    )
+
+    if company_id is None and len(request.query_params.getlist('company')) == 1:
+        company_id = _parse_company_id(request.query_params.get('company'))
+
+    digest = hashlib.sha1(
+        json.dumps([name, params, sorted((url_kwargs or {}).items())], default=str).encode('utf-8')
+    ).hexdigest()
+    version = f"{ledger_version('epoch')}.{ledger_version(company_id)}"
+    return RESULT_KEY.format(version, digest)
+
+
+def cached_ledger_result(view_method=None, *, company_kwarg=None):
+    """
+    Cache the data of a successful viewset action response.
+
+    Use company_kwarg to name the URL keyword argument holding the company
+    id on detail routes, e.g. @cached_ledger_result(company_kwarg='pk').
+    Responses carry an X-Cache header of HIT or MISS.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            company_id = _parse_company_id(kwargs.get(company_kwarg)) if company_kwarg else None
+            key = result_cache_key(
+                f'{type(self).__name__}.{view_method.__name__}', request,
+                url_kwargs=kwargs, company_id=company_id
+            )
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout=getattr(settings, 'RESULT_CACHE_TIMEOUT', 60))
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    if view_method is not None:
+        return decorator(view_method)
+    return decorator
@@ -5,7 +5,12 @@ This module defines Django REST Framework serializers for converting
 model instances to JSON and vice versa.
 """
 
-from rest_framework import serializers
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
 
 
@@ -57,8 +62,9 @@ class GeneralLedgerSerializer(serializers.ModelSerializer):
     
     # Add custom fields that are not in the model directly
     year = serializers.IntegerField(source='date.year', read_only=True)
-    month = serializers.IntegerField(source='date.month', read_only=True)
-    day = serializers.IntegerField(source='date.day', read_only=True)
+    # Calendar stores month and day as names (e.g. "January", "Monday")
+    month = serializers.CharField(source='date.month', read_only=True)
+    day = serializers.CharField(source='date.day', read_only=True)
     quarter = serializers.CharField(source='date.quarter', read_only=True)
     
     # Additional computed fields for enhanced functionality
@@ -96,6 +102,122 @@ class GeneralLedgerSerializer(serializers.ModelSerializer):
         return obj.date.date.day if obj.date else None
 
 
+# Lean read path for GeneralLedger lists: flat values_list() rows turned into
+# the same dictionaries GeneralLedgerSerializer produces, without building
+# model instances or walking DRF fields per row.
+#
+# name -> (values_list paths, converter applied to those values or None)
+# 'datetime' converters are built per compile_ledger_row() call, see _datetime_converter()
+_amount_representation = serializers.DecimalField(max_digits=19, decimal_places=4).to_representation
+
+LEDGER_ROW_FIELDS = {
+    'entry_no': (('entry_no',), None),
+    'company': (('company_id',), None),
+    'company_name': (('company__company_name',), None),
+    'date': (('date_id',), None),
+    'date_value': (('posting_date',), lambda value: value.isoformat()),
+    'year': (('date__year',), None),
+    'month': (('date__month',), None),
+    'day': (('date__day',), None),
+    'quarter': (('date__quarter',), None),
+    'date_year': (('posting_date',), lambda value: value.year),
+    'date_month': (('posting_date',), lambda value: value.month),
+    'date_day': (('posting_date',), lambda value: value.day),
+    'territory': (('territory_id',), None),
+    'territory_name': (
+        ('territory__country', 'territory__region'),
+        lambda country, region: f"{country}, {region}" if country is not None else None
+    ),
+    'account': (('account_id',), None),
+    'account_name': (('account__account',), None),
+    'details': (('details',), None),
+    'amount': (('amount',), _amount_representation),
+    'transaction_type': (('transaction_type',), None),
+    'reference_number': (('reference_number',), None),
+    'created_at': (('created_at',), 'datetime'),
+    'updated_at': (('updated_at',), 'datetime'),
+}
+
+
+def _datetime_converter():
+    """
+    Return DateTimeField.to_representation with the timezone resolved once.
+
+    DRF looks up the current timezone for every value, which dominates the
+    lean path; the result is identical for the ISO 8601 output format.
+    """
+    output_format = api_settings.DATETIME_FORMAT
+    if not settings.USE_TZ or output_format is None or output_format.lower() != ISO_8601:
+        return serializers.DateTimeField().to_representation
+
+    current_timezone = timezone.get_current_timezone()
+
+    def convert(value):
+        if timezone.is_aware(value):
+            value = value.astimezone(current_timezone)
+        else:
+            value = timezone.make_aware(value, current_timezone)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _converted_column(index, convert):
+    def getter(row):
+        value = row[index]
+        return None if value is None else convert(value)
+    return getter
+
+
+def _combined_columns(start, stop, convert):
+    def getter(row):
+        return convert(*row[start:stop])
+    return getter
+
+
+def compile_ledger_row(fields=None):
+    """
+    Build the values_list() paths and row converter for the given fields.
+
+    Args:
+        fields: Output field names (default: all GeneralLedgerSerializer fields)
+
+    Returns:
+        Tuple of (values_list paths, function mapping a row tuple to a dict)
+
+    Raises:
+        serializers.ValidationError: If a field name is unknown
+    """
+    fields = list(fields or GeneralLedgerSerializer.Meta.fields)
+    unknown = [name for name in fields if name not in LEDGER_ROW_FIELDS]
+    if unknown:
+        raise serializers.ValidationError({
+            'fields': f"Unknown fields: {', '.join(unknown)}. "
+                      f"Available fields: {', '.join(GeneralLedgerSerializer.Meta.fields)}"
+        })
+
+    named_converters = {'datetime': _datetime_converter()}
+    paths = []
+    columns = []  # (name, getter taking the row tuple)
+    for name in dict.fromkeys(fields):
+        source, convert = LEDGER_ROW_FIELDS[name]
+        convert = named_converters.get(convert, convert)
+        start = len(paths)
+        paths.extend(source)
+        if convert is None:
+            getter = itemgetter(start)
+        elif len(source) == 1:
+            getter = _converted_column(start, convert)
+        else:
+            getter = _combined_columns(start, len(paths), convert)
+        columns.append((name, getter))
+
+    def row_to_dict(row):
+        return {name: getter(row) for name, getter in columns}
+
+    return paths, row_to_dict
+
+
 class JournalEntrySerializer(serializers.ModelSerializer):
     """Serializer for Journal Entry model."""
     company_name = serializers.CharField(source='company.company_name', read_only=True)
@@ -229,4 +351,21 @@ class BulkTransactionSerializer(serializers.Serializer):
                 f"Debits ({total_debits}) must equal credits ({total_credits})"
             )
         
-        return value
\ No newline at end of file
+        return value
+
+
+class LedgerIngestionSerializer(serializers.Serializer):
+    """
+    Serializer for high-volume journal ingestion.
+    
+    Only the envelope is validated here; each journal is validated
+    individually by accounting.ingestion so one bad journal does not
+    reject the whole request.
+    """
+    company_id = serializers.IntegerField()
+    created_by = serializers.CharField(max_length=100, required=False, default='API Ingest')
+    journals = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=50000
+    )
@@ -0,0 +1,181 @@
+"""
+Signal handlers for the accounting application.
+
+Keeps AccountDailyBalance in step with GeneralLedger: saves apply the
+difference between the stored and the new entry, deletes apply the
+removed entry with a negative sign. Ledger rows deleted by cascade from
+their company or account are skipped: their daily rows are deleted by the
+same cascade, and the owner's own signal invalidates cached results.
+Calendar changes evict the row from the per-process calendar cache; a new
+date is carried over to the ledger's denormalised posting_date and the
+moved totals over to the new day's daily balances. Changes to ledger
+rows, journals and the dimensions they are reported by bump the company's
+ledger version, invalidating cached aggregation results. Account,
+territory and company changes also drop the company's cached query
+translations.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Q, QuerySet, Sum
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .balances import ZERO, apply_ledger_delta, ledger_delta
+from .calendar_cache import evict_calendar
+from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
+from .result_cache import bump_ledger_version
+from .translation_cache import invalidate_query_translations
+
+
+def _ledger_snapshot(entry_no):
+    """Return the stored balance-relevant fields of a ledger entry, or None."""
+    return GeneralLedger.objects.filter(entry_no=entry_no).values(
+        'company_id', 'account_id', 'posting_date', 'transaction_type', 'amount'
+    ).first()
+
+
+def _instance_snapshot(instance):
+    """Return the balance-relevant fields of an in-memory ledger entry."""
+    return {
+        'company_id': instance.company_id,
+        'account_id': instance.account_id,
+        'posting_date': instance.posting_date,
+        'transaction_type': instance.transaction_type,
+        'amount': instance.amount,
+    }
+
+
+def _apply_snapshot(snapshot, sign):
+    """Apply a snapshot's debit/credit delta to the daily balance table."""
+    debit, credit = ledger_delta(snapshot['transaction_type'], snapshot['amount'], sign)
+    apply_ledger_delta(
+        snapshot['company_id'],
+        snapshot['account_id'],
+        snapshot['posting_date'],
+        debit,
+        credit,
+        sign
+    )
+
+
+@receiver(pre_save, sender=GeneralLedger)
+def remember_previous_ledger_values(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored entry before an update so its delta can be reversed."""
+    instance._daily_balance_previous = None
+    if instance.pk and not raw:
+        instance._daily_balance_previous = _ledger_snapshot(instance.pk)
+
+
+@receiver(post_save, sender=GeneralLedger)
+def update_daily_balance_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the entry's amount from its previous (account, date) to the new one."""
+    if raw:
+        return
+
+    previous = getattr(instance, '_daily_balance_previous', None)
+    if previous:
+        _apply_snapshot(previous, -1)
+        if previous['company_id'] != instance.company_id:
+            bump_ledger_version(previous['company_id'])
+
+    _apply_snapshot(_instance_snapshot(instance), 1)
+    instance._daily_balance_previous = None
+    bump_ledger_version(instance.company_id)
+
+
+def _deleted_with_owner(origin):
+    """Return True if a deletion started from a company or account (instance or queryset)."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in (Company, ChartOfAccounts)
+
+
+@receiver(pre_delete, sender=GeneralLedger)
+def remember_deleted_ledger_values(sender, instance, origin=None, **kwargs):
+    """Snapshot the entry as stored before deletion."""
+    instance._daily_balance_previous = None
+    if not _deleted_with_owner(origin):
+        instance._daily_balance_previous = _ledger_snapshot(instance.pk)
+
+
+@receiver(post_delete, sender=GeneralLedger)
+def update_daily_balance_on_delete(sender, instance, origin=None, **kwargs):
+    """Remove the deleted entry's amount from its (account, date) row."""
+    if _deleted_with_owner(origin):
+        return  # the daily rows go with the company or account
+    previous = getattr(instance, '_daily_balance_previous', None)
+    if previous:
+        _apply_snapshot(previous, -1)
+    bump_ledger_version(instance.company_id)
+
+
+@receiver(post_save, sender=Calendar)
+@receiver(post_delete, sender=Calendar)
+def evict_cached_calendar(sender, instance, **kwargs):
+    """Drop a changed or deleted Calendar row from the calendar cache."""
+    evict_calendar(instance.pk)
+
+
+@receiver(pre_save, sender=Calendar)
+def remember_previous_calendar_date(sender, instance, raw=False, **kwargs):
+    """Snapshot the stored date before an update so moved ledger entries can be found."""
+    instance._previous_date = None
+    if instance.pk and not raw:
+        instance._previous_date = Calendar.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+
+
+@receiver(post_save, sender=Calendar)
+def sync_ledger_posting_dates(sender, instance, created, raw=False, **kwargs):
+    """
+    Carry a changed Calendar date over to its ledger entries and their daily balances.
+
+    The moved entries' totals are taken off their old (account, date) rows
+    and added to the new date, so only the days that moved are touched.
+    """
+    previous_date = getattr(instance, '_previous_date', None)
+    instance._previous_date = None
+    if created or raw or previous_date is None or previous_date == instance.date:
+        return
+
+    with transaction.atomic():
+        moved = GeneralLedger.objects.filter(date=instance).exclude(posting_date=instance.date)
+        totals = list(moved.order_by().values('company_id', 'account_id', 'posting_date').annotate(
+            debits=Sum('amount', filter=Q(transaction_type='DEBIT')),
+            credits=Sum('amount', filter=~Q(transaction_type='DEBIT')),
+            count=Count('pk')
+        ))
+        moved.update(posting_date=instance.date)
+
+        for item in totals:
+            debit, credit = item['debits'] or ZERO, item['credits'] or ZERO
+            apply_ledger_delta(item['company_id'], item['account_id'], item['posting_date'],
+                               -debit, -credit, -item['count'])
+            apply_ledger_delta(item['company_id'], item['account_id'], instance.date,
+                               debit, credit, item['count'])
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=ChartOfAccounts)
+@receiver(post_delete, sender=ChartOfAccounts)
+@receiver(post_save, sender=Territory)
+@receiver(post_delete, sender=Territory)
+@receiver(post_save, sender=Calendar)
+@receiver(post_delete, sender=Calendar)
+@receiver(post_save, sender=JournalEntry)
+@receiver(post_delete, sender=JournalEntry)
+def invalidate_cached_results(sender, instance, raw=False, **kwargs):
+    """Invalidate cached aggregations that report the changed dimension or journal row."""
+    if not raw:
+        bump_ledger_version(instance.company_id)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=ChartOfAccounts)
+@receiver(post_delete, sender=ChartOfAccounts)
+@receiver(post_save, sender=Territory)
+@receiver(post_delete, sender=Territory)
+def invalidate_translations(sender, instance, raw=False, **kwargs):
+    """Drop cached query translations whose filters were matched against the changed dimension."""
+    if not raw:
+        invalidate_query_translations(instance.company_id)
@@ -0,0 +1,131 @@
+"""
+Deterministic synthetic ledger data for benchmarks and load tests.
+
+Seeds a company with the standard chart of accounts, a handful of territories,
+a daily calendar, balanced pairs of GeneralLedger rows and the matching
+AccountDailyBalance rows. The same seed and
+sizes always produce the same dataset, so timings can be compared across runs.
+
+Example:
+    company = seed_synthetic_company('Bench Co', ledger_rows=1_000_000)
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from .balances import rebuild_daily_balances
+from .result_cache import bump_ledger_version
+from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger
+from .management.commands.populate_chart_of_accounts import CHART_OF_ACCOUNTS
+
+
+TERRITORIES = [
+    ('USA', 'East'), ('USA', 'West'), ('Canada', 'Ontario'), ('UK', 'London'),
+    ('Germany', 'Bavaria'), ('India', 'Karnataka'), ('Bangladesh', 'Dhaka'),
+    ('Australia', 'NSW'),
+]
+
+DETAILS = [
+    'Sales', 'Salaries', 'Rent', 'Office supplies', 'Inventory purchase',
+    'Customer payment', 'Supplier payment', 'Owner investment', 'Utilities',
+]
+
+
+def seed_synthetic_company(company_name, ledger_rows=10000, territories=5,
+                           start_date=date(2020, 1, 1), days=365 * 3,
+                           seed=42, batch_size=5000):
+    """
+    Create a company populated with a deterministic synthetic ledger.
+
+    Ledger rows are generated as balanced debit/credit pairs with bulk_create,
+    so ledger_rows is rounded down to an even number.
+
+    Args:
+        company_name: Name of the company to create
+        ledger_rows: Number of GeneralLedger rows to insert
+        territories: Number of territories to create (max len(TERRITORIES))
+        start_date: First calendar date
+        days: Number of calendar days to generate
+        seed: Random seed for reproducible data
+        batch_size: Rows per bulk_create batch
+
+    Returns:
+        The created Company instance
+    """
+    rng = random.Random(seed)
+    company = Company.objects.create(company_name=company_name)
+
+    ChartOfAccounts.objects.bulk_create([
+        ChartOfAccounts(
+            company=company,
+            account_key=account_data['account_key'],
+            report=account_data['report'],
+            class_name=account_data['class'],
+            sub_class=account_data['subclass'],
+            sub_class2='',
+            account=account_data['account'],
+            sub_account=''
+        )
+        for account_data in CHART_OF_ACCOUNTS
+    ])
+    account_ids = list(
+        ChartOfAccounts.objects.filter(company=company).order_by('account_key').values_list('id', flat=True)
+    )
+
+    Territory.objects.bulk_create([
+        Territory(company=company, territory_key=i + 1, country=country, region=region)
+        for i, (country, region) in enumerate(TERRITORIES[:territories])
+    ])
+    territory_ids = list(
+        Territory.objects.filter(company=company).order_by('territory_key').values_list('id', flat=True)
+    )
+
+    calendar_dates = [start_date + timedelta(days=offset) for offset in range(days)]
+    Calendar.objects.bulk_create([
+        Calendar(
+            company=company,
+            date=day,
+            year=day.year,
+            quarter=f"Q{(day.month - 1) // 3 + 1}",
+            month=day.strftime('%B'),
+            day=day.strftime('%A')
+        )
+        for day in calendar_dates
+    ], batch_size=batch_size)
+    calendar_days = list(
+        Calendar.objects.filter(company=company).order_by('date').values_list('id', 'date')
+    )
+
+    batch = []
+    for _ in range(ledger_rows // 2):
+        calendar_id, day = rng.choice(calendar_days)
+        territory_id = rng.choice(territory_ids) if territory_ids else None
+        debit_account, credit_account = rng.sample(account_ids, 2)
+        amount = Decimal(rng.randint(100, 10000000)) / 100
+        details = rng.choice(DETAILS)
+
+        for account_id, transaction_type in ((debit_account, 'DEBIT'), (credit_account, 'CREDIT')):
+            batch.append(GeneralLedger(
+                company=company,
+                date_id=calendar_id,
+                posting_date=day,
+                territory_id=territory_id,
+                account_id=account_id,
+                details=details,
+                amount=amount,
+                transaction_type=transaction_type
+            ))
+
+        if len(batch) >= batch_size:
+            GeneralLedger.objects.bulk_create(batch)
+            batch = []
+
+    if batch:
+        GeneralLedger.objects.bulk_create(batch)
+
+    # bulk_create skips the ledger signals, so materialize the daily balances in one pass
+    rebuild_daily_balances(company_id=company.company_id)
+    bump_ledger_version(company.company_id)
+
+    return company
@@ -5,14 +5,56 @@ This module contains comprehensive tests for the accounting models,
 views, and API endpoints.
 """
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, APITestCase
 from rest_framework import status
 from decimal import Decimal
-from datetime import date
+from datetime import date, timedelta
+import asyncio
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+from unittest import mock
 
-from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
+from .models import (
+    Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry,
+    AccountDailyBalance
+)
+from .balances import ZERO, apply_ledger_delta, rebuild_daily_balances
+from .filters import JournalEntryFilter
+from .calendar_cache import get_calendar, calendar_cache_info, clear_calendar_cache
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from .ingestion import ingest_journals
+from .synthetic import seed_synthetic_company
+from .benchmark import BENCH_ENDPOINTS
+from .translation_cache import TranslationCache, get_translation_cache, normalize_query
+from .query_dispatch import dispatch_ledger_query
+from .llm_batch import ainvoke_with_backoff, amap_concurrently, invoke_with_backoff, map_concurrently
+from .fast_parser import clear_fast_parse_stats, fast_parse_info, fast_parse_transaction, match_transaction
+from . import urls as accounting_urls
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    from .langgraph_query_agent import NumerizamQueryAgent
+except ImportError:
+    NumerizamQueryAgent = None
 
 
 class CompanyModelTest(TestCase):
@@ -181,6 +223,30 @@ class JournalEntryModelTest(TestCase):
         self.assertEqual(self.journal_entry.total_debits, Decimal('0.00'))  # No linked entries yet
         self.assertEqual(self.journal_entry.total_credits, Decimal('0.00'))
         self.assertTrue(self.journal_entry.is_balanced)
+    
+    def test_with_totals_annotations(self):
+        """Test with_totals() computes the balance in SQL and feeds the properties."""
+        GeneralLedger.objects.filter(company=self.company).update(journal_entry=self.journal_entry)
+        
+        journal = JournalEntry.objects.with_totals().get(pk=self.journal_entry.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(journal.total_debits, Decimal('1000.00'))
+            self.assertEqual(journal.total_credits, Decimal('1000.00'))
+            self.assertTrue(journal.is_balanced)
+        
+        GeneralLedger.objects.create(
+            company=self.company,
+            date=self.calendar,
+            account=self.cash_account,
+            journal_entry=self.journal_entry,
+            details="Unmatched debit",
+            amount=Decimal('0.10'),
+            transaction_type='DEBIT'
+        )
+        journal = JournalEntry.objects.with_totals().get(pk=self.journal_entry.pk)
+        self.assertFalse(journal.is_balanced)
+        self.assertEqual(journal.get_balance_difference(), Decimal('0.10'))
+        self.assertEqual(journal.total_debits, self.journal_entry.total_debits)
 
 
 class AccountingAPITest(APITestCase):
@@ -347,7 +413,34 @@ class ReportAPITest(APITestCase):
         self.assertIn('total_revenue', response.data)
         self.assertIn('total_expenses', response.data)
         self.assertIn('net_income', response.data)
-    
+
+    def test_profit_loss_details_per_entry(self):
+        """Test P&L detail lines list every ledger entry, refunds included."""
+        calendar = get_calendar(self.company.company_id, date(2024, 3, 1))
+        for amount, transaction_type in (('200.00', 'CREDIT'), ('300.00', 'CREDIT'), ('50.00', 'DEBIT')):
+            GeneralLedger.objects.create(
+                company=self.company,
+                date=calendar,
+                account=self.revenue_account,
+                details="Revenue earned",
+                amount=Decimal(amount),
+                transaction_type=transaction_type
+            )
+
+        response = self.client.get(reverse('profit-loss-report'), {
+            'company_id': self.company.company_id,
+            'start_date': '2024-01-01',
+            'end_date': '2024-12-31'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(line['amount'] for line in response.data['revenue_details']), [
+            Decimal('50.00'), Decimal('200.00'), Decimal('300.00')
+        ])
+        self.assertEqual({line['account'] for line in response.data['revenue_details']}, {'Sales Revenue'})
+        self.assertEqual(response.data['expense_details'], [])
+        self.assertEqual(response.data['total_revenue'], Decimal('500.00'))
+        self.assertEqual(response.data['net_income'], Decimal('500.00'))
+
     def test_balance_sheet_report_api(self):
         """Test balance sheet report API."""
         url = reverse('balance-sheet-report')
@@ -375,4 +468,1943 @@ class ReportAPITest(APITestCase):
         self.assertIn('accounts', response.data)
         self.assertIn('total_debits', response.data)
         self.assertIn('total_credits', response.data)
-        self.assertIn('is_balanced', response.data)
\ No newline at end of file
+        self.assertIn('is_balanced', response.data)
+    
+    def test_trial_balance_values(self):
+        """Test trial balance totals come from a single daily balance query."""
+        url = reverse('trial-balance-report')
+        params = {
+            'company_id': self.company.company_id,
+            'as_of_date': date.today().isoformat()
+        }
+        
+        with self.assertNumQueries(2):  # company lookup + account running totals
+            response = self.client.get(url, params)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['accounts']), 2)
+        self.assertEqual(response.data['total_debits'], Decimal('1000.00'))
+        self.assertEqual(response.data['total_credits'], Decimal('1000.00'))
+        self.assertTrue(response.data['is_balanced'])
+
+
+class AccountDailyBalanceTest(TestCase):
+    """Test cases for incremental maintenance of AccountDailyBalance."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        self.day1 = Calendar.objects.create(
+            company=self.company, date=date(2024, 1, 1), year=2024,
+            quarter="Q1", month="January", day="Monday"
+        )
+        self.day2 = Calendar.objects.create(
+            company=self.company, date=date(2024, 1, 2), year=2024,
+            quarter="Q1", month="January", day="Tuesday"
+        )
+        self.cash = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+    
+    def create_entry(self, calendar, amount, transaction_type):
+        return GeneralLedger.objects.create(
+            company=self.company,
+            date=calendar,
+            account=self.cash,
+            details="Test entry",
+            amount=Decimal(amount),
+            transaction_type=transaction_type
+        )
+    
+    def balance_rows(self):
+        return list(
+            AccountDailyBalance.objects.filter(account=self.cash).order_by('date').values_list(
+                'date', 'debit_total', 'credit_total', 'entry_count', 'balance'
+            )
+        )
+    
+    def test_running_balance_follows_ledger(self):
+        """Test inserts, updates and deletes keep running balances correct."""
+        self.create_entry(self.day2, '50.00', 'CREDIT')
+        entry = self.create_entry(self.day1, '200.00', 'DEBIT')
+        
+        self.assertEqual(self.balance_rows(), [
+            (date(2024, 1, 1), Decimal('200'), Decimal('0'), 1, Decimal('200')),
+            (date(2024, 1, 2), Decimal('0'), Decimal('50'), 1, Decimal('150')),
+        ])
+        
+        # Moving the entry to day 2 empties day 1
+        entry.date = self.day2
+        entry.amount = Decimal('80.00')
+        entry.save()
+        self.assertEqual(self.balance_rows(), [
+            (date(2024, 1, 2), Decimal('80'), Decimal('50'), 2, Decimal('30')),
+        ])
+        
+        entry.delete()
+        self.assertEqual(self.balance_rows(), [
+            (date(2024, 1, 2), Decimal('0'), Decimal('50'), 1, Decimal('-50')),
+        ])
+    
+    def test_incremental_rows_match_rebuild(self):
+        """Test incrementally maintained rows equal a full rebuild."""
+        self.create_entry(self.day2, '75.25', 'DEBIT')
+        self.create_entry(self.day1, '10.00', 'CREDIT')
+        self.create_entry(self.day2, '5.00', 'CREDIT')
+        incremental = self.balance_rows()
+        
+        rebuild_daily_balances(company_id=self.company.company_id)
+        self.assertEqual(self.balance_rows(), incremental)
+    
+    def test_owner_deletes_skip_per_row_deltas(self):
+        """Test deleting an account or company does not update balances row by row."""
+        for day in range(1, 21):
+            calendar = get_calendar(self.company.company_id, date(2024, 2, day))
+            self.create_entry(calendar, '10.00', 'DEBIT')
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.cash.delete()
+        
+        balance_sql = [query['sql'] for query in queries if 'accounting_accountdailybalance' in query['sql']]
+        self.assertFalse([sql for sql in balance_sql if sql.startswith('UPDATE')])
+        self.assertEqual(len(balance_sql), 1)  # the cascaded DELETE
+        self.assertFalse(AccountDailyBalance.objects.exists())
+        
+        
+        self.cash = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        for calendar in (self.day1, self.day2):
+            self.create_entry(calendar, '10.00', 'DEBIT')
+        with CaptureQueriesContext(connection) as queries:
+            self.company.delete()
+        self.assertFalse([query for query in queries if query['sql'].startswith('UPDATE')])
+        self.assertFalse(AccountDailyBalance.objects.exists())
+    
+    def test_concurrent_first_posting(self):
+        """Test a day row created between the existence check and the insert is updated instead."""
+        self.create_entry(self.day1, '20.00', 'DEBIT')
+        
+        # Simulate the other transaction winning the race for the same (account, date)
+        with mock.patch('django.db.models.query.QuerySet.exists', return_value=False):
+            apply_ledger_delta(self.company.company_id, self.cash.id, date(2024, 1, 1),
+                               Decimal('5.00'), ZERO, 1)
+        
+        self.assertEqual(self.balance_rows(), [
+            (date(2024, 1, 1), Decimal('25'), Decimal('0'), 2, Decimal('25')),
+        ])
+
+
+class LedgerExportTest(APITestCase):
+    """Test cases for the streaming ledger CSV export."""
+    
+    LEDGER_ROWS = 12000
+    
+    # Materializing 12,000 ledger instances takes ~40 MB; streaming stays near 3 MB
+    MEMORY_CEILING = 8 * 1024 * 1024
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Seed a synthetic ledger once for all export tests."""
+        cls.company = seed_synthetic_company('Export Company', ledger_rows=cls.LEDGER_ROWS)
+    
+    def export(self, **params):
+        url = reverse('generalledger-export-csv')
+        return self.client.get(url, {'company': self.company.company_id, **params})
+    
+    def test_export_csv_streams_all_rows(self):
+        """Test the export streams a header plus one line per ledger entry."""
+        response = self.export()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['Entry No', 'Company', 'Date'])
+        self.assertEqual(len(lines), self.LEDGER_ROWS + 1)
+    
+    def test_export_csv_gzip(self):
+        """Test gzip output decompresses to the plain CSV export."""
+        plain = b''.join(self.export().streaming_content)
+        response = self.export(gzip='true')
+        
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+    
+    def test_export_csv_memory_ceiling(self):
+        """Test peak memory while streaming stays bounded regardless of export size."""
+        response = self.export()
+        
+        tracemalloc.start()
+        try:
+            exported = sum(len(chunk) for chunk in response.streaming_content)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        self.assertGreater(exported, 0)
+        self.assertLess(peak, self.MEMORY_CEILING)
+    
+    @unittest.skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_export_parquet(self):
+        """Test Parquet export writes one row group per chunk with exact decimals."""
+        response = self.client.get(
+            reverse('generalledger-export-parquet'),
+            {'company': self.company.company_id, 'account': 1000}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        table = pyarrow.parquet.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        entries = GeneralLedger.objects.filter(company=self.company, account__account_key=1000)
+        
+        self.assertEqual(table.num_rows, entries.count())
+        self.assertEqual(table.schema.field('amount').type, pyarrow.decimal128(19, 4))
+        self.assertEqual(
+            sorted(table.column('amount').to_pylist()),
+            sorted(entries.values_list('amount', flat=True))
+        )
+    
+    @unittest.skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_export_arrow(self):
+        """Test Arrow IPC export streams every filtered row in record batches."""
+        response = self.client.get(
+            reverse('generalledger-export-arrow'),
+            {'company': self.company.company_id}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        reader = pyarrow.ipc.open_stream(b''.join(response.streaming_content))
+        batches = list(reader)
+        
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(sum(batch.num_rows for batch in batches), self.LEDGER_ROWS)
+
+
+class AccountBalancesRegressionTest(APITestCase):
+    """Compare the grouped account_balances action with the original Python loop."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Seed random ledger data."""
+        cls.company = seed_synthetic_company('Balances Company', ledger_rows=600, seed=7)
+    
+    def legacy_account_balances(self, queryset):
+        """The per-row loop account_balances used before aggregation moved to SQL."""
+        balances = {}
+        for entry in queryset:
+            account_key = entry.account.account_key
+            if account_key not in balances:
+                balances[account_key] = {
+                    'account_key': account_key,
+                    'account_name': entry.account.account,
+                    'class_name': entry.account.class_name,
+                    'debits': Decimal('0.00'),
+                    'credits': Decimal('0.00'),
+                    'balance': Decimal('0.00'),
+                    'entry_count': 0
+                }
+            balances[account_key]['entry_count'] += 1
+            if entry.transaction_type == 'DEBIT':
+                balances[account_key]['debits'] += entry.amount
+            else:
+                balances[account_key]['credits'] += entry.amount
+            balances[account_key]['balance'] = (
+                balances[account_key]['debits'] - balances[account_key]['credits']
+            )
+        return balances
+    
+    def assert_matches_legacy(self, params, queryset):
+        response = self.client.get(reverse('generalledger-account-balances'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        expected = self.legacy_account_balances(queryset)
+        self.assertEqual({row['account_key']: row for row in response.data}, expected)
+        self.assertEqual(
+            [row['account_key'] for row in response.data], sorted(expected)
+        )
+    
+    def test_grouped_balances_match_loop(self):
+        """Test ledger-side grouping matches the loop for non-date filters."""
+        params = {'company': self.company.company_id, 'amount__gte': 5000}
+        queryset = GeneralLedger.objects.filter(company=self.company, amount__gte=5000)
+        self.assert_matches_legacy(params, queryset)
+    
+    def test_daily_balances_match_loop(self):
+        """Test the daily balance fast path matches the loop for a date range."""
+        params = {
+            'company': self.company.company_id,
+            'date_after': '2021-01-01',
+            'date_before': '2021-12-31'
+        }
+        queryset = GeneralLedger.objects.filter(
+            company=self.company, date__date__range=['2021-01-01', '2021-12-31']
+        )
+        self.assert_matches_legacy(params, queryset)
+
+
+class JournalEntryAPITest(APITestCase):
+    """Test cases for journal entry listing endpoints."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        self.calendar = Calendar.objects.create(
+            company=self.company, date=date(2024, 1, 1), year=2024,
+            quarter="Q1", month="1", day="1"
+        )
+        self.cash = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        self.sales = ChartOfAccounts.objects.create(
+            company=self.company, account_key=4000, report="Income Statement",
+            class_name="Revenue", sub_class="Operating Revenue", sub_class2="",
+            account="Sales", sub_account=""
+        )
+    
+    def create_journals(self, count, credit_amount=Decimal('100.00')):
+        for i in range(count):
+            journal = JournalEntry.objects.create(
+                company=self.company, date=self.calendar, description=f"Sale {i}"
+            )
+            for account, amount, transaction_type in (
+                (self.cash, Decimal('100.00'), 'DEBIT'),
+                (self.sales, credit_amount, 'CREDIT'),
+            ):
+                GeneralLedger.objects.create(
+                    company=self.company, date=self.calendar, account=account,
+                    journal_entry=journal, details=f"Sale {i}", amount=amount,
+                    transaction_type=transaction_type
+                )
+    
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+    
+    def test_list_query_count_is_constant(self):
+        """Test listing journals does not issue queries per journal."""
+        url = reverse('journalentry-list')
+        
+        self.create_journals(2)
+        few = self.count_queries(url)
+        self.create_journals(8)
+        many = self.count_queries(url)
+        
+        self.assertEqual(few, many)
+    
+    def test_balance_report(self):
+        """Test balance report flags unbalanced journals from annotations."""
+        self.create_journals(3)
+        self.create_journals(1, credit_amount=Decimal('90.00'))
+        
+        response = self.client.get(reverse('journalentry-balance-report'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_journals'], 4)
+        self.assertEqual(response.data['balanced_journals'], 3)
+        self.assertEqual(response.data['unbalanced_entries'][0]['difference'], Decimal('10.00'))
+    
+    def test_unbalanced_and_large_filters(self):
+        """Test journal balance filters run as a single SQL query with request thresholds."""
+        self.create_journals(3)
+        self.create_journals(1, credit_amount=Decimal('90.00'))
+        
+        def filtered_count(params):
+            filterset = JournalEntryFilter(params, queryset=JournalEntry.objects.all())
+            with self.assertNumQueries(1):
+                return filterset.qs.count()
+        
+        self.assertEqual(filtered_count({'unbalanced_entries': 'true'}), 1)
+        self.assertEqual(filtered_count({'unbalanced_entries': 'true', 'unbalanced_tolerance': '10'}), 0)
+        self.assertEqual(filtered_count({'large_entries': 'true'}), 0)
+        self.assertEqual(filtered_count({'large_entries': 'true', 'large_entries_threshold': '99.99'}), 4)
+        self.assertEqual(filtered_count({'large_entries': 'true', 'large_entries_threshold': '100'}), 0)
+
+
+class IngestTransactionsAPITest(APITestCase):
+    """Test cases for the bulk ingestion endpoint."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        self.cash = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        self.sales = ChartOfAccounts.objects.create(
+            company=self.company, account_key=4000, report="Income Statement",
+            class_name="Revenue", sub_class="Operating Revenue", sub_class2="",
+            account="Sales", sub_account=""
+        )
+        Territory.objects.create(company=self.company, territory_key=1, country="USA", region="East")
+    
+    def journal(self, day, amount='100.00', credit_amount=None, account_key=4000):
+        return {
+            'date': day,
+            'description': f'Sale on {day}',
+            'entries': [
+                {'account_key': 1000, 'amount': amount, 'type': 'DEBIT', 'territory_key': 1},
+                {'account_key': account_key, 'amount': credit_amount or amount, 'type': 'Credit'},
+            ]
+        }
+    
+    def test_ingest_journals(self):
+        """Test valid journals are inserted with a fixed number of queries."""
+        journals = [self.journal(f'2024-01-{day:02d}') for day in range(1, 29)] * 20
+        url = reverse('ingest-transactions')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                url, {'company_id': self.company.company_id, 'journals': journals}, format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['journals_created'], 560)
+        self.assertEqual(response.data['ledger_entries_created'], 1120)
+        self.assertEqual(response.data['calendar_entries_created'], 28)
+        self.assertEqual(response.data['errors'], [])
+        self.assertIn('rows_per_second', response.data)
+        # Lookups are per request; only the bulk insert batches grow with volume
+        self.assertLess(len(queries), len(journals) // 10)
+        
+        self.assertEqual(Calendar.objects.filter(company=self.company).count(), 28)
+        self.assertEqual(GeneralLedger.objects.filter(territory__isnull=False).count(), 560)
+        self.assertTrue(all(journal.is_balanced for journal in JournalEntry.objects.with_totals()))
+        
+        # Daily balances are refreshed even though bulk_create skips the signals
+        incremental = list(AccountDailyBalance.objects.order_by('account', 'date').values_list(
+            'account', 'date', 'entry_count', 'balance'
+        ))
+        rebuild_daily_balances(company_id=self.company.company_id)
+        self.assertEqual(incremental, list(AccountDailyBalance.objects.order_by('account', 'date').values_list(
+            'account', 'date', 'entry_count', 'balance'
+        )))
+    
+    def test_ingest_reports_per_journal_errors(self):
+        """Test invalid journals are skipped and reported by index."""
+        journals = [
+            self.journal('2024-02-01'),
+            self.journal('2024-02-30'),
+            self.journal('2024-02-02', credit_amount='99.00'),
+            self.journal('2024-02-03', account_key=9999),
+            self.journal('2024-02-04'),
+        ]
+        response = self.client.post(
+            reverse('ingest-transactions'),
+            {'company_id': self.company.company_id, 'journals': journals},
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['journals_created'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3])
+        self.assertIn('unknown account_key 9999', response.data['errors'][2]['errors'][0])
+        self.assertEqual(JournalEntry.objects.count(), 2)
+
+    def test_ingest_rejects_invalid_details(self):
+        """Test overlong or non-string details fail only their own journal."""
+        too_long = self.journal('2024-02-01')
+        too_long['entries'][0]['details'] = 'x' * 256
+        not_text = self.journal('2024-02-02')
+        not_text['entries'][1]['details'] = {'note': 'sale'}
+        valid = self.journal('2024-02-03')
+        valid['entries'][0]['details'] = 'x' * 255
+
+        response = self.client.post(
+            reverse('ingest-transactions'),
+            {'company_id': self.company.company_id, 'journals': [too_long, not_text, valid]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['journals_created'], 1)
+        self.assertEqual(response.data['errors'], [
+            {'index': 0, 'errors': ["Entry 0: 'details' must be at most 255 characters"]},
+            {'index': 1, 'errors': ["Entry 1: 'details' must be a string"]},
+        ])
+        self.assertTrue(GeneralLedger.objects.filter(details='x' * 255).exists())
+
+
+class CalendarCacheTest(TestCase):
+    """Test cases for calendar pre-generation and the calendar cache."""
+    
+    def setUp(self):
+        """Set up test data."""
+        clear_calendar_cache()
+        self.company = Company.objects.create(company_name="Test Company")
+    
+    def test_generate_calendar_command(self):
+        """Test the command bulk-creates every missing day once."""
+        call_command(
+            'generate_calendar', company_id=self.company.company_id,
+            start='2024-01-01', end='2024-12-31', stdout=io.StringIO()
+        )
+        call_command(
+            'generate_calendar', company_id=self.company.company_id,
+            start='2024-12-01', end='2025-01-31', stdout=io.StringIO()
+        )
+        
+        calendar = Calendar.objects.filter(company=self.company)
+        self.assertEqual(calendar.count(), 366 + 31)
+        self.assertEqual(calendar.get(date=date(2024, 2, 29)).quarter, 'Q1')
+    
+    def test_cached_lookup_skips_database(self):
+        """Test repeated lookups are served from the cache after commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = get_calendar(self.company.company_id, date(2024, 3, 1))
+        
+        with self.assertNumQueries(0):
+            cached = get_calendar(self.company.company_id, '2024-03-01')
+        
+        self.assertEqual(cached.pk, first.pk)
+        self.assertEqual(cached.date, date(2024, 3, 1))
+        self.assertEqual(calendar_cache_info()['hits'], 1)
+    
+    def test_cache_invalidated_on_delete(self):
+        """Test deleting a Calendar row evicts it from the cache."""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = get_calendar(self.company.company_id, date(2024, 3, 1))
+        self.assertEqual(calendar_cache_info()['size'], 1)
+        first.delete()
+        self.assertEqual(calendar_cache_info()['size'], 0)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            recreated = get_calendar(self.company.company_id, date(2024, 3, 1))
+        
+        self.assertTrue(Calendar.objects.filter(pk=recreated.pk).exists())
+
+
+class ImportLedgerCommandTest(TestCase):
+    """Test cases for the import_ledger management command."""
+    
+    HEADER = 'journal,date,account_key,amount,transaction_type,details,territory_key,entry_no\n'
+    
+    def setUp(self):
+        """Set up test data."""
+        clear_calendar_cache()
+        self.company = Company.objects.create(company_name="Test Company")
+        for account_key, class_name in ((1000, "Asset"), (4000, "Revenue")):
+            ChartOfAccounts.objects.create(
+                company=self.company, account_key=account_key, report="Balance Sheet",
+                class_name=class_name, sub_class="", sub_class2="",
+                account=class_name, sub_account=""
+            )
+        Territory.objects.create(company=self.company, territory_key=1, country="USA", region="East")
+    
+    def write_file(self, lines, suffix='.csv'):
+        handle = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False, newline='')
+        with handle:
+            handle.write(self.HEADER + ''.join(lines))
+        self.addCleanup(os.unlink, handle.name)
+        return handle.name
+    
+    def test_import_csv(self):
+        """Test rows, journals, calendar and daily balances are written in one pass."""
+        lines = []
+        for day in range(1, 11):
+            lines.append(f'J{day},2023-05-{day:02d},1000,250.50,DEBIT,Sale {day},1,\n')
+            lines.append(f'J{day},2023-05-{day:02d},4000,250.50,credit,Sale {day},,\n')
+        lines.append('J99,2023-06-01,1000,10,DEBIT,Opening,,5000\n')
+        lines.append('J99,2023-06-01,4000,10,CREDIT,,,5001\n')
+        path = self.write_file(lines)
+        
+        output = io.StringIO()
+        call_command('import_ledger', path, company_id=self.company.company_id, stdout=output)
+        
+        self.assertIn('imported 22 ledger rows and 11 journals', output.getvalue())
+        self.assertEqual(GeneralLedger.objects.count(), 22)
+        self.assertEqual(GeneralLedger.objects.filter(territory__isnull=False).count(), 10)
+        self.assertTrue(GeneralLedger.objects.filter(entry_no=5001, details='').exists())
+        self.assertEqual(JournalEntry.objects.get(ledger_entries__entry_no=5000).description, 'Opening')
+        self.assertTrue(all(journal.is_balanced for journal in JournalEntry.objects.with_totals()))
+        self.assertEqual(Calendar.objects.filter(company=self.company).count(), 11)
+        
+        incremental = list(AccountDailyBalance.objects.order_by('account', 'date').values_list(
+            'account', 'date', 'entry_count', 'balance'
+        ))
+        rebuild_daily_balances(company_id=self.company.company_id)
+        self.assertEqual(len(incremental), 22)
+        self.assertEqual(incremental, list(AccountDailyBalance.objects.order_by('account', 'date').values_list(
+            'account', 'date', 'entry_count', 'balance'
+        )))
+    
+    def test_invalid_file_imports_nothing(self):
+        """Test a bad row or unbalanced journal aborts the whole import."""
+        path = self.write_file([
+            'J1,2023-05-01,1000,100,DEBIT,Sale,,\n',
+            'J1,2023-05-01,4000,100,CREDIT,Sale,,\n',
+            'J2,2023-05-02,9999,100,DEBIT,Sale,,\n',
+            'J3,2023-05-03,1000,100,DEBIT,Sale,,\n',
+            'J3,2023-05-03,4000,90,CREDIT,Sale,,\n',
+            'J4,2023-05-32,1000,abc,DEBIT,Sale,,\n',
+        ])
+        
+        with self.assertRaises(CommandError) as context:
+            call_command('import_ledger', path, company_id=self.company.company_id, stdout=io.StringIO())
+        
+        message = str(context.exception)
+        self.assertIn("Row 6: 'amount' must be a positive number", message)
+        self.assertIn("Row 6: 'date' must be an ISO date", message)
+        self.assertIn('Row 3: unknown account_key 9999', message)
+        self.assertIn('Journal J3', message)
+        self.assertEqual(GeneralLedger.objects.count(), 0)
+        self.assertEqual(JournalEntry.objects.count(), 0)
+    
+    @unittest.skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_import_parquet(self):
+        """Test Parquet files are imported batch by batch."""
+        path = self.write_file([], suffix='.parquet')
+        table = pyarrow.table({
+            'journal': ['P1', 'P1'],
+            'date': [date(2023, 7, 1), date(2023, 7, 1)],
+            'account_key': [1000, 4000],
+            'amount': [Decimal('12.3400'), Decimal('12.3400')],
+            'type': ['DEBIT', 'CREDIT'],
+        })
+        pyarrow.parquet.write_table(table, path)
+        
+        call_command('import_ledger', path, company_id=self.company.company_id, chunk_size=1, stdout=io.StringIO())
+        
+        self.assertEqual(GeneralLedger.objects.filter(amount=Decimal('12.34')).count(), 2)
+        self.assertEqual(JournalEntry.objects.get().description, 'P1')
+
+
+class LedgerKeysetPaginationTest(APITestCase):
+    """Test cases for keyset pagination of the general ledger listing."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        account = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        # Several entries per date so ties on the date are broken by entry_no
+        for i in range(25):
+            GeneralLedger.objects.create(
+                company=self.company, date=get_calendar(self.company.company_id, date(2024, 1, 1 + i % 7)),
+                account=account, details=f"Entry {i}", amount=Decimal('10.00'), transaction_type='DEBIT'
+            )
+        self.url = reverse('generalledger-list')
+    
+    def test_cursor_pages_follow_default_ordering(self):
+        """Test walking next links returns every row once in ledger order, without COUNT."""
+        expected = list(GeneralLedger.objects.order_by('-posting_date', '-entry_no').values_list('entry_no', flat=True))
+        
+        seen = []
+        url = f'{self.url}?pagination=cursor&page_size=10'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+            seen.extend(row['entry_no'] for row in response.data['results'])
+            last = response
+            url = response.data['next']
+        
+        self.assertEqual(seen, expected)
+        
+        previous = self.client.get(last.data['previous'])
+        self.assertEqual([row['entry_no'] for row in previous.data['results']], expected[10:20])
+        self.assertEqual(previous.data['results'][0]['month'], 'January')
+    
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected."""
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_page_number_pagination_is_default(self):
+        """Test listing without a cursor keeps page-number pagination."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 25)
+
+
+class LedgerLeanListTest(APITestCase):
+    """Test cases for the lean values_list() read path of the ledger listing."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        account = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        territory = Territory.objects.create(company=self.company, territory_key=1, country="USA", region="East")
+        for i in range(12):
+            GeneralLedger.objects.create(
+                company=self.company, date=get_calendar(self.company.company_id, date(2024, 2, 1 + i)),
+                account=account, territory=territory if i % 2 else None, details=f"Entry {i}",
+                amount=Decimal('10.125') * (i + 1), transaction_type='DEBIT',
+                reference_number=f"R{i}" if i % 3 else None
+            )
+        self.url = reverse('generalledger-list')
+    
+    def test_lean_rows_match_serializer(self):
+        """Test the lean path returns exactly what GeneralLedgerSerializer returns."""
+        serialized = self.client.get(self.url)
+        lean = self.client.get(self.url, {'lean': 'true'})
+        
+        self.assertEqual(lean.status_code, status.HTTP_200_OK)
+        self.assertEqual(lean.data['count'], 12)
+        self.assertEqual(lean.data['results'], serialized.data['results'])
+    
+    def test_selected_fields(self):
+        """Test ?fields= limits the columns in requested order and works with cursors."""
+        response = self.client.get(self.url, {'fields': 'amount,entry_no,territory_name', 'pagination': 'cursor', 'page_size': 5})
+        
+        self.assertEqual(list(response.data['results'][0]), ['amount', 'entry_no', 'territory_name'])
+        self.assertEqual(response.data['results'][0]['amount'], '121.5000')
+        
+        following = self.client.get(response.data['next'])
+        self.assertEqual(len(following.data['results']), 5)
+        self.assertEqual(list(following.data['results'][0]), ['amount', 'entry_no', 'territory_name'])
+    
+    def test_unknown_field(self):
+        """Test unknown field names are rejected."""
+        response = self.client.get(self.url, {'fields': 'entry_no,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', str(response.data['fields']))
+
+
+class LedgerResultCacheTest(APITestCase):
+    """Test cases for cached ledger aggregation results."""
+    
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.company = Company.objects.create(company_name="Test Company")
+        self.other = Company.objects.create(company_name="Other Company")
+        self.account = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        self.calendar = get_calendar(self.company.company_id, date(2024, 1, 1))
+        self.add_entry(Decimal('100.00'))
+        self.url = reverse('generalledger-summary-by-account')
+    
+    def add_entry(self, amount):
+        return GeneralLedger.objects.create(
+            company=self.company, date=self.calendar, account=self.account,
+            details="Sale", amount=amount, transaction_type='DEBIT'
+        )
+    
+    def summary(self, **params):
+        response = self.client.get(self.url, {'company': self.company.company_id, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+    
+    def test_repeated_request_is_served_from_cache(self):
+        """Test the second identical request runs no aggregation query."""
+        first = self.summary(amount__gte='1')
+        with CaptureQueriesContext(connection) as queries:
+            second = self.summary(amount__gte='1', format='json')
+        
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertFalse(any('accounting_generalledger' in query['sql'] for query in queries))
+    
+    def test_ledger_writes_invalidate_results(self):
+        """Test saves, updates and deletes are visible on the next request."""
+        self.assertEqual(self.summary(amount__gte='1').data[0]['total_amount'], Decimal('100.00'))
+        
+        entry = self.add_entry(Decimal('50.00'))
+        self.assertEqual(self.summary(amount__gte='1').data[0]['total_amount'], Decimal('150.00'))
+        
+        entry.amount = Decimal('25.00')
+        entry.save()
+        self.assertEqual(self.summary(amount__gte='1').data[0]['total_amount'], Decimal('125.00'))
+        
+        entry.delete()
+        response = self.summary(amount__gte='1')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data[0]['total_amount'], Decimal('100.00'))
+    
+    def test_other_company_writes_keep_results(self):
+        """Test writes to another company leave a company's cached results in place."""
+        self.summary(amount__gte='1')
+        ChartOfAccounts.objects.create(
+            company=self.other, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        self.assertEqual(self.summary(amount__gte='1')['X-Cache'], 'HIT')
+        
+        self.account.account = "Cash at bank"
+        self.account.save()
+        self.assertEqual(self.summary(amount__gte='1')['X-Cache'], 'MISS')
+
+    def test_results_expire_after_timeout(self):
+        """Test results are kept only for RESULT_CACHE_TIMEOUT seconds."""
+        # Writes handled by another worker do not bump this process's counters
+        with mock.patch('accounting.result_cache.cache.set', wraps=cache.set) as cache_set:
+            with override_settings(RESULT_CACHE_TIMEOUT=60):
+                self.summary(amount__gte='1')
+        self.assertEqual(cache_set.call_args.kwargs['timeout'], 60)
+        
+        with override_settings(RESULT_CACHE_TIMEOUT=0):
+            self.assertEqual(self.summary(amount__gte='2')['X-Cache'], 'MISS')
+            self.assertEqual(self.summary(amount__gte='2')['X-Cache'], 'MISS')
+
+
+class LedgerPivotTest(APITestCase):
+    """Test cases for the SQL/NumPy ledger pivot engine."""
+    
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.company = Company.objects.create(company_name="Test Company")
+        cash = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        sales = ChartOfAccounts.objects.create(
+            company=self.company, account_key=4000, report="Profit and Loss",
+            class_name="Revenue", sub_class="Sales", sub_class2="",
+            account="Sales", sub_account=""
+        )
+        east = Territory.objects.create(company=self.company, territory_key=1, country="USA", region="East")
+        west = Territory.objects.create(company=self.company, territory_key=2, country="USA", region="West")
+        
+        for day, account, territory, amount, transaction_type in (
+            (date(2024, 1, 5), cash, east, Decimal('100.00'), 'DEBIT'),
+            (date(2024, 1, 5), sales, east, Decimal('100.00'), 'CREDIT'),
+            (date(2024, 2, 10), cash, west, Decimal('40.00'), 'DEBIT'),
+            (date(2024, 2, 10), sales, west, Decimal('40.00'), 'CREDIT'),
+            (date(2024, 2, 12), cash, None, Decimal('5.00'), 'DEBIT'),
+        ):
+            GeneralLedger.objects.create(
+                company=self.company, date=get_calendar(self.company.company_id, day),
+                account=account, territory=territory, details="Entry",
+                amount=amount, transaction_type=transaction_type
+            )
+    
+    def test_class_by_month(self):
+        """Test arbitrary dimensions produce a dense matrix with totals."""
+        response = self.client.get(reverse('generalledger-pivot'), {
+            'company': self.company.company_id, 'rows': 'class', 'columns': 'month', 'value': 'net'
+        })
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['rows']['keys'], [['Asset'], ['Revenue']])
+        self.assertEqual(len(response.data['columns']['keys']), 2)
+        self.assertEqual(response.data['values'], [[100.0, 45.0], [-100.0, -40.0]])
+        self.assertEqual(response.data['row_totals'], [145.0, -140.0])
+        self.assertEqual(response.data['grand_total'], 5.0)
+    
+    def test_territory_by_account_shape(self):
+        """Test the territory x account pivot keeps its response shape."""
+        response = self.client.get(reverse('generalledger-pivot-territory-by-account'))
+        
+        self.assertEqual(response.data['territories'], ['USA - East', 'USA - West'])
+        self.assertEqual(response.data['accounts'], ['Cash', 'Sales'])
+        self.assertEqual(response.data['data']['USA - West'], {'Cash': 40.0, 'Sales': 40.0})
+    
+    def test_unknown_dimension(self):
+        """Test unknown dimensions and identical rows/columns are rejected."""
+        url = reverse('generalledger-pivot')
+        
+        response = self.client.get(url, {'rows': 'password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('rows', response.data)
+        
+        response = self.client.get(url, {'rows': 'account', 'columns': 'account'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueryMetricsMiddlewareTest(APITestCase):
+    """Test cases for the per-request query and latency metrics."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        self.client.delete(reverse('request-metrics'))
+    
+    def test_server_timing_header(self):
+        """Test responses report their query count and timings."""
+        response = self.client.get(reverse('company-list'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'serialize;dur=', 'render;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertNotIn('desc="0 queries"', timing)
+    
+    def test_metrics_endpoint_percentiles(self):
+        """Test samples are aggregated per route for viewsets and function views."""
+        for _ in range(3):
+            self.client.get(reverse('company-list'))
+        self.client.get(reverse('query-capabilities'))
+        
+        response = self.client.get(reverse('request-metrics'))
+        routes = response.data['routes']
+        
+        self.assertEqual(routes['GET company-list']['count'], 3)
+        self.assertEqual(set(routes['GET company-list']['queries']), {'p50', 'p95', 'p99', 'max'})
+        self.assertGreater(routes['GET company-list']['size']['p50'], 0)
+        self.assertIn('GET query-capabilities', routes)
+
+    def test_serializer_time_recorded(self):
+        """Test viewsets with SerializerTimingMixin report serializer.data time apart."""
+        for number in range(20):
+            Company.objects.create(company_name=f"Company {number}")
+        
+        response = self.client.get(reverse('company-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('serialize;dur=0.0', response['Server-Timing'])
+        
+        # Views without the mixin keep serializer time in app
+        response = self.client.get(reverse('legacy-companies'))
+        self.assertIn('serialize;dur=0.0', response['Server-Timing'])
+        
+        routes = self.client.get(reverse('request-metrics')).data['routes']
+        self.assertGreater(routes['GET company-list']['serialize_ms']['max'], 0)
+        self.assertEqual(routes['GET legacy-companies']['serialize_ms']['max'], 0)
+
+
+class CompanyStatisticsTest(APITestCase):
+    """Test cases for the company statistics endpoint."""
+    
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.company = Company.objects.create(company_name="Test Company")
+        for account_key, class_name in ((1000, "Asset"), (1100, "Asset"), (4000, "Revenue")):
+            ChartOfAccounts.objects.create(
+                company=self.company, account_key=account_key, report="Balance Sheet",
+                class_name=class_name, sub_class="", sub_class2="",
+                account=f"Account {account_key}", sub_account=""
+            )
+        Territory.objects.create(company=self.company, territory_key=1, country="USA", region="East")
+        ingest_journals(self.company, [
+            {'date': day, 'description': 'Sale', 'entries': [
+                {'account_key': 1000, 'amount': amount, 'type': 'DEBIT', 'territory_key': 1},
+                {'account_key': 4000, 'amount': amount, 'type': 'CREDIT'},
+            ]}
+            for day, amount in (('2024-01-10', '100.00'), ('2024-01-20', '50.00'), ('2024-02-05', '25.00'))
+        ])
+        # A journal with a single line is unbalanced
+        journal = JournalEntry.objects.create(
+            company=self.company, date=get_calendar(self.company.company_id, date(2024, 2, 6)),
+            description="Half entry"
+        )
+        GeneralLedger.objects.create(
+            company=self.company, date=journal.date, account=ChartOfAccounts.objects.get(account_key=1100),
+            details="Half entry", amount=Decimal('10.00'), transaction_type='DEBIT', journal_entry=journal
+        )
+        self.url = reverse('company-statistics', kwargs={'pk': self.company.company_id})
+    
+    def test_statistics(self):
+        """Test counts and sums are rolled up correctly from the grouped queries."""
+        response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['accounts']['total_accounts'], 3)
+        self.assertEqual(response.data['accounts']['by_class'], [
+            {'class_name': 'Asset', 'count': 2}, {'class_name': 'Revenue', 'count': 1}
+        ])
+        self.assertEqual(response.data['territories']['total_territories'], 1)
+        
+        transactions = response.data['transactions']
+        self.assertEqual(transactions['total_entries'], 7)
+        self.assertEqual(transactions['total_amount'], Decimal('360.00'))
+        self.assertEqual(transactions['by_type'], [
+            {'transaction_type': 'CREDIT', 'count': 3, 'total_amount': Decimal('175.00')},
+            {'transaction_type': 'DEBIT', 'count': 4, 'total_amount': Decimal('185.00')},
+        ])
+        self.assertEqual([(item['count'], item['total_amount']) for item in transactions['by_month']], [
+            (4, Decimal('300.00')), (3, Decimal('60.00'))
+        ])
+        self.assertEqual(response.data['journal_entries'], {'total_journals': 4, 'balanced_entries': 3})
+    
+    def test_date_range_and_cache(self):
+        """Test results are cached per date range and invalidated by ledger writes."""
+        february = {'start_date': '2024-02-01', 'end_date': '2024-02-29'}
+        self.assertEqual(self.client.get(self.url, february).data['transactions']['total_entries'], 3)
+        self.assertEqual(self.client.get(self.url).data['transactions']['total_entries'], 7)
+        self.assertEqual(self.client.get(self.url, february)['X-Cache'], 'HIT')
+        
+        GeneralLedger.objects.filter(details="Half entry").delete()
+        response = self.client.get(self.url, february)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['transactions']['total_entries'], 2)
+
+
+class AccountUsageStatisticsTest(APITestCase):
+    """Test cases for single and batch account usage statistics."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        self.accounts = [
+            ChartOfAccounts.objects.create(
+                company=self.company, account_key=account_key, report="Balance Sheet",
+                class_name="Asset", sub_class="Current Asset", sub_class2="",
+                account=f"Account {account_key}", sub_account=""
+            )
+            for account_key in (1000, 1100, 1200)
+        ]
+        for day, account, amount, transaction_type in (
+            (date(2024, 1, 5), self.accounts[0], Decimal('100.00'), 'DEBIT'),
+            (date(2024, 1, 9), self.accounts[0], Decimal('30.00'), 'CREDIT'),
+            (date(2024, 2, 1), self.accounts[0], Decimal('20.00'), 'DEBIT'),
+            (date(2024, 2, 1), self.accounts[1], Decimal('5.00'), 'CREDIT'),
+        ):
+            GeneralLedger.objects.create(
+                company=self.company, date=get_calendar(self.company.company_id, day),
+                account=account, details="Entry", amount=amount, transaction_type=transaction_type
+            )
+    
+    def test_usage_statistics(self):
+        """Test the single-account statistics come from one aggregate."""
+        url = reverse('chartofaccounts-usage-statistics', kwargs={'pk': self.accounts[0].pk})
+        response = self.client.get(url, {'start_date': '2024-01-01', 'end_date': '2024-01-31'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['usage'], {
+            'total_transactions': 2,
+            'total_debits': Decimal('100.00'),
+            'total_credits': Decimal('30.00'),
+            'average_amount': Decimal('65.00'),
+            'largest_transaction': Decimal('100.00'),
+            'smallest_transaction': Decimal('30.00'),
+        })
+        self.assertEqual(len(response.data['monthly_activity']), 1)
+        self.assertEqual(response.data['monthly_activity'][0]['debits'], Decimal('100.00'))
+    
+    def test_usage_statistics_batch(self):
+        """Test many accounts are reported in a fixed number of queries."""
+        url = reverse('chartofaccounts-usage-statistics-batch')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'ids': ','.join(str(account.pk) for account in self.accounts),
+                                             'monthly': 'true'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 3)
+        results = {item['id']: item for item in response.data['results']}
+        self.assertEqual(results[self.accounts[0].pk]['usage']['total_transactions'], 3)
+        self.assertEqual(len(results[self.accounts[0].pk]['monthly_activity']), 2)
+        self.assertEqual(results[self.accounts[1].pk]['usage']['total_credits'], Decimal('5.00'))
+        self.assertEqual(results[self.accounts[2].pk]['usage']['total_transactions'], 0)
+        self.assertEqual(results[self.accounts[2].pk]['monthly_activity'], [])
+        
+        single = self.client.get(reverse('chartofaccounts-usage-statistics', kwargs={'pk': self.accounts[0].pk}))
+        self.assertEqual(results[self.accounts[0].pk]['usage'], single.data['usage'])
+    
+    def test_usage_statistics_batch_invalid_ids(self):
+        """Test malformed ids are rejected."""
+        response = self.client.get(reverse('chartofaccounts-usage-statistics-batch'), {'ids': '1,x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LedgerPostingDateTest(APITestCase):
+    """Test cases for the denormalised GeneralLedger.posting_date."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        self.account = ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet",
+            class_name="Asset", sub_class="Current Asset", sub_class2="",
+            account="Cash", sub_account=""
+        )
+        self.january = get_calendar(self.company.company_id, date(2024, 1, 5))
+        self.february = get_calendar(self.company.company_id, date(2024, 2, 1))
+
+    def entry(self, calendar, **kwargs):
+        return GeneralLedger(
+            company=self.company, date=calendar, account=self.account, details="Entry",
+            amount=Decimal('10.00'), transaction_type='DEBIT', **kwargs
+        )
+
+    def test_writes_set_posting_date(self):
+        """Test save, bulk_create and update copy the Calendar date."""
+        created = GeneralLedger.objects.create(
+            company=self.company, date=self.january, account=self.account, details="Entry",
+            amount=Decimal('10.00'), transaction_type='DEBIT'
+        )
+        self.assertEqual(created.posting_date, date(2024, 1, 5))
+
+        created.date = self.february
+        created.save(update_fields=['date'])
+        created.refresh_from_db()
+        self.assertEqual(created.posting_date, date(2024, 2, 1))
+
+        cached, by_id = GeneralLedger.objects.bulk_create([
+            self.entry(self.january),
+            GeneralLedger(company=self.company, date_id=self.february.pk, account=self.account,
+                          details="Entry", amount=Decimal('10.00'), transaction_type='DEBIT'),
+        ])
+        self.assertEqual(cached.posting_date, date(2024, 1, 5))
+        self.assertEqual(by_id.posting_date, date(2024, 2, 1))
+
+        GeneralLedger.objects.filter(pk=by_id.pk).update(date=self.january.pk)
+        by_id.refresh_from_db()
+        self.assertEqual(by_id.posting_date, date(2024, 1, 5))
+
+    def test_ingest_and_import_set_posting_date(self):
+        """Test the bulk write paths fill posting_date themselves."""
+        ingest_journals(self.company, [{'date': '2024-03-01', 'description': 'Sale', 'entries': [
+            {'account_key': 1000, 'amount': '25.00', 'type': 'DEBIT'},
+            {'account_key': 1000, 'amount': '25.00', 'type': 'CREDIT'},
+        ]}])
+        posting_dates = set(GeneralLedger.objects.values_list('posting_date', flat=True))
+        self.assertEqual(posting_dates, {date(2024, 3, 1)})
+
+        synthetic = seed_synthetic_company("Synthetic", ledger_rows=50, territories=2, days=30, seed=1)
+        mismatched = GeneralLedger.objects.filter(company=synthetic).exclude(posting_date=F('date__date'))
+        self.assertFalse(mismatched.exists())
+
+    def test_calendar_date_change_moves_entries(self):
+        """Test changing a Calendar date updates posting_date and the daily balances."""
+        self.entry(self.january).save()
+
+        self.january.date = date(2024, 1, 6)
+        self.january.save()
+
+        self.assertEqual(GeneralLedger.objects.get().posting_date, date(2024, 1, 6))
+        self.assertEqual(
+            list(AccountDailyBalance.objects.values_list('date', 'debit_total')),
+            [(date(2024, 1, 6), Decimal('10.00'))]
+        )
+
+    def test_calendar_date_change_touches_moved_days_only(self):
+        """Test a Calendar date edit moves the totals without rebuilding the company."""
+        self.entry(self.january).save()
+        self.entry(self.february).save()
+        GeneralLedger.objects.create(
+            company=self.company, date=self.january, account=self.account, details="Refund",
+            amount=Decimal('4.00'), transaction_type='CREDIT'
+        )
+        unmoved = AccountDailyBalance.objects.get(date=date(2024, 2, 1)).pk
+
+        self.january.date = date(2024, 2, 10)
+        self.january.save()
+
+        # A company rebuild would have recreated the untouched February 1 row
+        self.assertEqual(AccountDailyBalance.objects.get(date=date(2024, 2, 1)).pk, unmoved)
+
+        incremental = list(AccountDailyBalance.objects.order_by('date').values_list(
+            'date', 'debit_total', 'credit_total', 'entry_count', 'balance'
+        ))
+        self.assertEqual([row[0] for row in incremental], [date(2024, 2, 1), date(2024, 2, 10)])
+        rebuild_daily_balances(company_id=self.company.company_id)
+        self.assertEqual(incremental, list(AccountDailyBalance.objects.order_by('date').values_list(
+            'date', 'debit_total', 'credit_total', 'entry_count', 'balance'
+        )))
+
+        # Saving without a date change leaves the ledger alone
+        with CaptureQueriesContext(connection) as queries:
+            self.january.save()
+        self.assertFalse(any('accounting_generalledger' in query['sql'] for query in queries))
+
+    def test_save_reads_calendar_only_when_needed(self):
+        """Test save() copies posting_date without a Calendar query unless date_id changed."""
+        entry_no = GeneralLedger.objects.create(
+            company=self.company, date=self.january, account=self.account, details="Entry",
+            amount=Decimal('10.00'), transaction_type='DEBIT'
+        ).entry_no
+        loaded = GeneralLedger.objects.get(entry_no=entry_no)
+
+        with CaptureQueriesContext(connection) as queries:
+            loaded.amount = Decimal('12.00')
+            loaded.save()
+        self.assertFalse(any('FROM "accounting_calendar"' in query['sql'] for query in queries))
+
+        loaded.date_id = self.february.pk
+        loaded.save()
+        self.assertEqual(GeneralLedger.objects.get(entry_no=entry_no).posting_date, date(2024, 2, 1))
+
+    def test_date_filters_skip_calendar_join(self):
+        """Test date range filters, counts and default ordering use posting_date alone."""
+        GeneralLedger.objects.bulk_create([self.entry(self.january), self.entry(self.february)])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('generalledger-list'), {
+                'fields': 'entry_no,date_value,amount', 'date_after': '2024-01-01', 'date_before': '2024-01-31'
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        ledger_sql = [query['sql'] for query in queries if 'accounting_generalledger' in query['sql']]
+        self.assertTrue(ledger_sql)
+        for sql in ledger_sql:
+            self.assertNotIn('accounting_calendar', sql)
+
+    def test_group_by_day(self):
+        """Test day grouping returns posting dates, not the Calendar key."""
+        GeneralLedger.objects.bulk_create([
+            self.entry(self.january), self.entry(self.january), self.entry(self.february)
+        ])
+
+        response = self.client.get(reverse('generalledger-summary-by-date'), {
+            'company': self.company.company_id, 'group_by': 'day'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(str(row['date_group']), row['count']) for row in response.data],
+                         [('2024-01-05', 2), ('2024-02-01', 1)])
+
+        response = self.client.get(reverse('generalledger-advanced-summary'), {
+            'company': self.company.company_id, 'group_by': 'date', 'date_group': 'day'
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([str(row['date_group']) for row in response.json()['data']],
+                         ['2024-01-05', '2024-02-01'])
+
+
+class StubTranslationLLM:
+    """Chat model stand-in that answers every prompt with one translation."""
+    
+    def __init__(self, translation, delay=0):
+        self.content = json.dumps(translation)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+    
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return type('Message', (), {'content': self.content})()
+    
+    async def ainvoke(self, messages):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return type('Message', (), {'content': self.content})()
+
+
+@unittest.skipUnless(NumerizamQueryAgent, "langgraph is not installed")
+class TranslationCacheTest(TransactionTestCase):
+    """Test cases for the query translation cache."""
+    
+    # LangGraph runs the validator node on a worker thread with its own connection
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        self.llm = StubTranslationLLM({
+            'endpoint': 'summary_by_account',
+            'filters': {'account__class_name__icontains': 'revenue', 'date__gte': '2024-01-01'},
+            'description': 'Revenue by account',
+        })
+        self.cache = TranslationCache(max_size=2)
+        self.agent = NumerizamQueryAgent(llm=self.llm, cache=self.cache)
+    
+    def test_repeated_query_skips_llm(self):
+        """Test questions differing in case, spacing and punctuation share one translation."""
+        first = self.agent.process_query("Total revenue by account for Q1 2024", self.company.company_id)
+        second = self.agent.process_query("  total REVENUE by account for Q1 2024? ", self.company.company_id)
+        
+        self.assertTrue(first['success'])
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['api_url'], first['api_url'])
+        self.assertEqual(self.llm.calls, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+        self.assertEqual(self.cache.stats()['hit_rate'], 0.5)
+    
+    def test_key_includes_company_and_relative_dates(self):
+        """Test other companies miss and relative-date questions are keyed on today."""
+        other = Company.objects.create(company_name="Other Company")
+        self.agent.process_query("Revenue by account", self.company.company_id)
+        self.agent.process_query("Revenue by account", other.company_id)
+        self.assertEqual(self.llm.calls, 2)
+        
+        self.assertEqual(normalize_query("Revenue,  by account!"), "revenue by account")
+        
+        questions = ["Debit transactions > $1000", "Debit transactions < $1000",
+                     "Amounts >= 500", "Amounts <= 500", "Amounts != 0", "Amounts = 0"]
+        self.assertEqual(len({normalize_query(question) for question in questions}), len(questions))
+        self.assertEqual(normalize_query("Debit transactions >$1000"), normalize_query("debit transactions > $1000"))
+        self.cache.set(questions[0], self.company.company_id, {'success': True, 'filters': {'amount__gt': 1000}})
+        self.assertIsNone(self.cache.get(questions[1], self.company.company_id))
+        self.cache.set("Revenue last year", self.company.company_id, {'success': True})
+        self.assertIn(date.today().isoformat(), next(reversed(self.cache._entries)))
+    
+    def test_failures_are_not_cached(self):
+        """Test failed translations reach the LLM again."""
+        for _ in range(2):
+            result = self.agent.process_query("Revenue by account", 999999)
+            self.assertFalse(result['success'])
+        self.assertEqual(self.llm.calls, 2)
+        self.assertEqual(self.cache.stats()['size'], 0)
+    
+    def test_lru_eviction(self):
+        """Test the least recently used translation is evicted first."""
+        for query in ("first", "second"):
+            self.cache.set(query, 1, {'success': True, 'query': query})
+        self.cache.get("first", 1)
+        self.cache.set("third", 1, {'success': True, 'query': 'third'})
+        
+        self.assertIsNotNone(self.cache.get("first", 1))
+        self.assertIsNone(self.cache.get("second", 1))
+        self.assertEqual(self.cache.stats()['size'], 2)
+    
+    def test_sqlite_backend_is_shared(self):
+        """Test translations stored on disk are found by a fresh cache."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'translations.sqlite3')
+            agent = NumerizamQueryAgent(llm=self.llm, cache=TranslationCache(path=path))
+            agent.process_query("Revenue by account", self.company.company_id)
+            
+            restarted = TranslationCache(path=path)
+            result = NumerizamQueryAgent(llm=self.llm, cache=restarted).process_query(
+                "revenue by account", self.company.company_id
+            )
+            self.assertTrue(result['cached'])
+            self.assertEqual(restarted.stats()['disk_hits'], 1)
+            self.assertEqual(self.llm.calls, 1)
+            
+            restarted.invalidate_company(self.company.company_id)
+            self.assertIsNone(TranslationCache(path=path).get("Revenue by account", self.company.company_id))
+    
+    def test_invalidation_reaches_other_processes(self):
+        """Test in-memory entries of other processes are dropped once invalidated on disk."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'translations.sqlite3')
+            worker, other_worker = TranslationCache(path=path), TranslationCache(path=path)
+            worker.set("Revenue by account", 1, {'success': True})
+            self.assertIsNotNone(other_worker.get("Revenue by account", 1))  # now in its LRU
+            
+            worker.invalidate_company(1)
+            
+            self.assertIsNone(other_worker.get("Revenue by account", 1))
+            self.assertEqual(other_worker.stats()['size'], 0)
+            other_worker.set("Revenue by account", 1, {'success': True})
+            self.assertIsNotNone(other_worker.get("Revenue by account", 1))
+    
+    def test_memory_entries_expire(self):
+        """Test in-memory entries without a shared file are trusted for the TTL only."""
+        cache = TranslationCache(ttl=60)
+        cache.set("Revenue by account", 1, {'success': True})
+        self.assertIsNotNone(cache.get("Revenue by account", 1))
+        
+        with mock.patch('accounting.translation_cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get("Revenue by account", 1))
+    
+    def test_dimension_changes_invalidate_shared_cache(self):
+        """Test territory changes drop the company's translations."""
+        shared = get_translation_cache()
+        self.addCleanup(shared.clear)
+        shared.set("Revenue by country", self.company.company_id, {'success': True})
+        shared.set("Revenue by country", 999999, {'success': True})
+        
+        Territory.objects.create(company=self.company, territory_key=1, country="USA", region="West")
+        
+        self.assertIsNone(shared.get("Revenue by country", self.company.company_id))
+        self.assertIsNotNone(shared.get("Revenue by country", 999999))
+
+
+class QueryDispatchTest(APITestCase):
+    """Test cases for running translated ledger queries in-process."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        for account_key, class_name in ((1000, "Asset"), (4000, "Revenue")):
+            ChartOfAccounts.objects.create(
+                company=self.company, account_key=account_key, report="Balance Sheet",
+                class_name=class_name, sub_class="", sub_class2="", account=f"Account {account_key}", sub_account=""
+            )
+        ingest_journals(self.company, [
+            {'date': day, 'description': 'Sale', 'entries': [
+                {'account_key': 1000, 'amount': '100.00', 'type': 'DEBIT'},
+                {'account_key': 4000, 'amount': '100.00', 'type': 'CREDIT'},
+            ]}
+            for day in ('2024-01-10', '2024-02-10')
+        ])
+        self.request = APIRequestFactory().post(reverse('query-execute'), {'query': 'x'}, format='json')
+    
+    def test_dispatch_returns_action_data(self):
+        """Test the translated URL returns the same data as an HTTP request."""
+        api_url = f"/api/general-ledger/summary_by_account/?company={self.company.company_id}&amount__gt=50"
+        
+        api_status, data = dispatch_ledger_query(self.request, api_url)
+        
+        self.assertEqual(api_status, 200)
+        self.assertEqual(data, self.client.get(api_url).data)
+        self.assertEqual(len(data), 2)
+    
+    def test_dispatch_builds_links_for_caller_host(self):
+        """Test paginated list links point at the caller's host."""
+        api_status, data = dispatch_ledger_query(
+            self.request, f"/api/general-ledger/?company={self.company.company_id}&pagination=cursor&page_size=1"
+        )
+        
+        self.assertEqual(api_status, 200)
+        self.assertEqual(len(data['results']), 1)
+        self.assertTrue(data['next'].startswith('http://testserver/api/general-ledger/?'))
+    
+    def test_only_ledger_routes_are_dispatched(self):
+        """Test paths outside GeneralLedgerViewSet are refused."""
+        for api_url in ('/api/companies/', '/api/general-ledger/unknown_action/', '/admin/'):
+            api_status, data = dispatch_ledger_query(self.request, api_url)
+            self.assertEqual(api_status, 404, api_url)
+
+    def test_exports_are_refused(self):
+        """Test file export actions are answered with an error instead of empty data."""
+        for action in ('export_csv', 'export_parquet', 'export_arrow'):
+            api_status, data = dispatch_ledger_query(
+                self.request, f"/api/general-ledger/{action}/?company={self.company.company_id}"
+            )
+            self.assertEqual(api_status, 400, action)
+            self.assertIn('exports a file', data['detail'])
+
+
+@unittest.skipUnless(NumerizamQueryAgent, "langgraph is not installed")
+class ExecuteQueryViewTest(TransactionTestCase):
+    """Test cases for executing natural-language queries without loopback HTTP."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        ChartOfAccounts.objects.create(
+            company=self.company, account_key=1000, report="Balance Sheet", class_name="Asset",
+            sub_class="", sub_class2="", account="Cash", sub_account=""
+        )
+        GeneralLedger.objects.create(
+            company=self.company, date=get_calendar(self.company.company_id, date(2024, 1, 10)),
+            account=ChartOfAccounts.objects.get(), details="Entry", amount=Decimal('10.00'), transaction_type='DEBIT'
+        )
+        agent = NumerizamQueryAgent(llm=StubTranslationLLM({
+            'endpoint': 'summary_by_account', 'filters': {'date__year': 2024}, 'description': 'By account',
+        }), cache=False)
+        patcher = mock.patch('accounting.langgraph_query_views.get_query_agent', return_value=agent)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_execute(self):
+        """Test the translated action runs without an outgoing HTTP request."""
+        with mock.patch('requests.get', side_effect=AssertionError('loopback HTTP request')):
+            response = self.client.post(reverse('query-execute'), {
+                'query': 'Totals by account', 'company_id': self.company.company_id
+            }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data'][0]['account__account_key'], 1000)
+    
+    def test_batch_execute(self):
+        """Test batch queries are executed in-process as well."""
+        response = self.client.post(reverse('query-batch'), {
+            'queries': [{'id': 'q1', 'query': 'Totals by account', 'company_id': self.company.company_id}],
+            'execute': True
+        }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.json()['results'][0]
+        self.assertNotIn('execution_error', result)
+        self.assertEqual(result['data'][0]['count'], 1)
+    
+    def test_batch_parses_concurrently_in_order(self):
+        """Test batch LLM calls overlap while results keep their input order."""
+        llm = StubTranslationLLM({
+            'endpoint': 'summary_by_account', 'filters': {}, 'description': 'By account',
+        }, delay=0.05)
+        agent = NumerizamQueryAgent(llm=llm, cache=False)
+        queries = [
+            {'id': f'q{i}', 'query': f'Totals by account {i}', 'company_id': self.company.company_id}
+            for i in range(4)
+        ]
+        queries.insert(2, {'id': 'missing', 'query': 'Totals by account', 'company_id': 999999})
+        
+        with mock.patch('accounting.langgraph_query_views.get_query_agent', return_value=agent), \
+                self.settings(LLM_BATCH_CONCURRENCY=3):
+            response = self.client.post(reverse('query-batch'), {'queries': queries}, content_type='application/json')
+        
+        results = response.json()['results']
+        self.assertEqual([result['id'] for result in results], ['q0', 'q1', 'missing', 'q2', 'q3'])
+        self.assertEqual([result['success'] for result in results], [True, True, False, True, True])
+        self.assertEqual(llm.calls, 4)
+        self.assertEqual(llm.max_in_flight, 3)
+    
+    def test_transaction_batch(self):
+        """Test ai/batch-process parses concurrently and records every transaction."""
+        from .langgraph_agent import NumerizamAgent
+        
+        ChartOfAccounts.objects.create(
+            company=self.company, account_key=4000, report="Income Statement", class_name="Revenue",
+            sub_class="", sub_class2="", account="Sales", sub_account=""
+        )
+        llm = StubTranslationLLM({
+            'date': '2024-03-01', 'debit_account': 'Cash', 'credit_account': 'Sales',
+            'amount': 25.0, 'details': 'Cash sale',
+        }, delay=0.05)
+        # Two numbers per query keep the rule-based fast path out of the way
+        queries = [{'query': f'Customer {i} paid us 25 for goods', 'company_id': self.company.company_id}
+                   for i in range(3)]
+        queries.append({'query': 'Record a sale', 'company_id': 999999})
+        
+        with mock.patch('accounting.langgraph_views.get_agent', return_value=NumerizamAgent(llm=llm)):
+            response = self.client.post(reverse('ai-batch-process'), {'queries': queries},
+                                        content_type='application/json')
+        
+        results = response.json()['results']
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3])
+        self.assertEqual([result['success'] for result in results], [True, True, True, False])
+        self.assertEqual(JournalEntry.objects.filter(company=self.company).count(), 3)
+        self.assertGreater(llm.max_in_flight, 1)
+    
+    def test_fast_path_skips_llm(self):
+        """Test simple transactions are recorded without a model call."""
+        from .langgraph_agent import NumerizamAgent
+        
+        ChartOfAccounts.objects.create(
+            company=self.company, account_key=4000, report="Income Statement", class_name="Revenue",
+            sub_class="", sub_class2="", account="Sales Revenue", sub_account=""
+        )
+        llm = StubTranslationLLM({})
+        agent = NumerizamAgent(llm=llm)
+        
+        result = agent.process_query("Record a sale of $500 for cash on July 18, 2025", self.company.company_id)
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['parsed_by'], 'rules')
+        self.assertEqual(llm.calls, 0)
+        self.assertEqual(GeneralLedger.objects.filter(posting_date=date(2025, 7, 18)).count(), 2)
+
+
+@unittest.skipUnless(NumerizamQueryAgent, "langgraph is not installed")
+class AsyncAgentTest(TransactionTestCase):
+    """Test cases for the async agents and AI views."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.company = Company.objects.create(company_name="Test Company")
+        for account_key, report, class_name, account in (
+            (1000, "Balance Sheet", "Asset", "Cash"),
+            (4000, "Income Statement", "Revenue", "Sales"),
+        ):
+            ChartOfAccounts.objects.create(
+                company=self.company, account_key=account_key, report=report, class_name=class_name,
+                sub_class="", sub_class2="", account=account, sub_account=""
+            )
+    
+    async def test_translations_overlap(self):
+        """Test concurrent aprocess_query() calls keep their LLM calls in flight together."""
+        llm = StubTranslationLLM({
+            'endpoint': 'summary_by_account', 'filters': {}, 'description': 'By account',
+        }, delay=0.1)
+        agent = NumerizamQueryAgent(llm=llm, cache=False)
+        
+        results = await asyncio.gather(*(
+            agent.aprocess_query(f'Totals by account {i}', self.company.company_id) for i in range(50)
+        ))
+        
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(results[0]['filters']['company'], self.company.company_id)
+        self.assertEqual(llm.calls, 50)
+        self.assertEqual(llm.max_in_flight, 50)
+    
+    async def test_transaction_agent(self):
+        """Test aprocess_query() records the parsed transaction."""
+        from .langgraph_agent import NumerizamAgent
+        
+        llm = StubTranslationLLM({
+            'date': '2024-03-01', 'debit_account': 'Cash', 'credit_account': 'Sales',
+            'amount': 25.0, 'details': 'Cash sale',
+        })
+        
+        result = await NumerizamAgent(llm=llm).aprocess_query(
+            'Customer 1 paid us 25 for goods', self.company.company_id
+        )
+        
+        self.assertTrue(result['success'])
+        self.assertEqual(result['parsed_by'], 'llm')
+        self.assertEqual(await JournalEntry.objects.filter(company=self.company).acount(), 1)
+    
+    async def test_async_view(self):
+        """Test the async views answer with DRF responses and request metrics."""
+        agent = NumerizamQueryAgent(llm=StubTranslationLLM({
+            'endpoint': 'summary_by_account', 'filters': {}, 'description': 'By account',
+        }), cache=False)
+        
+        with mock.patch('accounting.langgraph_query_views.get_query_agent', return_value=agent):
+            response = await self.async_client.post(reverse('query-translate'), {
+                'query': 'Totals by account', 'company_id': self.company.company_id
+            }, content_type='application/json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()['success'])
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+    
+    def test_request_checks(self):
+        """Test methods and bodies are checked as DRF views check them."""
+        self.assertEqual(self.client.get(reverse('query-translate')).status_code,
+                         status.HTTP_405_METHOD_NOT_ALLOWED)
+        response = self.client.post(reverse('ai-process-query'), '{"query": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class LLMBatchTest(TestCase):
+    """Test cases for the concurrent batch and backoff helpers."""
+    
+    def test_backoff_retries_rate_limits(self):
+        """Test rate-limited calls are retried with growing delays."""
+        responses = [RateLimitError('slow down'), RateLimitError('slow down'), 'parsed']
+        llm = mock.Mock()
+        llm.invoke.side_effect = responses
+        delays = []
+        
+        self.assertEqual(invoke_with_backoff(llm, [], retries=3, base_delay=1, sleep=delays.append), 'parsed')
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0.5 <= delays[0] <= 1 and 1 <= delays[1] <= 2)
+    
+    def test_backoff_gives_up(self):
+        """Test exhausted retries, other errors and exhausted quotas are raised."""
+        llm = mock.Mock()
+        llm.invoke.side_effect = RateLimitError('slow down')
+        with self.assertRaises(RateLimitError):
+            invoke_with_backoff(llm, [], retries=2, base_delay=0, sleep=lambda delay: None)
+        self.assertEqual(llm.invoke.call_count, 3)
+        
+        for error in (ValueError('bad prompt'), Exception('Error code: 429 insufficient_quota')):
+            llm = mock.Mock()
+            llm.invoke.side_effect = error
+            with self.assertRaises(type(error)):
+                invoke_with_backoff(llm, [], retries=2, base_delay=0, sleep=lambda delay: None)
+            self.assertEqual(llm.invoke.call_count, 1)
+    
+    def test_map_concurrently_keeps_order_and_errors(self):
+        """Test results keep input order, concurrency is bounded and failures stay per item."""
+        llm = StubTranslationLLM({}, delay=0.02)
+        
+        def work(item):
+            llm.invoke([])
+            if item == 3:
+                raise ValueError('item 3')
+            return item * 10
+        
+        outcomes = map_concurrently(work, range(6), max_workers=2)
+        
+        self.assertEqual([result for result, error in outcomes], [0, 10, 20, None, 40, 50])
+        self.assertIsInstance(outcomes[3][1], ValueError)
+        self.assertEqual(llm.max_in_flight, 2)
+    
+    async def test_async_backoff_retries_rate_limits(self):
+        """Test awaited calls are retried like synchronous ones."""
+        llm = mock.Mock()
+        llm.ainvoke = mock.AsyncMock(side_effect=[RateLimitError('slow down'), 'parsed'])
+        delays = []
+        
+        async def sleep(delay):
+            delays.append(delay)
+        
+        self.assertEqual(await ainvoke_with_backoff(llm, [], retries=2, base_delay=1, sleep=sleep), 'parsed')
+        self.assertEqual(len(delays), 1)
+        
+        llm.ainvoke = mock.AsyncMock(side_effect=ValueError('bad prompt'))
+        with self.assertRaises(ValueError):
+            await ainvoke_with_backoff(llm, [], retries=2, base_delay=0, sleep=sleep)
+        self.assertEqual(llm.ainvoke.await_count, 1)
+    
+    async def test_amap_concurrently_keeps_order_and_errors(self):
+        """Test coroutine results keep input order, concurrency is bounded and failures stay per item."""
+        llm = StubTranslationLLM({}, delay=0.02)
+        
+        async def work(item):
+            await llm.ainvoke([])
+            if item == 3:
+                raise ValueError('item 3')
+            return item * 10
+        
+        outcomes = await amap_concurrently(work, range(6), limit=4)
+        
+        self.assertEqual([result for result, error in outcomes], [0, 10, 20, None, 40, 50])
+        self.assertIsInstance(outcomes[3][1], ValueError)
+        self.assertEqual(llm.max_in_flight, 4)
+
+
+class FastParserTest(TestCase):
+    """Test cases for the rule-based transaction parser."""
+    
+    def setUp(self):
+        """Reset the fast-path counters."""
+        clear_fast_parse_stats()
+        self.addCleanup(clear_fast_parse_stats)
+    
+    def test_common_shapes(self):
+        """Test the rigid transaction shapes are parsed without the LLM."""
+        today = date(2025, 1, 1)
+        cases = [
+            ("Record a sale of $500 for cash on July 18, 2025", '2025-07-18', 'Cash', 'Sales Revenue', 500),
+            ("Pay $200 for office supplies with cash on July 19, 2025",
+             '2025-07-19', 'Office Supplies Expense', 'Cash', 200),
+            ("Receive $1000 cash from customer on account on July 20, 2025",
+             '2025-07-20', 'Cash', 'Accounts Receivable', 1000),
+            ("Purchase inventory worth $800 on credit on July 21, 2025", '2025-07-21', 'Inventory', 'Accounts Payable', 800),
+            ("Invest $5,000.50 cash in the business yesterday", '2024-12-31', 'Cash', "Owner's Capital", 5000.5),
+        ]
+        for query, day, debit, credit, amount in cases:
+            with self.subTest(query=query):
+                fields, confidence = match_transaction(query, today=today)
+                self.assertEqual(
+                    (fields['date'], fields['debit_account'], fields['credit_account'], fields['amount']),
+                    (day, debit, credit, amount)
+                )
+                self.assertEqual(confidence, 1.0)
+        
+        fields, _ = match_transaction("Pay $300 to supplier for invoice INV-1001 on 2025-02-03")
+        self.assertEqual((fields['debit_account'], fields['reference_number']), ('Accounts Payable', 'INV-1001'))
+    
+    def test_ambiguous_queries_go_to_llm(self):
+        """Test queries the rules cannot read with certainty are declined."""
+        for query in (
+            "Record a sale of $500 and pay $200 for office supplies",  # two amounts and rules
+            "Pay rent of $1200 on July 1, 2025",                       # unknown account
+            "Record a sale of $500 in March 2025",                     # unparsed date
+            "How much cash did we receive from customers?",            # a question
+            "Reverse the sale of $500 for cash",                       # not a plain entry
+            "Record a sale of $500 for cash on 2025-02-30",            # invalid date
+            "Record a sale of $500 for cash on Friday",                # weekday
+            "Record a sale of $500 for cash on the 15th",              # ordinal
+            "Record a sale of $500 for cash this Monday",              # relative weekday
+            "Record a sale of $500 for cash on the 15",                # day without month
+            "Record a sale of $500 for cash at 50% discount on 2025-02-03",  # leftover percentage
+            "Purchase 3 boxes of inventory for $800 on credit on 2025-02-03",  # leftover quantity
+        ):
+            with self.subTest(query=query):
+                self.assertIsNone(match_transaction(query))
+    
+    def test_undated_queries_go_to_llm(self):
+        """Test the rules never post a query to an assumed date."""
+        fields, confidence = match_transaction("Record a sale of $500 for cash", today=date(2025, 1, 1))
+        self.assertEqual(fields['date'], '2025-01-01')
+        self.assertLess(confidence, 0.8)
+        self.assertIsNone(fast_parse_transaction("Record a sale of $500 for cash"))
+    
+    def test_low_confidence_and_hit_rate(self):
+        """Test assumed details lower the confidence below the threshold and are counted."""
+        _, confidence = match_transaction("Sold goods for 250 dollars")  # no date, payment or $ sign
+        self.assertLess(confidence, 0.8)
+        
+        self.assertIsNone(fast_parse_transaction("Sold goods for 250 dollars"))
+        self.assertIsNotNone(fast_parse_transaction("Sold goods for $250 cash on 2025-01-02"))
+        self.assertIsNone(fast_parse_transaction("Pay rent of $1200"))
+        self.assertEqual(fast_parse_info(), {
+            'queries': 3, 'hits': 1, 'low_confidence': 1, 'no_match': 1, 'hit_rate': 0.3333
+        })
+
+
+class BenchCommandTest(TestCase):
+    """Test cases for the bench management command."""
+    
+    def test_bench_writes_results_and_rolls_back(self):
+        """Test every endpoint answers on the synthetic dataset and nothing is kept."""
+        handle = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+        handle.close()
+        self.addCleanup(os.unlink, handle.name)
+        
+        call_command('bench', rows=200, days=60, repeat=1, output=handle.name, stderr=io.StringIO())
+        
+        with open(handle.name) as f:
+            results = json.load(f)
+        self.assertEqual(len(results['results']), len(BENCH_ENDPOINTS))
+        self.assertEqual({result['status'] for result in results['results']}, {200})
+        self.assertFalse(Company.objects.filter(company_name__startswith='Bench Company').exists())
+    
+    def test_regression_against_baseline(self):
+        """Test a slower median than the baseline allows fails the command."""
+        baseline = {'results': [{'name': 'summary_by_account', 'median_ms': 0.0001}]}
+        handle = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        with handle:
+            json.dump(baseline, handle)
+        self.addCleanup(os.unlink, handle.name)
+        
+        with self.assertRaises(CommandError):
+            call_command('bench', rows=20, days=10, repeat=1, endpoints=['summary_by_account'],
+                         compare=handle.name, stdout=io.StringIO(), stderr=io.StringIO())
+
+
+class QueryBudgetTest(APITestCase):
+    """
+    Upper bounds on SQL queries per endpoint.
+    
+    Every GET route in accounting/urls.py is requested against a small and a
+    ten times larger dataset; the query count must stay within the route's
+    budget and must not grow with the number of rows.
+    """
+    
+    # URL name -> maximum queries per request
+    BUDGETS = {
+        'api-root': 0,
+        'company-list': 2,
+        'company-detail': 1,
+        'company-statistics': 5,
+        'chartofaccounts-list': 3,
+        'chartofaccounts-detail': 2,
+        'chartofaccounts-hierarchy': 1,
+        'chartofaccounts-usage-statistics': 4,
+        'chartofaccounts-usage-statistics-batch': 3,
+        'territory-list': 3,
+        'territory-detail': 2,
+        'calendar-list': 3,
+        'calendar-detail': 2,
+        'calendar-date-ranges': 4,
+        'generalledger-list': 2,
+        'generalledger-detail': 1,
+        'generalledger-summary': 8,
+        'generalledger-monthly-analysis': 1,
+        'generalledger-account-balances': 1,
+        'generalledger-export-csv': 1,
+        'generalledger-export-parquet': 1,
+        'generalledger-export-arrow': 1,
+        'generalledger-summary-by-territory': 1,
+        'generalledger-summary-by-account': 1,
+        'generalledger-summary-by-date': 1,
+        'generalledger-summary-by-transaction-type': 1,
+        'generalledger-summary-by-company': 1,
+        'generalledger-pivot': 1,
+        'generalledger-pivot-territory-by-account': 1,
+        'generalledger-advanced-summary': 1,
+        'journalentry-list': 4,
+        'journalentry-detail': 3,
+        'journalentry-balance-report': 3,
+        'financial-analysis-list': 2,
+        'financial-analysis-detail': 2,
+        'financial-analysis-profit-loss': 4,
+        'financial-analysis-balance-sheet': 1,
+        'request-metrics': 0,
+        'legacy-companies': 2,
+        'legacy-chart-of-accounts': 2,
+        'ai-agent-status': 0,
+        'query-capabilities': 0,
+        'query-status': 0,
+        'get-saved-queries': 2,
+        'save-service-status': 0,
+        'profit-loss-report': 5,
+        'balance-sheet-report': 2,
+        'trial-balance-report': 2,
+    }
+    
+    # Status routes that report HTTP 500 when no LLM is configured
+    AGENT_ROUTES = {'ai-agent-status', 'query-capabilities', 'query-status'}
+    
+    # Routes without a GET handler; writes are covered by their own tests
+    NOT_BUDGETED = {
+        'ai-process-query', 'ai-batch-process', 'ai-validate-query',
+        'query-translate', 'query-execute', 'query-batch', 'save-query-results',
+        'process-transaction', 'bulk-create-transactions', 'ingest-transactions',
+    }
+    
+    def seed(self, journals):
+        """Create a company with the given number of two-line journals."""
+        company = Company.objects.create(company_name=f"Budget Company {journals}")
+        for account_key, report, class_name, account in (
+            (1000, "Balance Sheet", "Asset", "Cash"),
+            (3000, "Balance Sheet", "Equity", "Capital"),
+            (4000, "Income Statement", "Revenue", "Sales"),
+            (5000, "Income Statement", "Expense", "Rent"),
+        ):
+            ChartOfAccounts.objects.create(
+                company=company, account_key=account_key, report=report,
+                class_name=class_name, sub_class=class_name, sub_class2="",
+                account=account, sub_account=""
+            )
+        Territory.objects.create(company=company, territory_key=1, country="USA", region="East")
+        Territory.objects.create(company=company, territory_key=2, country="UK", region="London")
+        
+        result = ingest_journals(company, [
+            {
+                'date': (date(2024, 1, 1) + timedelta(days=index % 90)).isoformat(),
+                'description': f'Journal {index}',
+                'entries': [
+                    {'account_key': (1000, 5000)[index % 2], 'amount': f'{index + 1}.00', 'type': 'DEBIT',
+                     'territory_key': index % 2 + 1},
+                    {'account_key': (4000, 1000, 3000)[index % 3] if index % 2 else 4000,
+                     'amount': f'{index + 1}.00', 'type': 'CREDIT'},
+                ]
+            }
+            for index in range(journals)
+        ])
+        self.assertEqual(result['journals_created'], journals)
+        return company
+    
+    def requests(self, company):
+        """(URL name, path, params) of every budgeted GET request for a company."""
+        ledger = GeneralLedger.objects.filter(company=company).order_by('entry_no').first()
+        account = ChartOfAccounts.objects.filter(company=company).order_by('account_key').first()
+        detail_pks = {
+            'company-detail': company.company_id,
+            'company-statistics': company.company_id,
+            'chartofaccounts-detail': account.pk,
+            'chartofaccounts-usage-statistics': account.pk,
+            'territory-detail': Territory.objects.filter(company=company).first().pk,
+            'calendar-detail': ledger.date_id,
+            'generalledger-detail': ledger.pk,
+            'journalentry-detail': ledger.journal_entry_id,
+            'financial-analysis-detail': ledger.pk,
+        }
+        params = {
+            'company': company.company_id,
+            'company_id': company.company_id,
+            'start_date': '2024-01-01',
+            'end_date': '2024-12-31',
+            'as_of_date': '2024-12-31',
+        }
+        
+        for name in self.BUDGETS:
+            kwargs = {'pk': detail_pks[name]} if name in detail_pks else None
+            yield name, reverse(name, kwargs=kwargs), params
+    
+    def count_queries(self, company):
+        counts = {}
+        for name, path, params in self.requests(company):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path, params)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            if name not in self.AGENT_ROUTES:
+                self.assertLess(response.status_code, 400, f'{name}: HTTP {response.status_code}')
+            counts[name] = len(queries)
+        return counts
+    
+    def test_every_route_has_a_budget(self):
+        """Test new routes cannot be added without a query budget."""
+        def route_names(patterns):
+            for pattern in patterns:
+                if hasattr(pattern, 'url_patterns'):
+                    yield from route_names(pattern.url_patterns)
+                else:
+                    yield pattern.name
+        
+        names = set(route_names(accounting_urls.urlpatterns))
+        self.assertEqual(names - set(self.BUDGETS) - self.NOT_BUDGETED, set())
+    
+    def test_query_budgets(self):
+        """Test each endpoint stays within budget at two data sizes."""
+        small = self.count_queries(self.seed(10))
+        large = self.count_queries(self.seed(100))
+        
+        for name, budget in self.BUDGETS.items():
+            with self.subTest(route=name):
+                self.assertLessEqual(large[name], budget)
+                self.assertEqual(large[name], small[name], 'query count grows with the number of rows')
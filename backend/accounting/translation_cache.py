@@ -0,0 +1,258 @@
+"""
+Cache of natural-language query translations.
+
+NumerizamQueryAgent.process_query() asks the LLM to translate every
+question into an endpoint and filters, although dashboards ask the same
+questions over and over. TranslationCache keeps the validated result of
+each successful translation keyed on the company and the normalised query
+text (case, whitespace and punctuation folded; comparison operators are
+kept as words), so repeated questions skip the LLM round trip.
+
+Entries live in a bounded in-process LRU and, when a path is configured,
+in an SQLite file shared by every worker process and kept across restarts.
+Translations of questions with relative dates ("last year", "this month")
+are also keyed on today's date, so they never outlive the day they were
+made. Translations depend on the company's accounts and territories
+(filter values are matched against them), so the signal handlers in
+accounting.signals drop a company's entries whenever those change.
+
+Only the process receiving the signal can clear its own LRU, so other
+processes must notice an invalidation themselves. With an SQLite file,
+invalidation bumps the company's generation stored in the file, and an
+in-memory hit is trusted only while its generation is current. Without a
+file, in-memory entries expire after QUERY_TRANSLATION_CACHE_TTL seconds.
+
+Example:
+    cache = get_translation_cache()
+    result = cache.get(query, company_id)
+    if result is None:
+        result = translate(query, company_id)
+        cache.set(query, company_id, result)
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date
+
+from django.conf import settings
+
+
+# Words that make a translation depend on the current date
+RELATIVE_DATE_WORDS = {
+    'today', 'yesterday', 'tomorrow', 'current', 'this', 'last', 'next', 'previous',
+    'past', 'ago', 'recent', 'ytd', 'mtd', 'qtd',
+}
+
+# Comparison operators change the meaning of a question ("> $1000" vs "< $1000")
+_COMPARISONS = {
+    '>=': 'gte', '=>': 'gte', '<=': 'lte', '=<': 'lte', '!=': 'ne', '<>': 'ne',
+    '==': 'eq', '=': 'eq', '>': 'gt', '<': 'lt', '≥': 'gte', '≤': 'lte', '≠': 'ne',
+}
+_COMPARISON = re.compile('|'.join(re.escape(operator) for operator in sorted(_COMPARISONS, key=len, reverse=True)))
+_PUNCTUATION = re.compile(r"[^\w\s\-./:$%]")
+_TRAILING = re.compile(r"[\s.:]+$")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """
+    Fold a question to its cache form.
+
+    Example:
+        normalize_query("  Total revenue by account for Q1 2024? ")
+        # -> 'total revenue by account for q1 2024'
+        normalize_query("Debit transactions >= $1000")
+        # -> 'debit transactions gte $1000'
+    """
+    text = _COMPARISON.sub(lambda match: f' {_COMPARISONS[match.group()]} ', query.casefold())
+    text = _PUNCTUATION.sub(' ', text)
+    return _TRAILING.sub('', _WHITESPACE.sub(' ', text)).strip()
+
+
+def translation_key(query, company_id, today=None):
+    """Return the cache key of a question asked for a company."""
+    text = normalize_query(query)
+    if RELATIVE_DATE_WORDS.intersection(text.split()):
+        text = f"{(today or date.today()).isoformat()}|{text}"
+    return f"{company_id}|{text}"
+
+
+class TranslationCache:
+    """
+    LRU cache of validated query translations with an optional SQLite store.
+
+    Args:
+        max_size: Entries kept in memory (and in the SQLite file)
+        path: SQLite file for a persistent cache shared between processes;
+            None keeps the cache in memory only
+        ttl: Seconds an in-memory entry is trusted when there is no SQLite
+            file to check invalidations against (None: forever)
+    """
+
+    def __init__(self, max_size=1000, path=None, ttl=300):
+        self.max_size = max_size
+        self.path = path
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (result, company_id, generation, stored_at)
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'disk_hits': 0, 'stores': 0}
+        if path:
+            with self._connect() as db:
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS translations ('
+                    'key TEXT PRIMARY KEY, company_id INTEGER NOT NULL, '
+                    'result TEXT NOT NULL, used_at REAL NOT NULL)'
+                )
+                db.execute('CREATE INDEX IF NOT EXISTS translations_company ON translations (company_id)')
+                db.execute(
+                    'CREATE TABLE IF NOT EXISTS generations ('
+                    'company_id INTEGER PRIMARY KEY, generation INTEGER NOT NULL)'
+                )
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation keeps the cache thread-safe
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _generation(self, db, company_id):
+        row = db.execute('SELECT generation FROM generations WHERE company_id = ?', (company_id,)).fetchone()
+        return row[0] if row else 0
+
+    def _remember(self, key, result, company_id, generation=None):
+        with self._lock:
+            self._entries[key] = (result, company_id, generation, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _is_current(self, entry):
+        _, company_id, generation, stored_at = entry
+        if self.path:
+            with self._connect() as db:
+                return self._generation(db, company_id) == generation
+        return self.ttl is None or time.monotonic() - stored_at < self.ttl
+
+    def get(self, query, company_id):
+        """Return a copy of the cached translation, or None."""
+        key = translation_key(query, company_id)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            if self._is_current(entry):
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                return json.loads(json.dumps(entry[0]))
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+
+        if self.path:
+            with self._connect() as db:
+                row = db.execute('SELECT result FROM translations WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    db.execute('UPDATE translations SET used_at = ? WHERE key = ?', (time.time(), key))
+                    generation = self._generation(db, company_id)
+            if row is not None:
+                self._remember(key, json.loads(row[0]), company_id, generation)
+                with self._lock:
+                    self._stats['hits'] += 1
+                    self._stats['disk_hits'] += 1
+                return json.loads(row[0])
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, query, company_id, result):
+        """Store a successful translation (a JSON-serialisable dictionary)."""
+        key = translation_key(query, company_id)
+        encoded = json.dumps(result)
+        with self._lock:
+            self._stats['stores'] += 1
+
+        if not self.path:
+            self._remember(key, json.loads(encoded), company_id)
+            return
+        with self._connect() as db:
+            self._remember(key, json.loads(encoded), company_id, self._generation(db, company_id))
+            db.execute(
+                'INSERT OR REPLACE INTO translations (key, company_id, result, used_at) VALUES (?, ?, ?, ?)',
+                (key, company_id, encoded, time.time())
+            )
+            db.execute(
+                'DELETE FROM translations WHERE key NOT IN '
+                '(SELECT key FROM translations ORDER BY used_at DESC LIMIT ?)',
+                (self.max_size,)
+            )
+
+    def invalidate_company(self, company_id):
+        """Drop every translation of a company, in other processes too when a file is shared."""
+        prefix = f"{company_id}|"
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+        if self.path:
+            with self._connect() as db:
+                db.execute('DELETE FROM translations WHERE company_id = ?', (company_id,))
+                # Other processes compare their in-memory entries with this generation
+                db.execute(
+                    'INSERT INTO generations (company_id, generation) VALUES (?, 1) '
+                    'ON CONFLICT (company_id) DO UPDATE SET generation = generation + 1',
+                    (company_id,)
+                )
+
+    def clear(self):
+        """Empty the cache and reset its statistics."""
+        with self._lock:
+            self._entries.clear()
+            for name in self._stats:
+                self._stats[name] = 0
+        if self.path:
+            with self._connect() as db:
+                db.execute('DELETE FROM translations')
+
+    def stats(self):
+        """Return hit/miss counters, the hit rate and the current size."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+        stats['max_size'] = self.max_size
+        stats['backend'] = 'sqlite' if self.path else 'memory'
+        return stats
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_translation_cache():
+    """Return the process-wide cache configured by the QUERY_TRANSLATION_CACHE_* settings."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = TranslationCache(
+                max_size=getattr(settings, 'QUERY_TRANSLATION_CACHE_SIZE', 1000),
+                path=getattr(settings, 'QUERY_TRANSLATION_CACHE_PATH', None) or None,
+                ttl=getattr(settings, 'QUERY_TRANSLATION_CACHE_TTL', 300)
+            )
+        return _shared_cache
+
+
+def invalidate_query_translations(company_id):
+    """Drop a company's translations from the shared cache and its SQLite file."""
+    if _shared_cache is not None or getattr(settings, 'QUERY_TRANSLATION_CACHE_PATH', None):
+        get_translation_cache().invalidate_company(company_id)
@@ -31,6 +31,9 @@ urlpatterns = [
     # Include router URLs with advanced filtering
     path('', include(router.urls)),
     
+    # Per-route query counts and latency percentiles
+    path('metrics/', api_views.request_metrics, name='request-metrics'),
+    
     # Legacy endpoints (keeping for backward compatibility)
     path('legacy/companies/', views.CompanyViewSet.as_view({'get': 'list', 'post': 'create'}), name='legacy-companies'),
     path('legacy/chart-of-accounts/', views.ChartOfAccountsViewSet.as_view({'get': 'list', 'post': 'create'}), name='legacy-chart-of-accounts'),
@@ -66,5 +69,7 @@ try:
         urlpatterns.append(path('transactions/process/', views.ProcessTransactionView.as_view(), name='process-transaction'))
     if hasattr(views, 'BulkCreateTransactionsView'):
         urlpatterns.append(path('transactions/bulk-create/', views.BulkCreateTransactionsView.as_view(), name='bulk-create-transactions'))
+    if hasattr(views, 'IngestTransactionsView'):
+        urlpatterns.append(path('transactions/ingest/', views.IngestTransactionsView.as_view(), name='ingest-transactions'))
 except AttributeError:
     pass
\ No newline at end of file
@@ -10,19 +10,22 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.db import transaction
-from django.db.models import Sum, Count, Avg, Max, Min, Q
+from django.db.models import Sum, Count, Avg, Max, Min, Q, Prefetch
 from django.db import models
 from django.shortcuts import get_object_or_404
 from decimal import Decimal
 from datetime import datetime
-import pandas as pd
 
 from .models import Company, ChartOfAccounts, Territory, Calendar, GeneralLedger, JournalEntry
 from .serializers import (
     CompanySerializer, ChartOfAccountsSerializer, TerritorySerializer,
     CalendarSerializer, GeneralLedgerSerializer, JournalEntrySerializer,
-    TransactionPayloadSerializer, BulkTransactionSerializer
+    TransactionPayloadSerializer, BulkTransactionSerializer, LedgerIngestionSerializer
 )
+from .reports import trial_balance_rows, class_total, period_class_total
+from .ingestion import ingest_journals
+from .calendar_cache import get_calendar
+from .pivot import pivot_ledger
 
 
 class CompanyViewSet(viewsets.ModelViewSet):
@@ -102,9 +105,9 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         if account_id:
             queryset = queryset.filter(account_id=account_id)
         if start_date:
-            queryset = queryset.filter(date__date__gte=start_date)
+            queryset = queryset.filter(posting_date__gte=start_date)
         if end_date:
-            queryset = queryset.filter(date__date__lte=end_date)
+            queryset = queryset.filter(posting_date__lte=end_date)
         if transaction_type:
             queryset = queryset.filter(transaction_type=transaction_type)
             
@@ -244,16 +247,16 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
             
         else:  # day
             summary_data = queryset.values(
-                'date__date'
+                'posting_date'
             ).annotate(
                 total_amount=Sum('amount'),
                 transaction_count=Count('entry_no'),
                 avg_amount=Avg('amount')
-            ).order_by('date__date')
+            ).order_by('posting_date')
             
             result = [{
-                'period': item['date__date'].strftime('%Y-%m-%d'),
-                'date': item['date__date'],
+                'period': item['posting_date'].strftime('%Y-%m-%d'),
+                'date': item['posting_date'],
                 'period_type': 'day',
                 'total_amount': float(item['total_amount']) if item['total_amount'] else 0.0,
                 'transaction_count': item['transaction_count'],
@@ -348,112 +351,34 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
         This creates a pivot table showing territories as rows and accounts as columns
         API: GET /api/general-ledger/pivot_territory_by_account/
         """
-        queryset = self.get_queryset()
-        
-        # Get the raw data
-        data = list(queryset.values(
-            'territory__territory_key',
-            'territory__country',
-            'territory__region',
-            'account__account_key',
-            'account__account',
-            'amount'
-        ))
-        
-        if not data:
+        queryset = self.get_queryset().filter(territory__isnull=False)
+
+        row_keys, column_keys, matrix = pivot_ledger(queryset, rows='territory', columns='account')
+        if not row_keys:
             return Response({
                 'pivot_type': 'territory_by_account',
                 'message': 'No data available for pivoting',
                 'data': []
             })
-        
-        # Use pandas for pivoting
-        try:
-            df = pd.DataFrame(data)
-            
-            # Create a pivot table
-            pivot_table = df.pivot_table(
-                values='amount',
-                index=['territory__territory_key', 'territory__country', 'territory__region'],
-                columns=['account__account_key', 'account__account'],
-                aggfunc='sum',
-                fill_value=0
-            )
-            
-            # Convert to a more readable format
-            result = []
-            for territory_info in pivot_table.index:
-                territory_key, country, region = territory_info
-                row_data = {
-                    'territory_key': territory_key,
-                    'country': country,
-                    'region': region,
-                    'accounts': {}
-                }
-                
-                for account_info in pivot_table.columns:
-                    account_key, account_name = account_info
-                    amount = pivot_table.loc[territory_info, account_info]
-                    row_data['accounts'][f'account_{account_key}'] = {
+
+        result = []
+        for (territory_key, country, region), amounts in zip(row_keys, matrix.tolist()):
+            result.append({
+                'territory_key': territory_key,
+                'country': country,
+                'region': region,
+                'accounts': {
+                    f'account_{account_key}': {
                         'account_key': account_key,
                         'account_name': account_name,
-                        'amount': float(amount)
+                        'amount': amount
                     }
-                
-                result.append(row_data)
-            
-            return Response({
-                'pivot_type': 'territory_by_account',
-                'total_territories': len(result),
-                'data': result
+                    for (account_key, account_name), amount in zip(column_keys, amounts)
+                }
             })
-            
-        except Exception as e:
-            # Fallback to manual pivoting if pandas fails
-            return self._manual_pivot_territory_by_account(queryset)
 
-    def _manual_pivot_territory_by_account(self, queryset):
-        """Manual pivoting fallback method."""
-        # Group data manually
-        pivot_data = {}
-        
-        for entry in queryset:
-            territory_key = entry.territory.territory_key if entry.territory else 'No Territory'
-            account_key = entry.account.account_key
-            
-            if territory_key not in pivot_data:
-                pivot_data[territory_key] = {
-                    'territory_info': {
-                        'territory_key': territory_key,
-                        'country': entry.territory.country if entry.territory else 'N/A',
-                        'region': entry.territory.region if entry.territory else 'N/A'
-                    },
-                    'accounts': {}
-                }
-            
-            if account_key not in pivot_data[territory_key]['accounts']:
-                pivot_data[territory_key]['accounts'][account_key] = {
-                    'account_key': account_key,
-                    'account_name': entry.account.account,
-                    'amount': 0.0
-                }
-            
-            pivot_data[territory_key]['accounts'][account_key]['amount'] += float(entry.amount)
-        
-        # Convert to list format
-        result = []
-        for territory_key, data in pivot_data.items():
-            row = {
-                'territory_key': data['territory_info']['territory_key'],
-                'country': data['territory_info']['country'],
-                'region': data['territory_info']['region'],
-                'accounts': {f'account_{k}': v for k, v in data['accounts'].items()}
-            }
-            result.append(row)
-        
         return Response({
             'pivot_type': 'territory_by_account',
-            'method': 'manual_fallback',
             'total_territories': len(result),
             'data': result
         })
@@ -527,7 +452,12 @@ class GeneralLedgerViewSet(viewsets.ModelViewSet):
 
 class JournalEntryViewSet(viewsets.ModelViewSet):
     """ViewSet for Journal Entry model."""
-    queryset = JournalEntry.objects.select_related('company', 'date')
+    queryset = JournalEntry.objects.with_totals().select_related('company', 'date').prefetch_related(
+        Prefetch(
+            'ledger_entries',
+            queryset=GeneralLedger.objects.select_related('company', 'date', 'territory', 'account')
+        )
+    )
     serializer_class = JournalEntrySerializer
     
     def get_queryset(self):
@@ -629,16 +559,7 @@ class ProcessTransactionView(APIView):
             # If date format is invalid, use current date
             transaction_date = datetime.now().date()
         
-        calendar_entry, created = Calendar.objects.get_or_create(
-            company=company,
-            date=transaction_date,
-            defaults={
-                'year': transaction_date.year,
-                'quarter': f"Q{(transaction_date.month - 1) // 3 + 1}",
-                'month': transaction_date.strftime('%B'),
-                'day': transaction_date.strftime('%A')
-            }
-        )
+        calendar_entry = get_calendar(company.company_id, transaction_date)
         
         # Get or create territory if provided
         territory = None
@@ -756,16 +677,7 @@ class BulkCreateTransactionsView(APIView):
         company = get_object_or_404(Company, company_id=data['company_id'])
         
         # Get or create calendar entry
-        calendar_entry, created = Calendar.objects.get_or_create(
-            company=company,
-            date=data['date'],
-            defaults={
-                'year': data['date'].year,
-                'quarter': f"Q{(data['date'].month - 1) // 3 + 1}",
-                'month': data['date'].strftime('%B'),
-                'day': data['date'].strftime('%A')
-            }
-        )
+        calendar_entry = get_calendar(company.company_id, data['date'])
         
         # Create journal entry
         journal_entry = JournalEntry.objects.create(
@@ -804,6 +716,46 @@ class BulkCreateTransactionsView(APIView):
         }
 
 
+class IngestTransactionsView(APIView):
+    """
+    Ingest thousands of journals per request.
+    
+    Account, territory and calendar keys are resolved with one query each,
+    missing calendar dates are created in bulk and ledger lines are written
+    with batched bulk_create inside one transaction. Invalid journals are
+    skipped and reported by their index in the request.
+    """
+    
+    def post(self, request):
+        """Ingest a batch of journals."""
+        serializer = LedgerIngestionSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Invalid ingestion payload', 'details': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        data = serializer.validated_data
+        company = get_object_or_404(Company, company_id=data['company_id'])
+        
+        try:
+            result = ingest_journals(company, data['journals'], created_by=data['created_by'])
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to ingest transactions: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        if not result['journals_created']:
+            return Response(
+                {'error': 'No valid journals to ingest', **result},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
 class ProfitLossReportView(APIView):
     """Generate Profit & Loss report."""
     
@@ -822,28 +774,33 @@ class ProfitLossReportView(APIView):
         try:
             company = get_object_or_404(Company, company_id=company_id)
             
-            # Get revenue accounts (assuming class_name contains 'Revenue' or 'Income')
-            revenue_entries = GeneralLedger.objects.filter(
-                company=company,
-                date__date__range=[start_date, end_date],
-                account__class_name__icontains='Revenue'
-            ).select_related('account')
-            
-            # Get expense accounts
-            expense_entries = GeneralLedger.objects.filter(
+            # One detail line per ledger entry (class_name containing 'Revenue'
+            # or 'Expense'), read as plain values without building model instances
+            entries = GeneralLedger.objects.filter(
                 company=company,
-                date__date__range=[start_date, end_date],
-                account__class_name__icontains='Expense'
-            ).select_related('account')
-            
-            # Calculate totals
-            total_revenue = revenue_entries.filter(
-                transaction_type='CREDIT'
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+                posting_date__range=[start_date, end_date]
+            )
+            revenue_details = [
+                {'account': account, 'amount': amount}
+                for account, amount in entries.filter(
+                    account__class_name__icontains='Revenue'
+                ).values_list('account__account', 'amount')
+            ]
+            expense_details = [
+                {'account': account, 'amount': amount}
+                for account, amount in entries.filter(
+                    account__class_name__icontains='Expense'
+                ).values_list('account__account', 'amount')
+            ]
+            
+            # Calculate totals from the materialized daily balances
+            total_revenue = period_class_total(
+                company.company_id, 'Revenue', start_date, end_date, 'CREDIT'
+            )
             
-            total_expenses = expense_entries.filter(
-                transaction_type='DEBIT'
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+            total_expenses = period_class_total(
+                company.company_id, 'Expense', start_date, end_date, 'DEBIT'
+            )
             
             net_income = total_revenue - total_expenses
             
@@ -853,18 +810,8 @@ class ProfitLossReportView(APIView):
                 'total_revenue': total_revenue,
                 'total_expenses': total_expenses,
                 'net_income': net_income,
-                'revenue_details': [
-                    {
-                        'account': entry.account.account,
-                        'amount': entry.amount
-                    } for entry in revenue_entries
-                ],
-                'expense_details': [
-                    {
-                        'account': entry.account.account,
-                        'amount': entry.amount
-                    } for entry in expense_entries
-                ]
+                'revenue_details': revenue_details,
+                'expense_details': expense_details
             })
             
         except Exception as e:
@@ -891,35 +838,13 @@ class BalanceSheetReportView(APIView):
         try:
             company = get_object_or_404(Company, company_id=company_id)
             
-            # Get all entries up to the specified date
-            entries = GeneralLedger.objects.filter(
-                company=company,
-                date__date__lte=as_of_date
-            ).select_related('account')
-            
-            # Separate by account class
-            assets = entries.filter(account__class_name__icontains='Asset')
-            liabilities = entries.filter(account__class_name__icontains='Liability')
-            equity = entries.filter(account__class_name__icontains='Equity')
+            # Account totals up to the specified date in a single grouped query
+            rows = trial_balance_rows(company.company_id, as_of_date)
             
             # Calculate balances (Assets = Debits - Credits, Liabilities/Equity = Credits - Debits)
-            total_assets = (
-                assets.filter(transaction_type='DEBIT').aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-            ) - (
-                assets.filter(transaction_type='CREDIT').aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-            )
-            
-            total_liabilities = (
-                liabilities.filter(transaction_type='CREDIT').aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-            ) - (
-                liabilities.filter(transaction_type='DEBIT').aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-            )
-            
-            total_equity = (
-                equity.filter(transaction_type='CREDIT').aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-            ) - (
-                equity.filter(transaction_type='DEBIT').aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-            )
+            total_assets = class_total(rows, 'Asset')
+            total_liabilities = class_total(rows, 'Liability')
+            total_equity = class_total(rows, 'Equity')
             
             return Response({
                 'company': company.company_name,
@@ -954,36 +879,19 @@ class TrialBalanceReportView(APIView):
         try:
             company = get_object_or_404(Company, company_id=company_id)
             
-            # Get all accounts for the company
-            accounts = ChartOfAccounts.objects.filter(company=company)
-            
             trial_balance = []
             total_debits = Decimal('0.00')
             total_credits = Decimal('0.00')
             
-            for account in accounts:
-                # Calculate account balance
-                debits = GeneralLedger.objects.filter(
-                    company=company,
-                    account=account,
-                    date__date__lte=as_of_date,
-                    transaction_type='DEBIT'
-                ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-                
-                credits = GeneralLedger.objects.filter(
-                    company=company,
-                    account=account,
-                    date__date__lte=as_of_date,
-                    transaction_type='CREDIT'
-                ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-                
-                balance = debits - credits
+            # One grouped query for every account instead of two per account
+            for row in trial_balance_rows(company.company_id, as_of_date):
+                balance = row['balance']
                 
                 if balance != 0:  # Only include accounts with non-zero balances
                     trial_balance.append({
-                        'account_key': account.account_key,
-                        'account_name': account.account,
-                        'account_class': account.class_name,
+                        'account_key': row['account_key'],
+                        'account_name': row['account_name'],
+                        'account_class': row['class_name'],
                         'debit_balance': balance if balance > 0 else Decimal('0.00'),
                         'credit_balance': abs(balance) if balance < 0 else Decimal('0.00')
                     })
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for general ledger pagination.
+
+Seeds a synthetic company with a large GeneralLedger (1,000,000 rows by default)
+and requests page 1 and page 10,000 of /api/general-ledger/ with page-number
+pagination and with keyset pagination (?cursor=), reporting query count and
+latency of each. Keyset pages should cost the same at any depth.
+
+All seeded data is rolled back when the script finishes.
+
+Usage:
+    python benchmark_ledger_pagination.py [ledger_rows] [page]
+"""
+
+import base64
+import json
+import os
+import sys
+import time
+
+import django
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'numerizam_project.settings')
+django.setup()
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, setup_test_environment
+from rest_framework.test import APIClient
+
+from accounting.models import GeneralLedger
+from accounting.synthetic import seed_synthetic_company
+
+
+URL = '/api/general-ledger/'
+
+
+def keyset_cursor(company, offset):
+    """Build the cursor pointing just before the row at offset (untimed setup)."""
+    if offset == 0:
+        return None
+    entry_date, entry_no = GeneralLedger.objects.filter(company=company).order_by(
+        '-posting_date', '-entry_no'
+    ).values_list('posting_date', 'entry_no')[offset - 1]
+    payload = json.dumps({'d': entry_date.isoformat(), 'n': entry_no}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+
+
+def measure(name, client, params):
+    """Request one page and print query count and latency."""
+    cache.clear()  # keep the anonymous throttle out of the way
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(URL, params)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    rows = len(response.data['results']) if response.status_code == 200 else 0
+    print(f'   {name:<22} {len(queries):>4} queries  {elapsed_ms:>10.1f} ms  {rows} rows')
+    return elapsed_ms
+
+
+def run_benchmark(ledger_rows, page):
+    """Seed the ledger, time shallow and deep pages, and roll everything back."""
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    print(f'🧪 Ledger pagination benchmark with {ledger_rows:,} ledger rows, page {page:,}...')
+
+    setup_test_environment()
+    client = APIClient()
+
+    with transaction.atomic():
+        started = time.perf_counter()
+        company = seed_synthetic_company('Pagination Benchmark', ledger_rows=ledger_rows)
+        print(f'   Seeded in {time.perf_counter() - started:.1f} s')
+        print()
+
+        base = {'company': company.company_id}
+        measure('page-number, page 1', client, {**base, 'page': 1})
+        measure(f'page-number, page {page}', client, {**base, 'page': page})
+
+        first = measure('keyset, page 1', client, {**base, 'pagination': 'cursor'})
+        cursor = keyset_cursor(company, (page - 1) * page_size)
+        deep = measure(f'keyset, page {page}', client, {**base, 'cursor': cursor} if cursor else base)
+
+        if deep <= first * 2:
+            print(f'\n✅ Keyset page {page:,} served as fast as page 1')
+        else:
+            print(f'\n❌ Keyset page {page:,} is {deep / first:.1f}x slower than page 1')
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    page = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    run_benchmark(rows, page)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for general ledger list serialization.
+
+Seeds a synthetic company and serializes one 10,000-row page of the ledger
+with GeneralLedgerSerializer and with the lean values_list() path used by
+/api/general-ledger/?lean=true, including query and JSON rendering time.
+A narrow ?fields= selection is timed as well.
+
+All seeded data is rolled back when the script finishes.
+
+Usage:
+    python benchmark_ledger_serialization.py [rows_per_response]
+"""
+
+import os
+import sys
+import time
+
+import django
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'numerizam_project.settings')
+django.setup()
+
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from accounting.models import GeneralLedger
+from accounting.serializers import GeneralLedgerSerializer, compile_ledger_row
+from accounting.synthetic import seed_synthetic_company
+
+
+NARROW_FIELDS = ['entry_no', 'date_value', 'account', 'amount', 'transaction_type']
+
+
+def ledger_page(company, rows):
+    """Queryset of one list page, as built by GeneralLedgerViewSet."""
+    return GeneralLedger.objects.select_related(
+        'company', 'date', 'territory', 'account'
+    ).filter(company=company).order_by('-posting_date', '-entry_no')[:rows]
+
+
+def serializer_page(company, rows):
+    return GeneralLedgerSerializer(ledger_page(company, rows), many=True).data
+
+
+def lean_page(company, rows, fields=None):
+    paths, row_to_dict = compile_ledger_row(fields)
+    return [row_to_dict(row) for row in ledger_page(company, rows).values_list(*paths)]
+
+
+def measure(name, func, *args, repeat=3):
+    """Run func, render the result as JSON and print the best of repeat runs."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = func(*args)
+        body = JSONRenderer().render(data)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        best = elapsed_ms if best is None else min(best, elapsed_ms)
+    print(f'   {name:<18} {best:>10.1f} ms  {len(body) / 1024:>8.0f} KiB')
+    return best, data
+
+
+def run_benchmark(rows):
+    """Seed the ledger, time both serializers and roll everything back."""
+    print(f'🧪 Ledger serialization benchmark with {rows:,} rows per response...')
+
+    with transaction.atomic():
+        company = seed_synthetic_company('Serialization Benchmark', ledger_rows=rows * 2)
+
+        serializer_ms, serialized = measure('serializer', serializer_page, company, rows)
+        lean_ms, lean = measure('lean (all fields)', lean_page, company, rows)
+        measure('lean (5 fields)', lean_page, company, rows, NARROW_FIELDS)
+
+        if [dict(row) for row in serialized] == lean:
+            print(f'\n✅ Identical output, lean path {serializer_ms / lean_ms:.1f}x faster')
+        else:
+            print('\n❌ Lean output differs from GeneralLedgerSerializer')
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
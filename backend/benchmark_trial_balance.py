@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the trial balance engine.
+
+Seeds a synthetic company with a large GeneralLedger (1,000,000 rows by default)
+and compares the old per-account aggregate loop against the AccountDailyBalance
+lookup used by TrialBalanceReportView, reporting query count and latency.
+
+All seeded data is rolled back when the script finishes.
+
+Usage:
+    python benchmark_trial_balance.py [ledger_rows]
+"""
+
+import os
+import sys
+import time
+from datetime import date
+from decimal import Decimal
+
+import django
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'numerizam_project.settings')
+django.setup()
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+
+from accounting.models import ChartOfAccounts, GeneralLedger
+from accounting.reports import trial_balance_rows
+from accounting.synthetic import seed_synthetic_company
+
+
+AS_OF_DATE = date(2022, 12, 31)
+
+
+def legacy_trial_balance(company):
+    """Per-account loop previously used by TrialBalanceReportView."""
+    balances = {}
+    for account in ChartOfAccounts.objects.filter(company=company):
+        debits = GeneralLedger.objects.filter(
+            company=company, account=account, date__date__lte=AS_OF_DATE, transaction_type='DEBIT'
+        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        credits = GeneralLedger.objects.filter(
+            company=company, account=account, date__date__lte=AS_OF_DATE, transaction_type='CREDIT'
+        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        if debits - credits != 0:
+            balances[account.account_key] = debits - credits
+    return balances
+
+
+def engine_trial_balance(company):
+    """Running-total lookup used by the trial balance engine."""
+    return {
+        row['account_key']: row['balance']
+        for row in trial_balance_rows(company.company_id, AS_OF_DATE)
+        if row['balance'] != 0
+    }
+
+
+def measure(name, func, company):
+    """Run func once and print query count and latency."""
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        result = func(company)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f'   {name:<10} {len(queries):>6} queries  {elapsed_ms:>10.1f} ms')
+    return result
+
+
+def run_benchmark(ledger_rows):
+    """Seed the ledger, time both implementations and roll everything back."""
+    print(f'🧪 Trial balance benchmark with {ledger_rows:,} ledger rows...')
+
+    with transaction.atomic():
+        started = time.perf_counter()
+        company = seed_synthetic_company('Trial Balance Benchmark', ledger_rows=ledger_rows)
+        print(f'   Seeded in {time.perf_counter() - started:.1f} s')
+        print()
+
+        legacy = measure('legacy', legacy_trial_balance, company)
+        engine = measure('engine', engine_trial_balance, company)
+
+        # SQLite sums decimals as floats, so compare to the cent
+        cents = Decimal('0.01')
+        legacy = {key: value.quantize(cents) for key, value in legacy.items()}
+        engine = {key: value.quantize(cents) for key, value in engine.items()}
+
+        if legacy == engine:
+            print('\n✅ Both implementations return identical balances')
+        else:
+            print('\n❌ Balances differ between implementations')
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    run_benchmark(rows)
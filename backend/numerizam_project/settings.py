@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'accounting.metrics.QueryMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -182,4 +183,49 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # Allow all origins during development (more permissive)
-CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True
+
+# Maximum (company, date) entries kept in each process's Calendar lookup cache
+CALENDAR_CACHE_SIZE = int(os.getenv('CALENDAR_CACHE_SIZE', '10000'))
+
+# Cache backend for throttling and cached ledger aggregation results.
+# Use a backend shared by all worker processes (file, Redis) in production:
+# e.g. CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+#      CACHE_LOCATION=/var/tmp/numerizam_cache
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'numerizam'),
+    }
+}
+
+# Seconds a cached aggregation result is kept. Ledger writes invalidate results
+# immediately, but only in the cache of the process that handled the write: with
+# the default per-process LocMemCache other workers (gunicorn/uvicorn --workers)
+# serve their copy until it expires, so the default is short. Running several
+# workers with long-lived results requires a shared CACHE_BACKEND (Redis,
+# Memcached, database or file cache); setting one raises the default to a day.
+RESULT_CACHE_TIMEOUT = int(os.getenv(
+    'RESULT_CACHE_TIMEOUT', '86400' if os.getenv('CACHE_BACKEND') else '60'
+))
+
+# Recent requests kept per route for the /api/metrics/ percentiles
+METRICS_SAMPLE_SIZE = int(os.getenv('METRICS_SAMPLE_SIZE', '1000'))
+
+# Natural-language query translations kept per process; set a path to also
+# keep them in an SQLite file shared by all worker processes (which also
+# propagates invalidations). Without a path, entries expire after the TTL
+# in seconds, since other processes cannot see invalidations.
+QUERY_TRANSLATION_CACHE_SIZE = int(os.getenv('QUERY_TRANSLATION_CACHE_SIZE', '1000'))
+QUERY_TRANSLATION_CACHE_PATH = os.getenv('QUERY_TRANSLATION_CACHE_PATH', '')
+QUERY_TRANSLATION_CACHE_TTL = int(os.getenv('QUERY_TRANSLATION_CACHE_TTL', '300'))
+
+# Concurrent model calls per batch request, and retries with exponential
+# backoff (starting at LLM_RATE_LIMIT_BACKOFF seconds) of rate-limited calls
+LLM_BATCH_CONCURRENCY = int(os.getenv('LLM_BATCH_CONCURRENCY', '8'))
+LLM_RATE_LIMIT_RETRIES = int(os.getenv('LLM_RATE_LIMIT_RETRIES', '4'))
+LLM_RATE_LIMIT_BACKOFF = float(os.getenv('LLM_RATE_LIMIT_BACKOFF', '1.0'))
+
+# Lowest confidence at which simple transaction queries are parsed by rules
+# instead of the LLM (above 1 sends every query to the LLM)
+FAST_PARSE_MIN_CONFIDENCE = float(os.getenv('FAST_PARSE_MIN_CONFIDENCE', '0.8'))
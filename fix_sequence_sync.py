@@ -18,6 +18,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'numerizam_project.settings')
 django.setup()
 
+from accounting.ledger_import import sync_sequence
 from accounting.models import GeneralLedger
 
 def fix_sequence_sync():
@@ -25,41 +26,14 @@ def fix_sequence_sync():
     
     print("🔧 Fixing GeneralLedger sequence synchronization...")
     
-    # Get the current maximum entry_no
-    max_entry = GeneralLedger.objects.aggregate(
-        max_entry=django.db.models.Max('entry_no')
-    )['max_entry']
-    
-    if max_entry is None:
-        max_entry = 0
-    
-    print(f"📊 Current maximum entry_no: {max_entry}")
+    if connection.vendor != 'postgresql':
+        print("❌ Sequence synchronization only applies to PostgreSQL")
+        return False
     
-    # Fix the sequence
-    with connection.cursor() as cursor:
-        # Get the sequence name
-        cursor.execute("""
-            SELECT pg_get_serial_sequence('generalledger', 'entryno');
-        """)
-        sequence_name = cursor.fetchone()[0]
-        
-        if sequence_name:
-            print(f"🔄 Found sequence: {sequence_name}")
-            
-            # Set the sequence to the correct value
-            next_val = max_entry + 1
-            cursor.execute(f"SELECT setval('{sequence_name}', %s);", [next_val])
-            
-            print(f"✅ Sequence set to next value: {next_val}")
-            
-            # Verify the fix
-            cursor.execute(f"SELECT currval('{sequence_name}');")
-            current_val = cursor.fetchone()[0]
-            print(f"🔍 Verified current sequence value: {current_val}")
-            
-        else:
-            print("❌ Could not find sequence for generalledger.entryno")
-            return False
+    # Same helper the import_ledger command runs after every import
+    max_entry = sync_sequence(GeneralLedger)
+    print(f"📊 Current maximum entry_no: {max_entry or 0}")
+    print(f"✅ Sequence set to next value: {(max_entry or 0) + 1}")
     
     return True
 